@@ -1,7 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException
-from ..utils.dependencies import get_current_active_user
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Header
+from typing import Optional
+from starlette.concurrency import run_in_threadpool
+import os
+import tempfile
+from ..utils.dependencies import get_current_active_user, require_role
+from ..utils.rate_limit import limit_by_user
 from ..models.user import User
 from ..database.loader import load_data_from_json
+from ..db_config import get_database
+from ..database.pool_monitor import pool_monitor
+from ..services.job_service import enqueue_job, get_job, serialize_job
+from ..services.import_service import IMPORT_JOB_TYPE
 
 router = APIRouter(
     prefix="/admin",
@@ -9,6 +18,8 @@ router = APIRouter(
     responses={404: {"description": "Not found"}},
 )
 
+IMPORT_UPLOAD_CHUNK_SIZE = 1024 * 1024
+
 @router.post("/reset-database", status_code=200)
 async def reset_database(current_user: User = Depends(get_current_active_user)):
     try:
@@ -33,3 +44,58 @@ async def reset_database(current_user: User = Depends(get_current_active_user)):
             status_code=500, 
             detail={"message": f"An unexpected error occurred: {str(e)}"}
         )
+
+@router.post("/import/applications", status_code=202, dependencies=[Depends(limit_by_user("upload"))])
+async def import_applications(
+    file: UploadFile = File(...),
+    idempotency_key: Optional[str] = Header(None),
+    current_user = Depends(require_role("Admin"))
+):
+    """Start a background import of applications from an NDJSON file (one ApplicationCreate per line).
+
+    A retried request with the same Idempotency-Key header returns the original job.
+    """
+    db = await get_database()
+    key = f"{IMPORT_JOB_TYPE}:{current_user.email}:{idempotency_key}" if idempotency_key else None
+    if key:
+        existing = await db.jobs.find_one({"idempotency_key": key}, {"_id": 1})
+        if existing:
+            return {"message": "Import already started", "job_id": str(existing["_id"])}
+
+    # Spool the upload to disk in chunks so the import job can stream it after the request ends
+    fd, file_path = tempfile.mkstemp(prefix="application_import_", suffix=".ndjson")
+    try:
+        with os.fdopen(fd, "wb") as destination:
+            while chunk := await file.read(IMPORT_UPLOAD_CHUNK_SIZE):
+                await run_in_threadpool(destination.write, chunk)
+    except Exception as e:
+        os.remove(file_path)
+        raise HTTPException(status_code=500, detail=f"Failed to receive import file: {str(e)}")
+
+    # The spool file is local, so workers in other processes on this host can read it
+    job = await enqueue_job(
+        db, IMPORT_JOB_TYPE, current_user.email,
+        {"filename": file.filename, "file_path": file_path},
+        idempotency_key=key
+    )
+    if job["params"].get("file_path") != file_path:
+        os.remove(file_path)  # lost a race with a concurrent retry of the same request
+    
+    return {"message": "Import started", "job_id": str(job["_id"])}
+
+@router.get("/import/applications/{job_id}")
+async def get_import_status(
+    job_id: str,
+    current_user = Depends(require_role("Admin"))
+):
+    """Get progress and the per-line error report for an application import"""
+    db = await get_database()
+    job = await get_job(db, job_id)
+    if not job or job["type"] != IMPORT_JOB_TYPE:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return serialize_job(job)
+
+@router.get("/db-pool")
+async def get_db_pool_stats(current_user = Depends(require_role("Admin"))):
+    """Connection pool telemetry per MongoDB server: size, in-use, waiters and checkout wait times"""
+    return {"servers": pool_monitor.snapshot()}
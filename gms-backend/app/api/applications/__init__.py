@@ -1,5 +1,6 @@
 from fastapi import APIRouter
 from .core import router as core_router
+from .export import router as export_router
 from .reviews import router as reviews_router
 from .signoff import router as signoff_router
 from .documents import router as documents_router
@@ -7,7 +8,8 @@ from .documents import router as documents_router
 # Main applications router
 router = APIRouter(prefix="/applications", tags=["applications"])
 
-# Include all sub-routers
+# Include all sub-routers (export first so /export is not captured by /{application_id})
+router.include_router(export_router)
 router.include_router(core_router)
 router.include_router(reviews_router)
 router.include_router(signoff_router)
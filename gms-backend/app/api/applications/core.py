@@ -1,7 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from typing import List, Optional
 from datetime import datetime
-from bson import ObjectId
 
 from ...utils.dependencies import get_current_active_user, get_database
 from ...schemas.application import ApplicationCreate, ApplicationUpdate, ApplicationResponse
@@ -14,7 +13,8 @@ from ...services.application_service import (
     get_applications_by_grant_call,
     update_application
 )
-from .utils import build_application_response
+from ...services.event_service import notify_change
+from .utils import build_application_response, build_application_responses
 
 router = APIRouter()
 
@@ -32,7 +32,7 @@ async def submit_application(
     application = await create_application(db, application_data)
     return build_application_response(application)
 
-@router.get("/my", response_model=List[ApplicationResponse])
+@router.get("/my", responses={200: {"model": List[ApplicationResponse]}})
 async def get_my_applications(
     status_filter: Optional[str] = Query(None, description="Filter by status"),
     current_user = Depends(get_current_active_user)
@@ -45,9 +45,10 @@ async def get_my_applications(
     if status_filter:
         applications = [app for app in applications if app.status == status_filter]
     
-    return [build_application_response(application) for application in applications]
+    # Documented as ApplicationResponse, but returned as built: see build_application_summary
+    return build_application_responses(applications)
 
-@router.get("/", response_model=List[ApplicationResponse])
+@router.get("/", responses={200: {"model": List[ApplicationResponse]}})
 async def list_applications(
     status_filter: Optional[str] = Query(None, description="Filter by status"),
     grant_call_id: Optional[str] = Query(None, description="Filter by grant call"),
@@ -69,7 +70,7 @@ async def list_applications(
         else:
             applications = await get_all_applications(db)
     
-    return [build_application_response(application) for application in applications]
+    return build_application_responses(applications)
 
 @router.get("/{application_id}", response_model=ApplicationResponse)
 async def get_application(
@@ -137,13 +138,15 @@ async def update_application_status(
         update_data["isEditable"] = False
     
     result = await db.applications.update_one(
-        {"_id": ObjectId(application_id)},
+        {"_id": application.id},
         {"$set": update_data}
     )
     
     if result.modified_count == 0:
         raise HTTPException(status_code=400, detail="Failed to update application status")
     
+    notify_change(db, "applications", application.id)
+    
     # Get updated application
     updated_application = await get_application_by_id(db, application_id)
     return build_application_response(updated_application)
@@ -222,13 +225,15 @@ async def update_application_status_general(
     
     # Update the application
     result = await db.applications.update_one(
-        {"_id": ObjectId(application_id)},
+        {"_id": application.id},
         {"$set": update_data}
     )
     
     if result.modified_count == 0:
         raise HTTPException(status_code=400, detail="Failed to update application status")
     
+    notify_change(db, "applications", application.id)
+    
     # Get updated application
     updated_application = await get_application_by_id(db, application_id)
     return build_application_response(updated_application)
@@ -258,7 +263,7 @@ async def withdraw_application(
     
     # Update status to withdrawn
     result = await db.applications.update_one(
-        {"_id": ObjectId(application_id)},
+        {"_id": application.id},
         {
             "$set": {
                 "status": "withdrawn",
@@ -270,6 +275,8 @@ async def withdraw_application(
     if result.modified_count == 0:
         raise HTTPException(status_code=400, detail="Failed to withdraw application")
     
+    notify_change(db, "applications", application.id)
+    
     # Get updated application
     updated_application = await get_application_by_id(db, application_id)
     return build_application_response(updated_application)
@@ -336,13 +343,14 @@ async def resubmit_application(
         update_data["submissionDate"] = datetime.utcnow().isoformat()
     
     result = await db.applications.update_one(
-        {"_id": ObjectId(application_id)},
+        {"_id": application.id},
         {"$set": update_data}
     )
     
     if result.modified_count == 0:
         raise HTTPException(status_code=400, detail="Failed to update application")
     
+    notify_change(db, "applications", application.id)
     updated_application = await get_application_by_id(db, application_id)
     return build_application_response(updated_application)
 
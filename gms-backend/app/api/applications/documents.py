@@ -1,16 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query, Response
+from fastapi.responses import StreamingResponse
 from typing import List
 from datetime import datetime
-import base64
-from bson import ObjectId
 
 from ...utils.dependencies import get_current_active_user, require_role, get_database
+from ...utils.rate_limit import limit_by_user
 from ...services.application_service import get_application_by_id
+from ...services.award_document_service import (
+    add_award_document, open_award_document, iter_award_document,
+    read_award_document_base64, remove_award_document
+)
+from ...services.award_letter_service import request_award_letters, open_award_letter
+from ...services.job_service import get_job, serialize_job
+from ...services.event_service import notify_change
 from .utils import build_application_response
 
 router = APIRouter()
 
-@router.post("/{application_id}/award-documents/upload")
+@router.post("/{application_id}/award-documents/upload", dependencies=[Depends(limit_by_user("upload"))])
 async def upload_award_document(
     application_id: str,
     file: UploadFile = File(...),
@@ -26,33 +33,8 @@ async def upload_award_document(
     if application.status != "signoff_approved":
         raise HTTPException(status_code=400, detail="Can only upload award documents for sign-off approved applications")
     
-    # Read file content and encode to base64
-    file_content = await file.read()
-    file_data = base64.b64encode(file_content).decode('utf-8')
-    
-    # Create award document entry
-    award_doc = {
-        "id": f"award_{ObjectId()}",
-        "filename": file.filename,
-        "file_data": file_data,
-        "file_type": file.content_type,
-        "uploaded_at": datetime.utcnow().isoformat(),
-        "uploaded_by": current_user.email
-    }
-    
-    # Add to application's award_documents array
-    result = await db.applications.update_one(
-        {"_id": ObjectId(application_id)},
-        {
-            "$push": {"award_documents": award_doc},
-            "$set": {
-                "status": "award_pending_acceptance",
-                "updatedAt": datetime.utcnow()
-            }
-        }
-    )
-    
-    if result.modified_count == 0:
+    award_doc = await add_award_document(db, str(application.id), file, current_user.email)
+    if award_doc is None:
         raise HTTPException(status_code=500, detail="Failed to upload award document")
     
     return {"message": "Award document uploaded successfully", "document_id": award_doc["id"]}
@@ -73,24 +55,23 @@ async def list_award_documents(
     if current_user.role == "Researcher" and application.email != current_user.email:
         raise HTTPException(status_code=403, detail="Access denied")
     
-    award_documents = getattr(application, 'award_documents', [])
-    
-    # Return document metadata (without file data for list view)
     return [
         {
             "id": doc["id"],
             "filename": doc["filename"],
             "file_type": doc["file_type"],
+            "size": doc.get("size"),
             "uploaded_at": doc["uploaded_at"],
             "uploaded_by": doc["uploaded_by"]
         }
-        for doc in award_documents
+        for doc in application.award_documents
     ]
 
 @router.get("/{application_id}/award-documents/{document_id}/download")
 async def download_award_document(
     application_id: str,
     document_id: str,
+    raw: bool = Query(False, description="Stream the file itself instead of base64 JSON"),
     current_user = Depends(get_current_active_user)
 ):
     """Download specific award document"""
@@ -104,16 +85,29 @@ async def download_award_document(
     if current_user.role == "Researcher" and application.email != current_user.email:
         raise HTTPException(status_code=403, detail="Access denied")
     
-    award_documents = getattr(application, 'award_documents', [])
-    document = next((doc for doc in award_documents if doc["id"] == document_id), None)
+    document = next((doc for doc in application.award_documents if doc["id"] == document_id), None)
     
     if not document:
         raise HTTPException(status_code=404, detail="Award document not found")
     
+    grid_out = await open_award_document(db, document)
+    if grid_out is None:
+        raise HTTPException(status_code=404, detail="Award document file not found")
+    
+    if raw:
+        return StreamingResponse(
+            iter_award_document(grid_out),
+            media_type=document["file_type"] or "application/octet-stream",
+            headers={
+                "Content-Disposition": f'attachment; filename="{document["filename"]}"',
+                "Content-Length": str(grid_out.length)
+            }
+        )
+    
     return {
         "filename": document["filename"],
         "file_type": document["file_type"],
-        "file_data": document["file_data"]
+        "file_data": await read_award_document_base64(grid_out)
     }
 
 @router.delete("/{application_id}/award-documents/{document_id}")
@@ -129,16 +123,7 @@ async def delete_award_document(
     if not application:
         raise HTTPException(status_code=404, detail="Application not found")
     
-    # Remove document from array
-    result = await db.applications.update_one(
-        {"_id": ObjectId(application_id)},
-        {
-            "$pull": {"award_documents": {"id": document_id}},
-            "$set": {"updatedAt": datetime.utcnow()}
-        }
-    )
-    
-    if result.modified_count == 0:
+    if not await remove_award_document(db, str(application.id), document_id):
         raise HTTPException(status_code=404, detail="Award document not found")
     
     return {"message": "Award document deleted successfully"}
@@ -181,7 +166,7 @@ async def accept_award(
     new_status = "award_accepted" if decision == "accepted" else "award_rejected"
     
     result = await db.applications.update_one(
-        {"_id": ObjectId(application_id)},
+        {"_id": application.id},
         {
             "$set": {
                 "award_acceptance": award_acceptance,
@@ -194,6 +179,7 @@ async def accept_award(
     if result.modified_count == 0:
         raise HTTPException(status_code=500, detail="Failed to record award decision")
     
+    notify_change(db, "applications", application.id)
     return {"message": f"Award {decision} successfully", "status": new_status}
 
 @router.get("/{application_id}/acceptance-status")
@@ -212,14 +198,14 @@ async def get_acceptance_status(
     if current_user.role == "Researcher" and application.email != current_user.email:
         raise HTTPException(status_code=403, detail="Access denied")
     
-    award_acceptance = getattr(application, 'award_acceptance', None)
+    award_acceptance = application.award_acceptance
     
     if not award_acceptance:
         return {
             "status": "pending",
             "can_accept": (application.status == "award_pending_acceptance" and 
                           application.email == current_user.email),
-            "has_award_documents": len(getattr(application, 'award_documents', [])) > 0
+            "has_award_documents": len(application.award_documents) > 0
         }
     
     return {
@@ -229,15 +215,16 @@ async def get_acceptance_status(
         "decided_at": award_acceptance["decided_at"],
         "decided_by": award_acceptance["decided_by"],
         "can_accept": False,
-        "has_award_documents": len(getattr(application, 'award_documents', [])) > 0
+        "has_award_documents": len(application.award_documents) > 0
     }
 
 @router.post("/{application_id}/award-letter/generate")
 async def generate_award_letter(
     application_id: str,
+    response: Response,
     current_user = Depends(require_role("Grants Manager"))
 ):
-    """Generate award letter for signoff approved application"""
+    """Render the award letter PDF in the background; poll /award-letter/status for progress"""
     db = await get_database()
     
     application = await get_application_by_id(db, application_id)
@@ -247,39 +234,42 @@ async def generate_award_letter(
     if application.status != "signoff_approved":
         raise HTTPException(status_code=400, detail="Can only generate award letter for signoff approved applications")
     
-    # Create award letter data
-    award_letter = {
-        "id": f"award_letter_{ObjectId()}",
-        "filename": f"award_letter_{application.applicantName.replace(' ', '_')}.pdf",
-        "generated_at": datetime.utcnow().isoformat(),
-        "generated_by": current_user.email,
-        "application_id": application_id,
-        "applicant_name": application.applicantName,
-        "proposal_title": application.proposalTitle,
-        "award_amount": getattr(application, 'signoff_workflow', {}).get('award_amount', 0),
-        "file_data": f"base64_encoded_award_letter_content_for_{application_id}",  # In real implementation, generate PDF
-        "file_type": "application/pdf"
-    }
+    job = await request_award_letters(db, [str(application.id)], current_user.email)
+    if job is None:
+        return {"message": "Award letter is up to date", "letter_id": application.award_letter["id"], "status": "ready"}
     
-    # Add to application's award_letter field
-    result = await db.applications.update_one(
-        {"_id": ObjectId(application_id)},
-        {
-            "$set": {
-                "award_letter": award_letter,
-                "updatedAt": datetime.utcnow()
-            }
-        }
-    )
+    response.status_code = 202
+    return {"message": "Award letter generation started", "job_id": str(job["_id"]), "status": "pending"}
+
+@router.get("/{application_id}/award-letter/status")
+async def get_award_letter_status(
+    application_id: str,
+    current_user = Depends(get_current_active_user)
+):
+    """Generation status of the award letter: none, pending, ready or failed"""
+    db = await get_database()
     
-    if result.modified_count == 0:
-        raise HTTPException(status_code=500, detail="Failed to generate award letter")
+    application = await get_application_by_id(db, application_id)
+    if not application:
+        raise HTTPException(status_code=404, detail="Application not found")
     
-    return {"message": "Award letter generated successfully", "letter_id": award_letter["id"]}
+    if current_user.role == "Researcher" and application.email != current_user.email:
+        raise HTTPException(status_code=403, detail="Access denied")
+    
+    award_letter = application.award_letter or {}
+    job = await get_job(db, str(award_letter["job_id"])) if award_letter.get("job_id") else None
+    return {
+        "status": award_letter.get("status", "ready" if award_letter else "none"),
+        "letter_id": award_letter.get("id"),
+        "generated_at": award_letter.get("generated_at"),
+        "error": award_letter.get("error"),
+        "job": serialize_job(job) if job else None
+    }
 
 @router.get("/{application_id}/award-letter")
 async def download_award_letter(
     application_id: str,
+    raw: bool = Query(False, description="Stream the PDF itself instead of base64 JSON"),
     current_user = Depends(get_current_active_user)
 ):
     """Download generated award letter"""
@@ -293,14 +283,35 @@ async def download_award_letter(
     if current_user.role == "Researcher" and application.email != current_user.email:
         raise HTTPException(status_code=403, detail="Access denied")
     
-    award_letter = getattr(application, 'award_letter', None)
-    if not award_letter:
+    award_letter = application.award_letter
+    if not award_letter or (award_letter.get("status") == "failed" and not award_letter.get("filename")):
         raise HTTPException(status_code=404, detail="Award letter not found. Please generate it first.")
     
+    if award_letter.get("status") == "pending" and award_letter.get("file_id") is None:
+        raise HTTPException(status_code=409, detail="Award letter is still being generated")
+    
+    # Letters generated before PDF rendering only carry a placeholder string
+    if award_letter.get("file_id") is None:
+        file_data = award_letter["file_data"]
+    else:
+        grid_out = await open_award_letter(db, award_letter)
+        if grid_out is None:
+            raise HTTPException(status_code=404, detail="Award letter file not found. Please generate it again.")
+        if raw:
+            return StreamingResponse(
+                iter_award_document(grid_out),
+                media_type=award_letter["file_type"],
+                headers={
+                    "Content-Disposition": f'attachment; filename="{award_letter["filename"]}"',
+                    "Content-Length": str(grid_out.length)
+                }
+            )
+        file_data = await read_award_document_base64(grid_out)
+    
     return {
         "filename": award_letter["filename"],
         "file_type": award_letter["file_type"],
-        "file_data": award_letter["file_data"],
+        "file_data": file_data,
         "generated_at": award_letter["generated_at"],
         "generated_by": award_letter["generated_by"]
     }
@@ -331,7 +342,7 @@ async def confirm_contract_receipt(
     
     # Update application status
     result = await db.applications.update_one(
-        {"_id": ObjectId(application_id)},
+        {"_id": application.id},
         {
             "$set": {
                 "contract_confirmation": contract_confirmation,
@@ -344,6 +355,7 @@ async def confirm_contract_receipt(
     if result.modified_count == 0:
         raise HTTPException(status_code=500, detail="Failed to confirm contract receipt")
     
+    notify_change(db, "applications", application.id)
     return {"message": "Contract receipt confirmed successfully", "status": "contract_received"}
 
 @router.get("/{application_id}/document")
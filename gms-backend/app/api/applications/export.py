@@ -0,0 +1,38 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from typing import Optional
+from datetime import date, datetime
+
+from ...utils.dependencies import require_role, get_database
+from ...services.export_service import EXPORT_FORMATS, stream_applications_export
+
+router = APIRouter()
+
+@router.get("/export")
+async def export_applications(
+    format: str = Query("csv", description="Export format (csv or ndjson)"),
+    grant_call_id: Optional[str] = Query(None, description="Filter by grant call"),
+    status_filter: Optional[str] = Query(None, description="Filter by status"),
+    submitted_from: Optional[date] = Query(None, description="Submitted on or after this date"),
+    submitted_to: Optional[date] = Query(None, description="Submitted on or before this date"),
+    current_user = Depends(require_role("Grants Manager"))
+):
+    """Stream applications as CSV or NDJSON for finance and reporting"""
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Invalid export format: {format}")
+
+    db = await get_database("reporting")
+    content = stream_applications_export(
+        db, format,
+        grant_call_id=grant_call_id,
+        status=status_filter,
+        date_from=submitted_from,
+        date_to=submitted_to
+    )
+
+    filename = f"applications_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.{format}"
+    return StreamingResponse(
+        content,
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
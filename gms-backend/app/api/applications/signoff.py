@@ -1,10 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException
 from datetime import datetime
-from bson import ObjectId
 import secrets
 
 from ...utils.dependencies import get_current_active_user, get_database, require_role
+from ...utils.rate_limit import limit_by_client
 from ...services.application_service import get_application_by_id
+from ...services.event_service import notify_change
+from ...services.notification_service import signoff_request_notification, write_with_outbox
 from .utils import build_application_response
 
 router = APIRouter()
@@ -60,20 +62,30 @@ async def initiate_application_signoff(
         "updatedAt": datetime.utcnow()
     }
     
-    result = await db.applications.update_one(
-        {"_id": ObjectId(application_id)},
-        {"$set": update_data}
-    )
-    
-    if result.modified_count == 0:
+    notifications = [
+        signoff_request_notification(approval["email"], approval["name"], approval["role"], application.proposal_title, approval["token"])
+        for approval in approvals
+    ]
+    
+    async def write(session):
+        result = await db.applications.update_one(
+            {"_id": application.id},
+            {"$set": update_data},
+            session=session
+        )
+        return result.modified_count
+    
+    # Approvers are emailed their links; the tokens are still returned for manual follow-up
+    if not await write_with_outbox(db, write, notifications):
         raise HTTPException(status_code=500, detail="Failed to initiate sign-off workflow")
     
+    notify_change(db, "applications", application.id)
     return {
         "message": "Sign-off workflow initiated successfully",
         "sign_off_tokens": sign_off_tokens
     }
 
-@router.get("/signoff/{token}")
+@router.get("/signoff/{token}", dependencies=[Depends(limit_by_client("token_page"))])
 async def get_application_by_signoff_token(token: str):
     """Get application and approval details by sign-off token"""
     db = await get_database()
@@ -105,7 +117,7 @@ async def get_application_by_signoff_token(token: str):
         "approval": approval
     }
 
-@router.post("/signoff/{token}")
+@router.post("/signoff/{token}", dependencies=[Depends(limit_by_client("token_page"))])
 async def submit_signoff_approval(
     token: str,
     submission: dict
@@ -166,6 +178,7 @@ async def submit_signoff_approval(
         {"_id": application["_id"]},
         {"$set": update_data}
     )
+    notify_change(db, "applications", application["_id"])
     
     refreshed = await db.applications.find_one({"_id": application["_id"]})
     return {
@@ -1,4 +1,8 @@
+from typing import List
 from ...schemas.application import ApplicationResponse
+import logging
+
+logger = logging.getLogger(__name__)
 
 def build_application_response(application) -> ApplicationResponse:
     """Helper function to build consistent ApplicationResponse with all fields"""
@@ -47,3 +51,83 @@ def build_application_response(application) -> ApplicationResponse:
         award_letter_generated=get_field(application, "awardLetterGenerated", "award_letter_generated"),
         signoff_workflow=get_field(application, "signoffWorkflow", "signoff_workflow")
     )
+
+def _require_str(value, field: str) -> str:
+    if not isinstance(value, str):
+        raise ValueError(f"{field} must be a string, got {type(value).__name__}")
+    return value
+
+def _optional(convert, value):
+    return None if value is None else convert(value)
+
+def _review_entry(entry: dict) -> dict:
+    return {
+        key: _require_str(entry.get(key), f"reviewHistory.{key}")
+        for key in ("id", "reviewerName", "reviewerEmail", "comments", "submittedAt", "status")
+    }
+
+def _sign_off_approval(approval: dict) -> dict:
+    return {
+        "id": _require_str(approval.get("id"), "signOffApprovals.id"),
+        "applicationId": _require_str(approval.get("applicationId"), "signOffApprovals.applicationId"),
+        "role": _require_str(approval.get("role"), "signOffApprovals.role"),
+        "approverEmail": _require_str(approval.get("approverEmail"), "signOffApprovals.approverEmail"),
+        "approverName": approval.get("approverName"),
+        "status": _require_str(approval.get("status"), "signOffApprovals.status"),
+        "comments": approval.get("comments"),
+        "approvedAt": approval.get("approvedAt"),
+        "signOffToken": _require_str(approval.get("signOffToken"), "signOffApprovals.signOffToken"),
+    }
+
+def _signoff_workflow(workflow: dict) -> dict:
+    award_amount = workflow.get("awardAmount", workflow.get("award_amount"))
+    return {
+        "status": _require_str(workflow.get("status"), "signoffWorkflow.status"),
+        "awardAmount": _optional(float, award_amount),
+        "approvals": list(workflow.get("approvals") or []),
+        "initiatedBy": workflow.get("initiatedBy", workflow.get("initiated_by")),
+        "initiatedAt": workflow.get("initiatedAt", workflow.get("initiated_at")),
+    }
+
+def build_application_summary(row) -> dict:
+    """ApplicationResponse's JSON for an ApplicationRow, built directly.
+
+    Lists skip pydantic entirely: constructing ApplicationResponse and having FastAPI validate it
+    again through response_model cost as much as the parsing the rows avoid. Required fields are
+    still checked, so a row that would not fit the response is skipped as before.
+    """
+    workflow = row.signoff_workflow
+    return {
+        "id": str(row.id),
+        "grantId": _require_str(row.grant_id, "grantId"),
+        "applicantName": _require_str(row.applicant_name, "applicantName"),
+        "email": _require_str(row.email, "email"),
+        "proposalTitle": _require_str(row.proposal_title, "proposalTitle"),
+        "status": _require_str(row.status, "status"),
+        "submissionDate": _require_str(row.submission_date, "submissionDate"),
+        "reviewComments": _require_str(row.review_comments, "reviewComments"),
+        "biodata": row.biodata,
+        "deadline": row.deadline,
+        "isEditable": _optional(bool, row.is_editable),
+        "reviewHistory": [_review_entry(entry) for entry in row.reviewHistory],
+        "signOffApprovals": _optional(lambda approvals: [_sign_off_approval(approval) for approval in approvals], row.sign_off_approvals),
+        "awardAmount": _optional(float, workflow.get("award_amount")) if workflow else None,
+        "contractFileName": row.contract_file_name,
+        "awardLetterGenerated": _optional(bool, row.award_letter_generated),
+        "revisionCount": _optional(int, row.revision_count),
+        "originalSubmissionDate": row.original_submission_date,
+        "proposalFileName": row.proposal_file_name,
+        "proposalFileSize": _optional(int, row.proposal_file_size),
+        "proposalFileType": row.proposal_file_type,
+        "signoffWorkflow": _optional(_signoff_workflow, workflow),
+    }
+
+def build_application_responses(applications) -> List[dict]:
+    """List view: rows are not validated on load, so skip any that do not fit the response"""
+    responses = []
+    for application in applications:
+        try:
+            responses.append(build_application_summary(application))
+        except (TypeError, ValueError, AttributeError) as e:
+            logger.warning("Skipping application %s in list: %s", application.id, e)
+    return responses
@@ -6,32 +6,39 @@ from ..schemas.user import Token, UserLogin, UserResponse, TokenWithUser, Refres
 from ..schemas.error import ErrorCode
 from ..services.user_service import authenticate_user, get_user_by_email
 from ..utils.security import create_access_token, create_refresh_token, verify_token, decode_token
-from ..utils.error_handlers import AuthenticationError, rate_limiter
+from ..utils.error_handlers import AuthenticationError
+from ..utils.rate_limit import RATE_LIMIT_POLICIES, rate_limiter
 from ..config import settings
 from ..utils.dependencies import get_current_user
+from ..utils.tracing import start_span
 
 router = APIRouter(prefix="/auth", tags=["authentication"])
 
+async def check_login_rate_limit(email: str):
+    """Reject the login while the email has too many recent failed attempts"""
+    is_limited, retry_after = await rate_limiter.check(RATE_LIMIT_POLICIES["login"], email)
+    if is_limited:
+        raise AuthenticationError(
+            error_code=ErrorCode.TOO_MANY_ATTEMPTS,
+            message="Too many failed login attempts",
+            details=f"Account temporarily locked. Try again in {retry_after} seconds",
+            retry_after=retry_after
+        )
+
 @router.post("/login", response_model=TokenWithUser)
 async def login(request: Request, form_data: OAuth2PasswordRequestForm = Depends()):
     db = await get_database()
     email = form_data.username.lower().strip()
     
-    #Check rate limiting
-    # is_limited, retry_after = rate_limiter.is_rate_limited(email)
-    # if is_limited:
-    #     raise AuthenticationError(
-    #         error_code=ErrorCode.TOO_MANY_ATTEMPTS,
-    #         message="Too many failed login attempts",
-    #         details=f"Account temporarily locked. Try again in {retry_after} seconds",
-    #         retry_after=retry_after
-    #     )
+    # Check rate limiting
+    await check_login_rate_limit(email)
     
     # Authenticate user without role requirement
-    user = await authenticate_user(db, email, form_data.password)
+    with start_span("auth.login"):
+        user = await authenticate_user(db, email, form_data.password)
     if not user:
         # Record failed attempt
-        rate_limiter.record_attempt(email, success=False)
+        await rate_limiter.hit(RATE_LIMIT_POLICIES["login"], email)
         
         raise AuthenticationError(
             error_code=ErrorCode.INVALID_CREDENTIALS,
@@ -47,8 +54,8 @@ async def login(request: Request, form_data: OAuth2PasswordRequestForm = Depends
             details="Your account has been disabled. Please contact support"
         )
     
-    # Record successful attempt
-    rate_limiter.record_attempt(email, success=True)
+    # Reset failed attempts on successful login
+    await rate_limiter.reset(RATE_LIMIT_POLICIES["login"], email)
     
     # Create access and refresh tokens
     access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
@@ -80,13 +87,17 @@ async def login(request: Request, form_data: OAuth2PasswordRequestForm = Depends
 @router.post("/login-custom", response_model=Token)
 async def login_custom(user_login: UserLogin):
     db = await get_database()
+    email = user_login.email.lower().strip()
+    await check_login_rate_limit(email)
     
     user = await authenticate_user(db, user_login.email, user_login.password, user_login.role)
     if not user:
+        await rate_limiter.hit(RATE_LIMIT_POLICIES["login"], email)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email, password, or role"
         )
+    await rate_limiter.reset(RATE_LIMIT_POLICIES["login"], email)
     
     # Create access and refresh tokens
     access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
@@ -1,24 +1,33 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query, Form
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query, Form, Request
 from typing import List, Optional
-import os
-import shutil
 from pathlib import Path
 from ..db_config import get_database
 from ..services.document_service import (
     create_document, get_all_documents, get_document_by_id,
     get_documents_by_folder, get_documents_by_user, search_documents,
-    upload_new_version, delete_document, delete_document_version, get_document_stats
+    upload_new_version as add_document_version, delete_document, delete_document_version, get_document_stats
 )
-from ..utils.dependencies import get_current_active_user
+from ..services.blob_service import store_upload, release_blob, collect_garbage, get_storage_usage
+from ..utils.dependencies import get_current_active_user, require_role
+from ..utils.file_responses import send_file
+from ..utils.rate_limit import limit_by_user
+from ..utils.uploads import UPLOAD_DIR, blob_path, format_file_size
 
 router = APIRouter(prefix="/documents", tags=["documents"])
 
-# Create uploads directory if it doesn't exist
-UPLOAD_DIR = Path("uploads")
-UPLOAD_DIR.mkdir(exist_ok=True)
+ALLOWED_EXTENSIONS = {'.pdf', '.doc', '.docx', '.txt'}
 
-@router.post("/upload")
+def _validate_extension(filename: str) -> None:
+    if Path(filename).suffix.lower() not in ALLOWED_EXTENSIONS:
+        raise HTTPException(status_code=400, detail="Invalid file type. Only PDF, DOC, DOCX, and TXT files are allowed.")
+
+def _version_file_path(document, version) -> Path:
+    if version.sha256:
+        return blob_path(version.sha256)
+    # Versions uploaded before content addressing live under <folder>/<owner>/<timestamp>_<name>
+    return UPLOAD_DIR / document.folder / document.created_by / version.filename
+
+@router.post("/upload", dependencies=[Depends(limit_by_user("upload"))])
 async def upload_document(
     name: str = Form(...),
     folder: str = Form(...),
@@ -31,43 +40,27 @@ async def upload_document(
     if folder not in ["Applications", "Projects", "Awards", "Reports"]:
         raise HTTPException(status_code=400, detail="Invalid folder")
     
-    # Validate file type
-    allowed_extensions = {'.pdf', '.doc', '.docx', '.txt'}
-    file_extension = Path(file.filename).suffix.lower()
-    if file_extension not in allowed_extensions:
-        raise HTTPException(status_code=400, detail="Invalid file type. Only PDF, DOC, DOCX, and TXT files are allowed.")
-    
-    # Create folder structure
-    folder_path = UPLOAD_DIR / folder / current_user.email
-    folder_path.mkdir(parents=True, exist_ok=True)
-    
-    # Generate unique filename
-    timestamp = str(int(os.path.getmtime(__file__) * 1000))
-    safe_filename = f"{timestamp}_{file.filename}"
-    file_path = folder_path / safe_filename
+    _validate_extension(file.filename)
     
-    # Save file to disk
-    try:
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        
-        # Get actual file size
-        file_size_bytes = os.path.getsize(file_path)
-        file_size = f"{file_size_bytes / 1024:.1f} KB" if file_size_bytes < 1024*1024 else f"{file_size_bytes / (1024*1024):.1f} MB"
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to save file: {str(e)}")
+    stored = await store_upload(db, file)
+    file_size = format_file_size(stored["size"])
     
     # Create document record in database
-    document = await create_document(
-        db, name, folder, safe_filename, current_user.email, file_size, notes
-    )
+    try:
+        document = await create_document(
+            db, name, folder, file.filename, current_user.email, file_size, notes,
+            sha256=stored["sha256"], size_bytes=stored["size"]
+        )
+    except Exception:
+        await release_blob(db, stored["sha256"])
+        raise
     
     return {
         "id": str(document.id), 
         "message": "Document uploaded successfully",
-        "filename": safe_filename,
-        "size": file_size
+        "filename": file.filename,
+        "size": file_size,
+        "sha256": stored["sha256"]
     }
 
 @router.get("/")
@@ -105,8 +98,10 @@ async def list_documents(
 @router.get("/{document_id}/download")
 async def download_document(
     document_id: str,
+    request: Request,
     current_user = Depends(get_current_active_user)
 ):
+    """Download the latest version; supports Range and conditional requests (ETag / If-Modified-Since)"""
     db = await get_database()
     document = await get_document_by_id(db, document_id)
     
@@ -119,18 +114,19 @@ async def download_document(
     
     # Get the latest version
     latest_version = max(document.versions, key=lambda v: v.version_number)
-    file_path = UPLOAD_DIR / document.folder / document.created_by / latest_version.file_name
     
-    if not file_path.exists():
-        raise HTTPException(status_code=404, detail="File not found on disk")
+    download_name = latest_version.filename
+    if not latest_version.sha256 and '_' in download_name:
+        download_name = download_name.split('_', 1)[1]
     
-    return FileResponse(
-        path=file_path,
-        filename=latest_version.file_name.split('_', 1)[1] if '_' in latest_version.file_name else latest_version.file_name,
-        media_type='application/octet-stream'
+    return await send_file(
+        request,
+        _version_file_path(document, latest_version),
+        filename=download_name,
+        etag=latest_version.sha256
     )
 
-@router.post("/{document_id}/upload-version")
+@router.post("/{document_id}/upload-version", dependencies=[Depends(limit_by_user("upload"))])
 async def upload_new_version(
     document_id: str,
     file: UploadFile = File(...),
@@ -147,52 +143,82 @@ async def upload_new_version(
     if current_user.role == "Researcher" and document.created_by != current_user.email:
         raise HTTPException(status_code=403, detail="Access denied")
     
-    # Validate file type
-    allowed_extensions = {'.pdf', '.doc', '.docx', '.txt'}
-    file_extension = Path(file.filename).suffix.lower()
-    if file_extension not in allowed_extensions:
-        raise HTTPException(status_code=400, detail="Invalid file type. Only PDF, DOC, DOCX, and TXT files are allowed.")
-    
-    # Create folder structure
-    folder_path = UPLOAD_DIR / document.folder / document.created_by
-    folder_path.mkdir(parents=True, exist_ok=True)
+    _validate_extension(file.filename)
     
-    # Generate unique filename
-    timestamp = str(int(os.path.getmtime(__file__) * 1000))
-    safe_filename = f"{timestamp}_{file.filename}"
-    file_path = folder_path / safe_filename
-    
-    # Save file to disk
-    try:
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        
-        # Get actual file size
-        file_size_bytes = os.path.getsize(file_path)
-        file_size = f"{file_size_bytes / 1024:.1f} KB" if file_size_bytes < 1024*1024 else f"{file_size_bytes / (1024*1024):.1f} MB"
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to save file: {str(e)}")
+    stored = await store_upload(db, file)
+    file_size = format_file_size(stored["size"])
     
     # Upload new version to database
-    success = await upload_new_version(
-        db, document_id, safe_filename, current_user.email, file_size, notes
+    success = await add_document_version(
+        db, document_id, file.filename, current_user.email, file_size, notes,
+        sha256=stored["sha256"], size_bytes=stored["size"]
     )
     
     if not success:
-        # Clean up file if database operation failed
-        if file_path.exists():
-            os.remove(file_path)
+        await release_blob(db, stored["sha256"])
         raise HTTPException(status_code=500, detail="Failed to create new version")
     
     return {
         "message": "New version uploaded successfully",
-        "filename": safe_filename,
-        "size": file_size
+        "filename": file.filename,
+        "size": file_size,
+        "sha256": stored["sha256"]
     }
 
 @router.get("/stats")
 async def get_stats(current_user = Depends(get_current_active_user)):
     db = await get_database()
     stats = await get_document_stats(db)
-    return stats
\ No newline at end of file
+    return stats
+
+@router.delete("/{document_id}")
+async def remove_document(
+    document_id: str,
+    current_user = Depends(get_current_active_user)
+):
+    db = await get_database()
+    document = await get_document_by_id(db, document_id)
+    
+    if not document:
+        raise HTTPException(status_code=404, detail="Document not found")
+    
+    if current_user.role == "Researcher" and document.created_by != current_user.email:
+        raise HTTPException(status_code=403, detail="Access denied")
+    
+    if not await delete_document(db, document_id):
+        raise HTTPException(status_code=404, detail="Document not found")
+    
+    return {"message": "Document deleted successfully"}
+
+@router.delete("/{document_id}/versions/{version_id}")
+async def remove_document_version(
+    document_id: str,
+    version_id: str,
+    current_user = Depends(get_current_active_user)
+):
+    db = await get_database()
+    document = await get_document_by_id(db, document_id)
+    
+    if not document:
+        raise HTTPException(status_code=404, detail="Document not found")
+    
+    if current_user.role == "Researcher" and document.created_by != current_user.email:
+        raise HTTPException(status_code=403, detail="Access denied")
+    
+    updated_document = await delete_document_version(db, document_id, version_id)
+    if not updated_document:
+        raise HTTPException(status_code=400, detail="Version not found or it is the only version")
+    
+    return {"message": "Version deleted successfully", "current_version": updated_document.current_version}
+
+@router.get("/storage/usage")
+async def get_storage_usage_report(current_user = Depends(require_role("Grants Manager"))):
+    """Disk used by the blob store and how much deduplication saves, overall and per folder"""
+    db = await get_database()
+    return await get_storage_usage(db)
+
+@router.post("/storage/gc")
+async def collect_storage_garbage(current_user = Depends(require_role("Admin"))):
+    """Remove unreferenced blobs left behind by failed uploads or interrupted deletes"""
+    db = await get_database()
+    return {"removed": await collect_garbage(db)}
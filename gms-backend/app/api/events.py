@@ -0,0 +1,71 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from fastapi.security import OAuth2PasswordBearer
+from typing import Optional
+import asyncio
+import json
+import time
+from ..config import settings
+from ..services.event_service import CLOSE, event_bus, is_visible, public_event
+from ..utils.dependencies import get_current_active_user, get_current_user
+from ..utils.security import decode_token
+
+router = APIRouter(prefix="/events", tags=["events"])
+
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login", auto_error=False)
+
+async def get_stream_user(
+    request: Request,
+    header_token: Optional[str] = Depends(optional_oauth2_scheme),
+    access_token: Optional[str] = Query(None, description="Access token, for EventSource clients that cannot send headers")
+):
+    """The authenticated user and when their token expires (the stream ends then)"""
+    token = header_token or access_token
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    user = await get_current_active_user(await get_current_user(request, token))
+    return user, decode_token(token).get("exp", time.time())
+
+def _format(event_type: str, data: dict) -> str:
+    return f"event: {event_type}\ndata: {json.dumps(data)}\n\n"
+
+async def _event_stream(user, expires_at: float):
+    queue = event_bus.subscribe()
+    try:
+        yield f"retry: {settings.event_retry_ms}\n\n"
+        while True:
+            remaining = expires_at - time.time()
+            if remaining <= 0:
+                # The client reconnects with a refreshed token
+                yield _format("token_expired", {})
+                return
+            try:
+                event = await asyncio.wait_for(queue.get(), min(settings.event_heartbeat_seconds, remaining))
+            except asyncio.TimeoutError:
+                # Comment line: keeps proxies from closing an idle connection
+                yield ": ping\n\n"
+                continue
+            if event is CLOSE:
+                return
+            if is_visible(event, user):
+                yield _format(event["type"], public_event(event))
+    finally:
+        event_bus.unsubscribe(queue)
+
+@router.get("/stream")
+async def stream_events(stream_user = Depends(get_stream_user)):
+    """Server-Sent Events for application and project changes visible to the current user.
+
+    Events are application.created|updated|deleted and project.created|updated|deleted with the
+    id and new status; clients refetch just that item instead of polling the lists.
+    """
+    user, expires_at = stream_user
+    return StreamingResponse(
+        _event_stream(user, expires_at),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
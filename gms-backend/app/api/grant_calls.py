@@ -1,24 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from typing import List, Optional
+from datetime import date
 from ..db_config import get_database
+from ..models.grant_call import GrantType
 from ..schemas.grant_call import GrantCallCreate, GrantCallUpdate, GrantCallResponse
 from ..services.grant_call_service import (
-    create_grant_call, get_all_grant_calls, get_grant_call_by_id,
-    get_grant_calls_by_type, get_open_grant_calls, update_grant_call,
-    toggle_grant_call_status, delete_grant_call
+    GRANT_CALL_STATUSES, GRANT_CALL_VISIBILITIES, build_grant_call_query, build_grant_call_sort,
+    canonical_choice, create_grant_call, get_grant_call_by_id, get_open_grant_calls,
+    search_grant_calls, update_grant_call, toggle_grant_call_status, delete_grant_call
 )
+from ..services.award_letter_service import AWARD_LETTER_JOB_TYPE, request_award_letters
+from ..services.job_service import get_job, serialize_job
 from ..utils.dependencies import get_current_active_user, require_role
 
 router = APIRouter(prefix="/grant-calls", tags=["grant calls"])
 
-@router.post("/", response_model=GrantCallResponse)
-async def create_new_grant_call(
-    grant_call_data: GrantCallCreate,
-    current_user = Depends(require_role("Grants Manager"))
-):
-   
-    db = await get_database()
-    grant_call = await create_grant_call(db, grant_call_data)
+def build_grant_call_response(grant_call) -> GrantCallResponse:
     return GrantCallResponse(
         id=str(grant_call.id),
         title=grant_call.title,
@@ -34,42 +31,64 @@ async def create_new_grant_call(
         updated_at=grant_call.updated_at.isoformat() if grant_call.updated_at else ""
     )
 
+@router.post("/", response_model=GrantCallResponse)
+async def create_new_grant_call(
+    grant_call_data: GrantCallCreate,
+    current_user = Depends(require_role("Grants Manager"))
+):
+   
+    db = await get_database()
+    grant_call = await create_grant_call(db, grant_call_data)
+    return build_grant_call_response(grant_call)
+
 @router.get("/", response_model=List[GrantCallResponse])
 async def list_grant_calls(
+    response: Response,
     type_filter: Optional[str] = Query(None, description="Filter by grant type"),
     status_filter: Optional[str] = Query(None, description="Filter by status (Open/Closed)"),
+    sponsor: Optional[str] = Query(None, description="Filter by sponsor (exact name)"),
+    visibility: Optional[str] = Query(None, description="Filter by visibility (Public/Restricted)"),
+    deadline_from: Optional[date] = Query(None, description="Deadline on or after this date"),
+    deadline_to: Optional[date] = Query(None, description="Deadline on or before this date"),
+    sort: Optional[str] = Query(None, description="deadline or title; prefix with - for descending"),
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=500),
     current_user = Depends(get_current_active_user)
 ):
-
+    """Grant calls matching all the given filters; X-Total-Count has the number before paging"""
+    status = canonical_choice(status_filter, GRANT_CALL_STATUSES)
+    grant_type = canonical_choice(type_filter, [choice.value for choice in GrantType])
+    visibility_value = canonical_choice(visibility, GRANT_CALL_VISIBILITIES)
+    if status_filter and not status:
+        raise HTTPException(status_code=400, detail=f"Invalid status: {status_filter}")
+    if type_filter and not grant_type:
+        raise HTTPException(status_code=400, detail=f"Invalid grant type: {type_filter}")
+    if visibility and not visibility_value:
+        raise HTTPException(status_code=400, detail=f"Invalid visibility: {visibility}")
+    sort_spec = build_grant_call_sort(sort or "deadline")
+    if sort_spec is None:
+        raise HTTPException(status_code=400, detail=f"Invalid sort: {sort}")
 
     db = await get_database()
-    
-    if status_filter == "Open":
+
+    filtered = any([grant_type, sponsor, visibility_value, deadline_from, deadline_to, sort, offset, limit])
+    if status == "Open" and not filtered:
+        # The researcher catalog, served from the per-worker cache
         grant_calls = await get_open_grant_calls(db)
-    elif type_filter:
-        grant_calls = await get_grant_calls_by_type(db, type_filter)
+        total = len(grant_calls)
     else:
-        grant_calls = await get_all_grant_calls(db)
-
-    return_data = [
-        GrantCallResponse(
-            id=str(grant_call.id),
-            title=grant_call.title,
-            type=grant_call.type,
-            sponsor=grant_call.sponsor,
-            deadline=grant_call.deadline,
-            scope=grant_call.scope,
-            eligibility=grant_call.eligibility,
-            requirements=grant_call.requirements,
-            status=grant_call.status,
-            visibility=grant_call.visibility,
-            created_at=grant_call.created_at.isoformat() if grant_call.created_at else "",
-            updated_at=grant_call.updated_at.isoformat() if grant_call.updated_at else ""
+        query = build_grant_call_query(
+            status=status,
+            grant_type=grant_type,
+            sponsor=sponsor,
+            visibility=visibility_value,
+            deadline_from=deadline_from,
+            deadline_to=deadline_to
         )
-        for grant_call in grant_calls
-    ]
-  
-    return return_data
+        grant_calls, total = await search_grant_calls(db, query, sort_spec, offset, limit)
+
+    response.headers["X-Total-Count"] = str(total)
+    return [build_grant_call_response(grant_call) for grant_call in grant_calls]
 
 @router.get("/{grant_call_id}", response_model=GrantCallResponse)
 async def get_grant_call(
@@ -81,20 +100,7 @@ async def get_grant_call(
     if not grant_call:
         raise HTTPException(status_code=404, detail="Grant call not found")
     
-    return GrantCallResponse(
-        id=str(grant_call.id),
-        title=grant_call.title,
-        type=grant_call.type,
-        sponsor=grant_call.sponsor,
-        deadline=grant_call.deadline,
-        scope=grant_call.scope,
-        eligibility=grant_call.eligibility,
-        requirements=grant_call.requirements,
-        status=grant_call.status,
-        visibility=grant_call.visibility,
-        created_at=grant_call.created_at.isoformat() if grant_call.created_at else "",
-        updated_at=grant_call.updated_at.isoformat() if grant_call.updated_at else ""
-    )
+    return build_grant_call_response(grant_call)
 
 @router.put("/{grant_call_id}", response_model=GrantCallResponse)
 async def update_grant_call_info(
@@ -107,20 +113,7 @@ async def update_grant_call_info(
     if not grant_call:
         raise HTTPException(status_code=404, detail="Grant call not found")
     
-    return GrantCallResponse(
-        id=str(grant_call.id),
-        title=grant_call.title,
-        type=grant_call.type,
-        sponsor=grant_call.sponsor,
-        deadline=grant_call.deadline,
-        scope=grant_call.scope,
-        eligibility=grant_call.eligibility,
-        requirements=grant_call.requirements,
-        status=grant_call.status,
-        visibility=grant_call.visibility,
-        created_at=grant_call.created_at.isoformat() if grant_call.created_at else "",
-        updated_at=grant_call.updated_at.isoformat() if grant_call.updated_at else ""
-    )
+    return build_grant_call_response(grant_call)
 
 @router.patch("/{grant_call_id}/toggle-status", response_model=GrantCallResponse)
 async def toggle_status(
@@ -132,20 +125,7 @@ async def toggle_status(
     if not grant_call:
         raise HTTPException(status_code=404, detail="Grant call not found")
     
-    return GrantCallResponse(
-        id=str(grant_call.id),
-        title=grant_call.title,
-        type=grant_call.type,
-        sponsor=grant_call.sponsor,
-        deadline=grant_call.deadline,
-        scope=grant_call.scope,
-        eligibility=grant_call.eligibility,
-        requirements=grant_call.requirements,
-        status=grant_call.status,
-        visibility=grant_call.visibility,
-        created_at=grant_call.created_at.isoformat() if grant_call.created_at else "",
-        updated_at=grant_call.updated_at.isoformat() if grant_call.updated_at else ""
-    )
+    return build_grant_call_response(grant_call)
 
 @router.delete("/{grant_call_id}")
 async def delete_grant_call_endpoint(
@@ -157,4 +137,40 @@ async def delete_grant_call_endpoint(
     if not success:
         raise HTTPException(status_code=404, detail="Grant call not found")
     
-    return {"message": "Grant call deleted successfully"}
\ No newline at end of file
+    return {"message": "Grant call deleted successfully"}
+
+@router.post("/{grant_call_id}/award-letters", status_code=202)
+async def generate_grant_call_award_letters(
+    grant_call_id: str,
+    current_user = Depends(require_role("Grants Manager"))
+):
+    """Render award letters for every sign-off approved application in the call, in parallel"""
+    db = await get_database()
+    grant_call = await get_grant_call_by_id(db, grant_call_id)
+    if not grant_call:
+        raise HTTPException(status_code=404, detail="Grant call not found")
+    
+    application_ids = [
+        str(doc["_id"])
+        async for doc in db.applications.find({"grantId": grant_call_id, "status": "signoff_approved"}, {"_id": 1})
+    ]
+    if not application_ids:
+        raise HTTPException(status_code=400, detail="No sign-off approved applications in this grant call")
+    
+    job = await request_award_letters(db, application_ids, current_user.email, {"grant_call_id": grant_call_id})
+    if job is None:
+        return {"message": "Award letters are up to date", "job_id": None, "applications": len(application_ids)}
+    return {"message": "Award letter generation started", "job_id": str(job["_id"]), "applications": len(application_ids)}
+
+@router.get("/{grant_call_id}/award-letters/{job_id}")
+async def get_grant_call_award_letters_job(
+    grant_call_id: str,
+    job_id: str,
+    current_user = Depends(require_role("Grants Manager"))
+):
+    """Progress of a batch award letter job: rendered, cached and failed counts"""
+    db = await get_database()
+    job = await get_job(db, job_id)
+    if not job or job["type"] != AWARD_LETTER_JOB_TYPE or job["params"].get("grant_call_id") != grant_call_id:
+        raise HTTPException(status_code=404, detail="Award letter job not found")
+    return serialize_job(job)
@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Depends, HTTPException
+from ..utils.dependencies import get_current_active_user, get_database
+from ..services.job_service import get_job, serialize_job
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+@router.get("/{job_id}")
+async def get_job_status(
+    job_id: str,
+    current_user = Depends(get_current_active_user)
+):
+    """Status, progress, attempts and errors of a background job"""
+    db = await get_database()
+    job = await get_job(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    # Staff see every job; others only the jobs they started
+    if current_user.role not in ["Grants Manager", "Admin"] and job.get("created_by") != current_user.email:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    return serialize_job(job)
@@ -1,13 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
-from bson import ObjectId
+from datetime import date, datetime
 from ..db_config import get_database
 from ..services.project_service import (
     create_project, get_all_projects, get_project_by_id, get_projects_by_user,
     update_project_status, add_milestone, submit_requisition, add_partner,
     upload_progress_report, upload_final_report, initiate_vc_signoff, get_project_by_vc_token
 )
+from ..services.event_service import notify_change
+from ..services.id_service import resolve_id
+from ..services.export_service import EXPORT_FORMATS, stream_projects_export
+from ..services.job_service import PRIORITY_HIGH, enqueue_job
+from ..services.milestone_service import OVERDUE_JOB_TYPE
 from ..utils.dependencies import get_current_active_user, require_role
+from ..utils.rate_limit import limit_by_client, limit_by_user
 from pydantic import BaseModel
 
 router = APIRouter(prefix="/projects", tags=["projects"])
@@ -60,6 +67,45 @@ async def create_new_project(
     )
     return {"id": str(project.id), "message": "Project created successfully"}
 
+def build_project_summary(project) -> dict:
+    """List view of a project: milestones and requisitions, no reports or partners"""
+    return {
+        "id": str(project.id),
+        "applicationId": project.application_id,
+        "title": project.title,
+        "status": project.status,
+        "startDate": project.start_date,
+        "endDate": project.end_date,
+        "milestones": [
+            {
+                "id": m.id,
+                "title": m.title,
+                "dueDate": m.due_date,
+                "status": m.status,
+                "description": m.description,
+                "progressReportUploaded": m.progress_report_uploaded or False,
+                "progressReportDate": m.progress_report_date,
+                "progressReportFilename": m.progress_report_filename,
+                "isOverdue": m.is_overdue or False
+            } for m in project.milestones
+        ],
+        "requisitions": [
+            {
+                "id": r.id,
+                "milestoneId": r.milestone_id,
+                "amount": r.amount,
+                "requestedDate": r.requested_date,
+                "status": r.status,
+                "notes": r.notes,
+                "reviewedBy": r.reviewed_by,
+                "reviewedDate": r.reviewed_date,
+                "reviewNotes": r.review_notes
+            } for r in project.requisitions
+        ] if project.requisitions else [],
+        "createdAt": project.created_at.isoformat(),
+        "updatedAt": project.updated_at.isoformat()
+    }
+
 @router.get("/")
 async def list_projects(current_user = Depends(get_current_active_user)):
     db = await get_database()
@@ -69,45 +115,43 @@ async def list_projects(current_user = Depends(get_current_active_user)):
     else:
         projects = await get_all_projects(db)
     
-    return [
-        {
-            "id": str(project.id),
-            "applicationId": project.application_id,
-            "title": project.title,
-            "status": project.status,
-            "startDate": project.start_date,
-            "endDate": project.end_date,
-            "milestones": [
-                {
-                    "id": m.id,
-                    "title": m.title,
-                    "dueDate": m.due_date,
-                    "status": m.status,
-                    "description": m.description,
-                    "progressReportUploaded": m.progress_report_uploaded or False,
-                    "progressReportDate": m.progress_report_date,
-                    "progressReportFilename": m.progress_report_filename,
-                    "isOverdue": m.is_overdue or False
-                } for m in project.milestones
-            ],
-            "requisitions": [
-                {
-                    "id": r.id,
-                    "milestoneId": r.milestone_id,
-                    "amount": r.amount,
-                    "requestedDate": r.requested_date,
-                    "status": r.status,
-                    "notes": r.notes,
-                    "reviewedBy": r.reviewed_by,
-                    "reviewedDate": r.reviewed_date,
-                    "reviewNotes": r.review_notes
-                } for r in project.requisitions
-            ] if project.requisitions else [],
-            "createdAt": project.created_at.isoformat(),
-            "updatedAt": project.updated_at.isoformat()
-        }
-        for project in projects
-    ]
+    return [build_project_summary(project) for project in projects]
+
+@router.get("/export")
+async def export_projects(
+    format: str = Query("csv", description="Export format (csv or ndjson)"),
+    grant_call_id: Optional[str] = Query(None, description="Filter by the grant call of the source application"),
+    status_filter: Optional[str] = Query(None, description="Filter by status"),
+    start_from: Optional[date] = Query(None, description="Starting on or after this date"),
+    start_to: Optional[date] = Query(None, description="Starting on or before this date"),
+    current_user = Depends(require_role("Grants Manager"))
+):
+    """Stream projects as CSV or NDJSON for finance and reporting"""
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Invalid export format: {format}")
+
+    db = await get_database("reporting")
+    content = stream_projects_export(
+        db, format,
+        grant_call_id=grant_call_id,
+        status=status_filter,
+        date_from=start_from,
+        date_to=start_to
+    )
+
+    filename = f"projects_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.{format}"
+    return StreamingResponse(
+        content,
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@router.post("/milestones/recompute-overdue", status_code=202)
+async def recompute_overdue(current_user = Depends(require_role("Grants Manager"))):
+    """Recompute milestone overdue flags now instead of waiting for the scheduled run; poll /jobs/{job_id}"""
+    db = await get_database()
+    job = await enqueue_job(db, OVERDUE_JOB_TYPE, current_user.email, priority=PRIORITY_HIGH)
+    return {"message": "Overdue recomputation started", "job_id": str(job["_id"])}
 
 @router.get("/{project_id}")
 async def get_project(
@@ -236,8 +280,9 @@ async def submit_fund_requisition(
     
     # Check if user has access to this project
     if current_user.role == "Researcher":
+        object_id = await resolve_id(db, "projects", project_id)
         user_projects = await get_projects_by_user(db, current_user.email)
-        if not any(str(p.id) == project_id for p in user_projects):
+        if not any(p.id == object_id for p in user_projects):
             raise HTTPException(status_code=403, detail="Access denied")
     
     project = await submit_requisition(db, project_id, requisition_data.dict())
@@ -256,8 +301,9 @@ async def add_project_partner(
     
     # Check if user has access to this project
     if current_user.role == "Researcher":
+        object_id = await resolve_id(db, "projects", project_id)
         user_projects = await get_projects_by_user(db, current_user.email)
-        if not any(str(p.id) == project_id for p in user_projects):
+        if not any(p.id == object_id for p in user_projects):
             raise HTTPException(status_code=403, detail="Access denied")
     
     project = await add_partner(db, project_id, partner_data.dict())
@@ -266,7 +312,7 @@ async def add_project_partner(
     
     return {"message": "Partner added successfully"}
 
-@router.post("/{project_id}/milestones/{milestone_id}/progress-report")
+@router.post("/{project_id}/milestones/{milestone_id}/progress-report", dependencies=[Depends(limit_by_user("upload"))])
 async def upload_milestone_progress_report(
     project_id: str,
     milestone_id: str,
@@ -277,8 +323,9 @@ async def upload_milestone_progress_report(
     
     # Check if user has access to this project
     if current_user.role == "Researcher":
+        object_id = await resolve_id(db, "projects", project_id)
         user_projects = await get_projects_by_user(db, current_user.email)
-        if not any(str(p.id) == project_id for p in user_projects):
+        if not any(p.id == object_id for p in user_projects):
             raise HTTPException(status_code=403, detail="Access denied")
     
     # In a real implementation, you would save the file to storage
@@ -289,7 +336,7 @@ async def upload_milestone_progress_report(
     
     return {"message": "Progress report uploaded successfully"}
 
-@router.post("/{project_id}/final-report/{report_type}")
+@router.post("/{project_id}/final-report/{report_type}", dependencies=[Depends(limit_by_user("upload"))])
 async def upload_project_final_report(
     project_id: str,
     report_type: str,  # narrative or financial
@@ -303,8 +350,9 @@ async def upload_project_final_report(
     
     # Check if user has access to this project
     if current_user.role == "Researcher":
+        object_id = await resolve_id(db, "projects", project_id)
         user_projects = await get_projects_by_user(db, current_user.email)
-        if not any(str(p.id) == project_id for p in user_projects):
+        if not any(p.id == object_id for p in user_projects):
             raise HTTPException(status_code=403, detail="Access denied")
     
     project = await upload_final_report(db, project_id, report_type, file.filename)
@@ -325,7 +373,7 @@ async def initiate_vc_sign_off(
     
     return {"message": "VC sign-off initiated", "token": token}
 
-@router.get("/vc-signoff/{token}")
+@router.get("/vc-signoff/{token}", dependencies=[Depends(limit_by_client("token_page"))])
 async def get_project_for_vc_signoff(token: str):
     db = await get_database()
     project = await get_project_by_vc_token(db, token)
@@ -345,7 +393,7 @@ async def get_project_for_vc_signoff(token: str):
         "updated_at": project.updated_at.isoformat()
     }
 
-@router.post("/vc-signoff/{token}/submit")
+@router.post("/vc-signoff/{token}/submit", dependencies=[Depends(limit_by_client("token_page"))])
 async def submit_vc_sign_off(
     token: str,
     submission: VCSignOffSubmission
@@ -378,6 +426,7 @@ async def submit_vc_sign_off(
     if result.modified_count == 0:
         raise HTTPException(status_code=500, detail="Failed to update project")
     
+    notify_change(db, "projects", project.id)
     return {"message": "VC sign-off submitted successfully", "status": update_data["closure_workflow.status"]}
 
 @router.put("/{project_id}/milestones/{milestone_id}")
@@ -388,11 +437,14 @@ async def update_milestone(
     current_user = Depends(get_current_active_user)
 ):
     db = await get_database()
+    object_id = await resolve_id(db, "projects", project_id)
+    if object_id is None:
+        raise HTTPException(status_code=404, detail="Project not found")
     
     # Check if user has access to this project
     if current_user.role == "Researcher":
         user_projects = await get_projects_by_user(db, current_user.email)
-        if not any(str(p.id) == project_id for p in user_projects):
+        if not any(p.id == object_id for p in user_projects):
             raise HTTPException(status_code=403, detail="Access denied")
     
     from datetime import datetime
@@ -402,13 +454,14 @@ async def update_milestone(
     update_fields["updated_at"] = datetime.utcnow()
     
     result = await db.projects.update_one(
-        {"_id": ObjectId(project_id), "milestones.id": milestone_id},
+        {"_id": object_id, "milestones.id": milestone_id},
         {"$set": update_fields}
     )
     
     if result.modified_count == 0:
         raise HTTPException(status_code=404, detail="Project or milestone not found")
     
+    notify_change(db, "projects", object_id)
     return {"message": "Milestone updated successfully"}
 
 @router.delete("/{project_id}/partners/{partner_id}")
@@ -418,18 +471,21 @@ async def remove_partner(
     current_user = Depends(get_current_active_user)
 ):
     db = await get_database()
+    object_id = await resolve_id(db, "projects", project_id)
+    if object_id is None:
+        raise HTTPException(status_code=404, detail="Project not found")
     
     # Check if user has access to this project
     if current_user.role == "Researcher":
         user_projects = await get_projects_by_user(db, current_user.email)
-        if not any(str(p.id) == project_id for p in user_projects):
+        if not any(p.id == object_id for p in user_projects):
             raise HTTPException(status_code=403, detail="Access denied")
     
     from datetime import datetime
     
     # Remove partner from project
     result = await db.projects.update_one(
-        {"_id": ObjectId(project_id)},
+        {"_id": object_id},
         {
             "$pull": {"partners": {"id": partner_id}},
             "$set": {"updated_at": datetime.utcnow()}
@@ -439,6 +495,7 @@ async def remove_partner(
     if result.modified_count == 0:
         raise HTTPException(status_code=404, detail="Project or partner not found")
     
+    notify_change(db, "projects", object_id)
     return {"message": "Partner removed successfully"}
 
 @router.patch("/{project_id}/requisitions/{requisition_id}/status")
@@ -449,12 +506,15 @@ async def update_requisition_status(
     current_user = Depends(require_role("Grants Manager"))
 ):
     db = await get_database()
+    object_id = await resolve_id(db, "projects", project_id)
+    if object_id is None:
+        raise HTTPException(status_code=404, detail="Project not found")
     
     from datetime import datetime
     
     # Update requisition status in project
     result = await db.projects.update_one(
-        {"_id": ObjectId(project_id), "requisitions.id": requisition_id},
+        {"_id": object_id, "requisitions.id": requisition_id},
         {
             "$set": {
                 "requisitions.$.status": status_update.status,
@@ -469,6 +529,7 @@ async def update_requisition_status(
     if result.modified_count == 0:
         raise HTTPException(status_code=404, detail="Project or requisition not found")
     
+    notify_change(db, "projects", object_id)
     return {"message": f"Requisition {status_update.status} successfully"}
 
 @router.get("/{project_id}/progress-submissions")
@@ -588,13 +649,14 @@ async def review_final_report(
     }
     
     result = await db.projects.update_one(
-        {"_id": ObjectId(project_id)},
+        {"_id": project.id},
         {"$set": update_data}
     )
     
     if result.modified_count == 0:
         raise HTTPException(status_code=500, detail="Failed to update final report review")
     
+    notify_change(db, "projects", project.id)
     return {"message": f"Final report {status}", "status": status}
 
 @router.put("/{project_id}/closure/trigger")
@@ -621,7 +683,7 @@ async def trigger_closure_process(
     }
     
     result = await db.projects.update_one(
-        {"_id": ObjectId(project_id)},
+        {"_id": project.id},
         {
             "$set": {
                 "closure_process": closure_data,
@@ -633,4 +695,5 @@ async def trigger_closure_process(
     if result.modified_count == 0:
         raise HTTPException(status_code=500, detail="Failed to trigger closure process")
     
+    notify_change(db, "projects", project.id)
     return {"message": "Closure process initiated successfully", "status": "pending"}
\ No newline at end of file
@@ -1,9 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException
 from typing import List, Optional
 from datetime import datetime
-from bson import ObjectId
 from ..utils.dependencies import get_current_active_user, get_database
+from ..utils.rate_limit import limit_by_client
 from ..services.application_service import get_application_by_id
+from ..services.event_service import notify_change
+from ..services.notification_service import review_request_notification, write_with_outbox
 from ..models.application import ReviewHistoryEntry
 import secrets
 import string
@@ -46,27 +48,36 @@ async def assign_reviewers(
             "assigned_at": datetime.utcnow().isoformat()
         })
     
-    # Update application with assigned reviewers and tokens
-    result = await db.applications.update_one(
-        {"_id": ObjectId(application_id)},
-        {
-            "$set": {
-                "assigned_reviewers": reviewer_emails,
-                "review_tokens": review_tokens
-            }
-        }
-    )
+    notifications = [
+        review_request_notification(review_token["email"], application.proposal_title, review_token["token"])
+        for review_token in review_tokens
+    ]
     
-    if result.modified_count == 0:
+    # Update application with assigned reviewers and tokens, and email each reviewer their link
+    async def write(session):
+        result = await db.applications.update_one(
+            {"_id": application.id},
+            {
+                "$set": {
+                    "assigned_reviewers": reviewer_emails,
+                    "review_tokens": review_tokens
+                }
+            },
+            session=session
+        )
+        return result.modified_count
+    
+    if not await write_with_outbox(db, write, notifications):
         raise HTTPException(status_code=400, detail="Failed to assign reviewers")
     
+    notify_change(db, "applications", application.id)
     return {
         "message": "Reviewers assigned successfully",
         "reviewer_count": len(reviewer_emails),
         "review_tokens": review_tokens
     }
 
-@router.get("/application/{token}")
+@router.get("/application/{token}", dependencies=[Depends(limit_by_client("token_page"))])
 async def get_application_by_review_token(token: str):
     """Get application details by review token (for reviewers)"""
     db = await get_database()
@@ -105,7 +116,7 @@ async def get_reviewer_feedback(
         raise HTTPException(status_code=403, detail="Access denied")
     
     # Get application with review history
-    app_data = await db.applications.find_one({"_id": ObjectId(application_id)})
+    app_data = await db.applications.find_one({"_id": application.id})
     
     return {
         "application_id": application_id,
@@ -7,6 +7,34 @@ load_dotenv()
 class Settings(BaseSettings):
     mongodb_uri: str = os.getenv("MONGODB_URI", "mongodb://localhost:27017")
     database_name: str = os.getenv("DATABASE_NAME", "grants_management")
+    
+    # MongoDB connection pool
+    mongodb_max_pool_size: int = int(os.getenv("MONGODB_MAX_POOL_SIZE", "100"))
+    mongodb_min_pool_size: int = int(os.getenv("MONGODB_MIN_POOL_SIZE", "5"))
+    mongodb_max_idle_time_ms: int = int(os.getenv("MONGODB_MAX_IDLE_TIME_MS", "300000"))
+    mongodb_wait_queue_timeout_ms: int = int(os.getenv("MONGODB_WAIT_QUEUE_TIMEOUT_MS", "5000"))
+    mongodb_server_selection_timeout_ms: int = int(os.getenv("MONGODB_SERVER_SELECTION_TIMEOUT_MS", "5000"))
+    # Wire compressors in preference order; ones whose library is not installed are skipped
+    mongodb_compressors: str = os.getenv("MONGODB_COMPRESSORS", "zstd,snappy,zlib")
+    # Read preference per workload class; everything else uses the client default (primary)
+    mongodb_read_preferences: dict = {
+        "reporting": os.getenv("MONGODB_READ_PREFERENCE_REPORTING", "secondaryPreferred"),
+    }
+    # Logging: "json" for production, "text" for local development
+    log_level: str = os.getenv("LOG_LEVEL", "info")
+    log_format: str = os.getenv("LOG_FORMAT", "json")
+    log_queue_size: int = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+    
+    # Tracing: "none", "file" (OTLP/JSON lines in TRACE_FILE) or "otlp" (POST to a collector)
+    trace_exporter: str = os.getenv("TRACE_EXPORTER", "none")
+    trace_file: str = os.getenv("TRACE_FILE", "traces.jsonl")
+    trace_otlp_endpoint: str = os.getenv("TRACE_OTLP_ENDPOINT", "http://localhost:4318/v1/traces")
+    trace_sample_rate: float = float(os.getenv("TRACE_SAMPLE_RATE", "1.0"))
+    trace_service_name: str = os.getenv("TRACE_SERVICE_NAME", "gms-backend")
+    
+    # Commands slower than this are logged with their filter shape (and query plan if enabled)
+    slow_query_threshold_ms: float = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "100"))
+    slow_query_explain: bool = os.getenv("SLOW_QUERY_EXPLAIN", "true").lower() == "true"
     secret_key: str = os.getenv("SECRET_KEY", "your-super-secret-key-change-in-production")
     algorithm: str = os.getenv("ALGORITHM", "HS256")
     access_token_expire_minutes: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
@@ -14,6 +42,75 @@ class Settings(BaseSettings):
     backend_url: str = os.getenv("BACKEND_URL", "http://localhost:8000")
     frontend_url: str = os.getenv("FRONTEND_URL", "http://localhost:8080")
     
+    # Document library storage; uploads over the size limit are rejected with 413
+    upload_directory: str = os.getenv("UPLOAD_DIRECTORY", "uploads")
+    upload_max_bytes: int = int(os.getenv("UPLOAD_MAX_BYTES", str(25 * 1024 * 1024)))
+    
+    # Processes rendering award letter PDFs, per API worker
+    pdf_render_workers: int = int(os.getenv("PDF_RENDER_WORKERS", "2"))
+    
+    # Background jobs: worker tasks per API process, how long a claimed job stays invisible to
+    # other workers without a heartbeat, retry policy, and how long finished jobs are kept
+    job_worker_concurrency: int = int(os.getenv("JOB_WORKER_CONCURRENCY", "2"))
+    job_visibility_timeout_seconds: int = int(os.getenv("JOB_VISIBILITY_TIMEOUT_SECONDS", "300"))
+    job_poll_interval_seconds: float = float(os.getenv("JOB_POLL_INTERVAL_SECONDS", "2"))
+    job_max_attempts: int = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+    job_retry_base_seconds: float = float(os.getenv("JOB_RETRY_BASE_SECONDS", "10"))
+    job_retention_days: int = int(os.getenv("JOB_RETENTION_DAYS", "30"))
+    
+    # How often milestone overdue flags are recomputed
+    milestone_overdue_interval_seconds: int = int(os.getenv("MILESTONE_OVERDUE_INTERVAL_SECONDS", "3600"))
+    
+    # Grant calls past their deadline are closed within this interval; optionally their
+    # submitted applications move to under_review at the same time
+    grant_call_close_interval_seconds: int = int(os.getenv("GRANT_CALL_CLOSE_INTERVAL_SECONDS", "60"))
+    grant_call_close_starts_review: bool = os.getenv("GRANT_CALL_CLOSE_STARTS_REVIEW", "false").lower() == "true"
+    grant_call_cache_ttl_seconds: int = int(os.getenv("GRANT_CALL_CACHE_TTL_SECONDS", "60"))
+    
+    # Notification delivery: "log" only logs messages (development), "smtp" sends them.
+    # Each API process keeps SMTP_POOL_SIZE connections, sends up to SMTP_BATCH_SIZE messages
+    # per connection checkout and at most SMTP_RATE_PER_SECOND messages per second.
+    notification_backend: str = os.getenv("NOTIFICATION_BACKEND", "log")
+    smtp_host: str = os.getenv("SMTP_HOST", "localhost")
+    smtp_port: int = int(os.getenv("SMTP_PORT", "25"))
+    smtp_username: str = os.getenv("SMTP_USERNAME", "")
+    smtp_password: str = os.getenv("SMTP_PASSWORD", "")
+    smtp_use_tls: bool = os.getenv("SMTP_USE_TLS", "false").lower() == "true"
+    smtp_starttls: bool = os.getenv("SMTP_STARTTLS", "false").lower() == "true"
+    smtp_from: str = os.getenv("SMTP_FROM", "noreply@grants.edu")
+    smtp_timeout_seconds: float = float(os.getenv("SMTP_TIMEOUT_SECONDS", "10"))
+    smtp_pool_size: int = int(os.getenv("SMTP_POOL_SIZE", "2"))
+    smtp_batch_size: int = int(os.getenv("SMTP_BATCH_SIZE", "50"))
+    smtp_rate_per_second: float = float(os.getenv("SMTP_RATE_PER_SECOND", "10"))
+    notification_max_attempts: int = int(os.getenv("NOTIFICATION_MAX_ATTEMPTS", "5"))
+    notification_retry_base_seconds: float = float(os.getenv("NOTIFICATION_RETRY_BASE_SECONDS", "30"))
+    notification_lease_seconds: int = int(os.getenv("NOTIFICATION_LEASE_SECONDS", "300"))
+    notification_poll_interval_seconds: float = float(os.getenv("NOTIFICATION_POLL_INTERVAL_SECONDS", "2"))
+    # Recipient of project closure sign-off requests; empty disables those emails
+    vc_signoff_email: str = os.getenv("VC_SIGNOFF_EMAIL", "")
+    
+    # Server-Sent Events: per-client buffer (slower clients are disconnected), keep-alive
+    # interval, and the reconnect delay suggested to clients
+    event_queue_size: int = int(os.getenv("EVENT_QUEUE_SIZE", "256"))
+    event_heartbeat_seconds: float = float(os.getenv("EVENT_HEARTBEAT_SECONDS", "15"))
+    event_retry_ms: int = int(os.getenv("EVENT_RETRY_MS", "5000"))
+    
+    # Cross-worker bus: capped collection size and how long each worker's cursor waits for new
+    # messages (the upper bound on how stale another worker's caches can be)
+    bus_size_bytes: int = int(os.getenv("BUS_SIZE_BYTES", str(1024 * 1024)))
+    bus_await_ms: int = int(os.getenv("BUS_AWAIT_MS", "500"))
+    # Users are cached by email for the auth lookup on every request
+    user_cache_ttl_seconds: int = int(os.getenv("USER_CACHE_TTL_SECONDS", "60"))
+    # Legacy string ids (proj_001, ...) remembered per worker as their _id
+    id_alias_cache_size: int = int(os.getenv("ID_ALIAS_CACHE_SIZE", "4096"))
+    
+    # Rate limiting ("memory" is per worker process, "mongo" is shared across workers)
+    rate_limit_backend: str = os.getenv("RATE_LIMIT_BACKEND", "memory")
+    rate_limit_max_keys: int = int(os.getenv("RATE_LIMIT_MAX_KEYS", "10000"))
+    rate_limit_login_attempts: int = int(os.getenv("RATE_LIMIT_LOGIN_ATTEMPTS", "5"))
+    rate_limit_token_page_requests: int = int(os.getenv("RATE_LIMIT_TOKEN_PAGE_REQUESTS", "30"))
+    rate_limit_upload_requests: int = int(os.getenv("RATE_LIMIT_UPLOAD_REQUESTS", "20"))
+    
     # CORS settings
     allowed_origins: list = ["*"
     ]
@@ -0,0 +1,120 @@
+from pymongo import monitoring
+from contextvars import ContextVar
+from typing import Optional, Dict, Any, List
+import logging
+import threading
+
+from ..config import settings
+
+slow_query_logger = logging.getLogger("gms.slow_query")
+
+# Commands issued by the driver itself or by the explain step; never counted as slow
+_IGNORED_COMMANDS = {"explain", "hello", "ismaster", "isMaster", "saslStart", "saslContinue", "endSessions"}
+
+# Driver-added fields that must be stripped before a command can be re-run under explain
+_SESSION_FIELDS = {"$db", "lsid", "$clusterTime", "txnNumber", "$readPreference", "autocommit", "startTransaction"}
+
+# Most slow commands kept per request; the count and total time still cover everything
+MAX_SLOW_COMMANDS = 20
+
+def _filter_shape(value: Any) -> Any:
+    """Replace filter values with their type names so logs keep the query shape but not the data"""
+    if isinstance(value, dict):
+        return {key: _filter_shape(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_filter_shape(item) for item in value[:5]]
+    return type(value).__name__
+
+def _command_filter(command: dict) -> Any:
+    """The part of a command that decides which documents it touches"""
+    for key in ("filter", "query", "pipeline"):
+        if key in command:
+            return command[key]
+    # update/delete carry their filters per statement
+    statements = command.get("updates") or command.get("deletes")
+    if statements:
+        return statements[0].get("q", {})
+    return {}
+
+def log_slow_command(slow_command: Dict[str, Any], **context) -> None:
+    """Emit one structured slow-query record"""
+    record = {key: value for key, value in slow_command.items() if not key.startswith("_")}
+    record.update(context)
+    slow_query_logger.warning("Slow %s on %s", record["command"], record["collection"], extra={"slow_query": record})
+
+class RequestDbStats:
+    """Database work done on behalf of one request"""
+    __slots__ = ("command_count", "total_ms", "slow_commands", "_lock")
+
+    def __init__(self):
+        self.command_count = 0
+        self.total_ms = 0.0
+        self.slow_commands: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def record(self, duration_ms: float, slow_command: Optional[Dict[str, Any]]) -> None:
+        # Commands of one request can run concurrently on different executor threads
+        with self._lock:
+            self.command_count += 1
+            self.total_ms += duration_ms
+            if slow_command is not None and len(self.slow_commands) < MAX_SLOW_COMMANDS:
+                self.slow_commands.append(slow_command)
+
+# Set by the server timing middleware; Motor copies the context onto its executor threads,
+# so the listener below sees the stats object of the request that issued the command
+current_db_stats: ContextVar[Optional[RequestDbStats]] = ContextVar("current_db_stats", default=None)
+
+class CommandMonitor(monitoring.CommandListener):
+    """Command listener attributing round trips and DB time to the current request"""
+    def __init__(self, slow_threshold_ms: float):
+        self.slow_threshold_ms = slow_threshold_ms
+        # Started and succeeded events of a command fire on the same driver thread
+        self._local = threading.local()
+
+    def _pending(self) -> dict:
+        pending = getattr(self._local, "pending", None)
+        if pending is None:
+            pending = self._local.pending = {}
+        return pending
+
+    def started(self, event):
+        if event.command_name in _IGNORED_COMMANDS:
+            return
+        self._pending()[event.request_id] = event.command
+
+    def _finished(self, event, failure: Optional[str] = None):
+        command = self._pending().pop(event.request_id, None)
+        if command is None:
+            return
+        duration_ms = event.duration_micros / 1000
+        stats = current_db_stats.get()
+
+        slow_command = None
+        if duration_ms >= self.slow_threshold_ms:
+            slow_command = {
+                "command": event.command_name,
+                "database": event.database_name,
+                "collection": command.get("collection", command.get(event.command_name)),
+                "duration_ms": round(duration_ms, 3),
+                "filter": _filter_shape(_command_filter(command)),
+                "server": "%s:%s" % event.connection_id,
+                "failure": failure,
+                # Kept for the explain step; dropped before logging
+                "_explain": {key: value for key, value in command.items() if key not in _SESSION_FIELDS},
+            }
+            if stats is None:
+                # Background work: log right away, there is no request to attach it to
+                log_slow_command(slow_command)
+
+        if stats is not None:
+            stats.record(duration_ms, slow_command)
+
+    def succeeded(self, event):
+        self._finished(event)
+
+    def failed(self, event):
+        failure = event.failure.get("errmsg") if isinstance(event.failure, dict) else str(event.failure)
+        self._finished(event, failure)
+
+# Shared listener registered on the application's client
+command_monitor = CommandMonitor(settings.slow_query_threshold_ms)
@@ -0,0 +1,56 @@
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import PyMongoError
+import logging
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+# (collection, keys, options) for every index the API's queries rely on
+INDEXES = [
+    ("users", "email", {"unique": True}),
+    ("applications", "email", {}),
+    ("applications", "grantId", {}),
+    ("applications", "status", {}),
+    ("applications", "signoff_workflow.approvals.token", {"sparse": True}),
+    ("applications", "review_tokens.token", {"sparse": True}),
+    # Legacy string ids of seeded records, resolved through id_service
+    ("applications", "id", {"sparse": True}),
+    ("grant_calls", "id", {}),
+    ("grant_calls", [("status", 1), ("deadline_at", 1)], {}),
+    # Grant call listing: equality filters first, then the deadline sort/range
+    ("grant_calls", [("visibility", 1), ("status", 1), ("deadline_at", 1)], {}),
+    ("grant_calls", [("type", 1), ("status", 1), ("deadline_at", 1)], {}),
+    ("grant_calls", [("sponsor", 1), ("status", 1), ("deadline_at", 1)], {}),
+    ("grant_calls", "deadline_at", {}),
+    ("projects", "id", {"sparse": True}),
+    ("projects", "application_id", {}),
+    ("projects", "applicationId", {}),
+    ("projects", "closure_workflow.vc_sign_off_token", {"sparse": True}),
+    ("projects", [("milestones.due_date", 1), ("milestones.status", 1)], {}),
+    ("projects", [("milestones.dueDate", 1), ("milestones.status", 1)], {}),
+    ("projects", "milestones.is_overdue", {}),
+    ("milestone_events", [("created_at", -1)], {}),
+    ("documents", "folder", {}),
+    ("documents", "versions.uploaded_by", {}),
+    ("jobs", [("type", 1), ("created_at", -1)], {}),
+    ("jobs", [("status", 1), ("priority", -1), ("available_at", 1)], {}),
+    ("jobs", [("status", 1), ("lease_expires_at", 1)], {}),
+    ("jobs", "idempotency_key", {"unique": True, "sparse": True}),
+    ("jobs", "finished_at", {"expireAfterSeconds": settings.job_retention_days * 86400}),
+    # Rendered letters are reused across applications by content hash (award_letter_service)
+    ("award_letters.files", "metadata.cache_key", {}),
+    ("notifications", [("status", 1), ("available_at", 1)], {}),
+    ("notifications", [("status", 1), ("lease_expires_at", 1)], {}),
+    ("notifications", "claim", {"sparse": True}),
+    ("notifications", "sent_at", {"expireAfterSeconds": settings.job_retention_days * 86400}),
+]
+
+async def ensure_indexes(db: AsyncIOMotorDatabase) -> None:
+    """Create the indexes the API relies on; existing indexes are left untouched"""
+    for collection, keys, options in INDEXES:
+        try:
+            await db[collection].create_index(keys, **options)
+        except PyMongoError as e:
+            # A bad index (e.g. duplicate data under a unique key) must not stop startup
+            logger.error("Failed to create index %s on %s: %s", keys, collection, e)
@@ -4,6 +4,10 @@ import os
 from motor.motor_asyncio import AsyncIOMotorClient
 from passlib.context import CryptContext
 from ..config import settings
+from ..services.bus_service import publish_invalidation
+from ..services.grant_call_service import open_grant_calls_cache, parse_deadline
+from ..services.id_service import id_alias_cache
+from ..services.user_service import users_by_email_cache
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -34,12 +38,16 @@ async def load_data_from_json():
             users_to_insert.append(user_doc)
         if users_to_insert:
             await db.users.insert_many(users_to_insert)
+        await publish_invalidation(db, users_by_email_cache)
 
         # 3. Load Grant Calls
         with open(os.path.join(frontend_data_dir, "grantCalls.json"), "r") as f:
             grant_calls_data = json.load(f)
         if grant_calls_data.get("grantCalls"):
+            for grant_call in grant_calls_data["grantCalls"]:
+                grant_call["deadline_at"] = parse_deadline(grant_call.get("deadline"))
             await db.grant_calls.insert_many(grant_calls_data["grantCalls"])
+        await publish_invalidation(db, open_grant_calls_cache)
 
         # 4. Load Applications (with data structure transformation)
         with open(os.path.join(frontend_data_dir, "applications.json"), "r") as f:
@@ -81,6 +89,8 @@ async def load_data_from_json():
             projects_data = json.load(f)
         if projects_data.get("projects"):
             await db.projects.insert_many(projects_data["projects"])
+        # Reloaded records keep their legacy ids under new _ids
+        await publish_invalidation(db, id_alias_cache)
 
         # 6. Create indexes
         await db.users.create_index("email", unique=True)
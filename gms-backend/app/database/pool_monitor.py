@@ -0,0 +1,121 @@
+from pymongo import monitoring
+from itertools import accumulate
+from typing import Dict, Any
+import threading
+import time
+
+# Upper bounds (ms) of the checkout wait histogram buckets
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+class _AddressStats:
+    def __init__(self):
+        self.connections = 0
+        self.in_use = 0
+        self.waiting = 0
+        self.checkouts = 0
+        self.checkout_failures: Dict[str, int] = {}
+        self.wait_total_ms = 0.0
+        self.wait_max_ms = 0.0
+        self.wait_buckets = [0] * (len(WAIT_BUCKETS_MS) + 1)
+        self.pool_clears = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        # Cumulative like Prometheus histogram buckets: le_<bound> counts every wait up to bound
+        cumulative = list(accumulate(self.wait_buckets))
+        buckets = {f"le_{bound}": count for bound, count in zip(WAIT_BUCKETS_MS, cumulative)}
+        buckets["le_inf"] = cumulative[-1]
+        return {
+            "connections": self.connections,
+            "in_use": self.in_use,
+            "waiting": self.waiting,
+            "checkouts": self.checkouts,
+            "checkout_failures": dict(self.checkout_failures),
+            "wait_avg_ms": round(self.wait_total_ms / self.checkouts, 3) if self.checkouts else 0.0,
+            "wait_max_ms": round(self.wait_max_ms, 3),
+            "wait_total_ms": round(self.wait_total_ms, 3),
+            "wait_buckets": buckets,
+            "pool_clears": self.pool_clears
+        }
+
+class PoolMonitor(monitoring.ConnectionPoolListener):
+    """CMAP listener tracking pool size, in-use connections and checkout wait times per server"""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[str, _AddressStats] = {}
+        # pymongo checks connections out synchronously on the executor thread, so a
+        # thread-local start time pairs each CheckOutStarted with its completion
+        self._local = threading.local()
+
+    def _address(self, event) -> _AddressStats:
+        key = "%s:%s" % event.address
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats[key] = _AddressStats()
+        return stats
+
+    def _wait_ms(self) -> float:
+        started = getattr(self._local, "checkout_started", None)
+        self._local.checkout_started = None
+        return (time.perf_counter() - started) * 1000 if started is not None else 0.0
+
+    def pool_created(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self._address(event).pool_clears += 1
+
+    def pool_closed(self, event):
+        with self._lock:
+            self._stats.pop("%s:%s" % event.address, None)
+
+    def connection_created(self, event):
+        with self._lock:
+            self._address(event).connections += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        with self._lock:
+            self._address(event).connections -= 1
+
+    def connection_check_out_started(self, event):
+        self._local.checkout_started = time.perf_counter()
+        with self._lock:
+            self._address(event).waiting += 1
+
+    def connection_check_out_failed(self, event):
+        wait_ms = self._wait_ms()
+        with self._lock:
+            stats = self._address(event)
+            stats.waiting -= 1
+            stats.checkout_failures[event.reason] = stats.checkout_failures.get(event.reason, 0) + 1
+            stats.wait_total_ms += wait_ms
+
+    def connection_checked_out(self, event):
+        wait_ms = self._wait_ms()
+        with self._lock:
+            stats = self._address(event)
+            stats.waiting -= 1
+            stats.in_use += 1
+            stats.checkouts += 1
+            stats.wait_total_ms += wait_ms
+            stats.wait_max_ms = max(stats.wait_max_ms, wait_ms)
+            for index, bound in enumerate(WAIT_BUCKETS_MS):
+                if wait_ms <= bound:
+                    stats.wait_buckets[index] += 1
+                    break
+            else:
+                stats.wait_buckets[-1] += 1
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self._address(event).in_use -= 1
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {address: stats.as_dict() for address, stats in self._stats.items()}
+
+# Shared listener registered on the application's client
+pool_monitor = PoolMonitor()
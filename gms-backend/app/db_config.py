@@ -1,22 +1,70 @@
 from motor.motor_asyncio import AsyncIOMotorClient
-from typing import Optional
+from pymongo.read_preferences import make_read_preference, read_pref_mode_from_name
+from typing import Optional, Dict
+import importlib.util
+import logging
 from .config import settings
+from .database.pool_monitor import pool_monitor
+from .database.command_monitor import command_monitor
+from .utils.tracing import mongo_span_listener
+
+logger = logging.getLogger(__name__)
+
+# Python packages backing each wire compressor; zlib ships with Python
+_COMPRESSOR_MODULES = {"zstd": "zstandard", "snappy": "snappy", "zlib": None}
 
 class Database:
     client: Optional[AsyncIOMotorClient] = None
     database = None
+    workloads: Dict[str, object] = {}
 
 database = Database()
 
-async def get_database():
-    return database.database
+def _available_compressors() -> list:
+    """Configured compressors whose libraries are installed, in preference order"""
+    compressors = []
+    for name in settings.mongodb_compressors.split(","):
+        name = name.strip()
+        if name not in _COMPRESSOR_MODULES:
+            continue
+        module = _COMPRESSOR_MODULES[name]
+        if module is None or importlib.util.find_spec(module) is not None:
+            compressors.append(name)
+    return compressors
+
+async def get_database(workload: str = "default"):
+    """Database handle for a workload class; "reporting" reads may go to secondaries"""
+    if workload == "default" or database.client is None:
+        return database.database
+    handle = database.workloads.get(workload)
+    if handle is None:
+        mode = settings.mongodb_read_preferences.get(workload, "primary")
+        handle = database.client.get_database(
+            settings.database_name,
+            read_preference=make_read_preference(read_pref_mode_from_name(mode), None)
+        )
+        database.workloads[workload] = handle
+    return handle
 
 async def connect_to_mongo():
-    database.client = AsyncIOMotorClient(settings.mongodb_uri)
+    database.client = AsyncIOMotorClient(
+        settings.mongodb_uri,
+        maxPoolSize=settings.mongodb_max_pool_size,
+        minPoolSize=settings.mongodb_min_pool_size,
+        maxIdleTimeMS=settings.mongodb_max_idle_time_ms,
+        waitQueueTimeoutMS=settings.mongodb_wait_queue_timeout_ms,
+        serverSelectionTimeoutMS=settings.mongodb_server_selection_timeout_ms,
+        compressors=_available_compressors(),
+        event_listeners=[pool_monitor, command_monitor, mongo_span_listener]
+    )
     database.database = database.client[settings.database_name]
-    print(f"Connected to MongoDB at {settings.mongodb_uri}")
+    database.workloads = {}
+    logger.info("Connected to MongoDB", extra={"database": settings.database_name})
 
 async def close_mongo_connection():
     if database.client:
         database.client.close()
-        print("Disconnected from MongoDB")
\ No newline at end of file
+        database.client = None
+        database.database = None
+        database.workloads = {}
+        logger.info("Disconnected from MongoDB")
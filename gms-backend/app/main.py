@@ -1,9 +1,17 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Depends, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
 from .db_config import connect_to_mongo, close_mongo_connection, get_database
-from .api import auth, users, admin, reviewers, grant_calls, projects
+from .database.indexes import ensure_indexes
+from .services.award_document_service import migrate_award_documents
+from .services.award_letter_service import shutdown_renderer
+from .services.bus_service import ensure_bus_collection, start_bus_listener, stop_bus_listener
+from .services.grant_call_service import backfill_grant_call_deadlines
+from .services.job_service import start_job_workers, stop_job_workers
+from .services.notification_service import start_notification_dispatcher, stop_notification_dispatcher
+from .services.event_service import start_event_source, stop_event_source
+from .api import auth, users, admin, reviewers, grant_calls, projects, documents, jobs, events
 from .api.applications import router as applications_router
 from .config import settings
 from .utils.error_handlers import (
@@ -13,26 +21,62 @@ from .utils.error_handlers import (
     validation_exception_handler,
     general_exception_handler
 )
+from .utils.metrics import MetricsMiddleware, track_in_flight, render_metrics
+from .utils.server_timing import ServerTimingMiddleware
+from .utils.structured_logging import setup_logging, shutdown_logging
+from .utils.tracing import RequestContextMiddleware, span_exporter
 from datetime import datetime
 import secrets
 import hashlib
 from contextlib import asynccontextmanager
 from bson import ObjectId
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Set by the gunicorn master once it has run the startup tasks, so workers skip them
+STARTUP_TASKS_DONE_ENV = "GMS_STARTUP_TASKS_DONE"
+
+async def run_startup_tasks():
+    """One-off startup work: index builds, data migrations and sample data seeding"""
+    db = await get_database()
+    await ensure_indexes(db)
+    await ensure_bus_collection(db)
+    await migrate_award_documents(db)
+    await load_sample_data_if_empty()
+    await backfill_grant_call_deadlines(db)
 
 @asynccontextmanager
 async def life_span(app: FastAPI):
+    setup_logging()
     await connect_to_mongo()
-    await load_sample_data_if_empty()
-    print("Starting up...")
+    if not os.environ.get(STARTUP_TASKS_DONE_ENV):
+        await run_startup_tasks()
+    await start_bus_listener(await get_database())
+    # Every worker process runs its own job workers; claims are atomic, so they never overlap
+    start_job_workers(await get_database())
+    start_notification_dispatcher(await get_database())
+    await start_event_source(await get_database())
+    logger.info("Starting up...")
     yield
-    print(f"Server has been stopped")
+    logger.info("Server has been stopped")
+    # Under gunicorn the worker already ended open event streams when shutdown began (app/workers.py)
+    await stop_event_source()
+    await stop_notification_dispatcher()
+    await stop_job_workers()
+    await stop_bus_listener()
+    shutdown_renderer()
     await close_mongo_connection()
+    span_exporter.shutdown()
+    shutdown_logging()
 
 app = FastAPI(
     title="Grants Management System API",
     description="Backend API for managing grant applications, projects, and funding workflows",
     version="1.0.0",
-    lifespan=life_span
+    lifespan=life_span,
+    dependencies=[Depends(track_in_flight)]
 )
 
 # CORS middleware
@@ -42,9 +86,18 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
-    expose_headers=["Content-Disposition", "Content-Length"],
+    expose_headers=["Content-Disposition", "Content-Length", "Content-Range", "Accept-Ranges", "ETag", "Last-Modified", "Server-Timing", "X-Request-ID", "X-Total-Count"],
 )
 
+# Per-request Mongo round trips: Server-Timing header and slow-query log
+app.add_middleware(ServerTimingMiddleware)
+
+# Request metrics (outermost, so CORS preflights and error responses are counted too)
+app.add_middleware(MetricsMiddleware)
+
+# Request ID and root trace span (outermost, so everything below is correlated)
+app.add_middleware(RequestContextMiddleware)
+
 # Add exception handlers
 app.add_exception_handler(AuthenticationError, authentication_exception_handler)
 app.add_exception_handler(StarletteHTTPException, http_exception_handler)
@@ -59,6 +112,9 @@ app.include_router(admin.router)
 app.include_router(reviewers.router)
 app.include_router(grant_calls.router)
 app.include_router(projects.router)
+app.include_router(documents.router)
+app.include_router(jobs.router)
+app.include_router(events.router)
     
 @app.get("/")
 async def root():
@@ -72,10 +128,10 @@ async def load_sample_data_if_empty():
         # Check if users collection is empty
         user_count = await db.users.count_documents({})
         if user_count > 0:
-            print("Database already contains data, skipping sample data loading")
+            logger.info("Database already contains data, skipping sample data loading")
             return
         
-        print("Loading sample data to empty database...")
+        logger.info("Loading sample data to empty database...")
         
         # Import bcrypt for proper password hashing
         from passlib.context import CryptContext
@@ -365,11 +421,17 @@ async def load_sample_data_if_empty():
         ]
         await db.projects.insert_many(projects_data)
         
-        print("✅ Sample data loaded successfully")
+        logger.info("Sample data loaded successfully")
         
     except Exception as e:
-        print(f"❌ Error loading sample data: {e}")
+        logger.exception("Error loading sample data: %s", e)
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
\ No newline at end of file
+    return {"status": "healthy"}
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint"""
+    payload, content_type = render_metrics()
+    return Response(content=payload, media_type=content_type)
\ No newline at end of file
@@ -84,6 +84,11 @@ class Application(BaseModel):
     proposal_file_size: Optional[int] = Field(None, alias="proposalFileSize")  # File size in bytes
     proposal_file_type: Optional[str] = Field(None, alias="proposalFileType")  # MIME type
     signoff_workflow: Optional[dict] = Field(None, alias="signoffWorkflow")  # Sign-off workflow data
+    # Award document references; the files themselves are in the award_documents GridFS bucket
+    award_documents: List[dict] = []
+    award_acceptance: Optional[dict] = None
+    # Generated letter reference (status, GridFS file_id, cache_key); the PDF is in the award_letters bucket
+    award_letter: Optional[dict] = None
     created_at: datetime = Field(default_factory=datetime.utcnow, alias="createdAt")
     updated_at: datetime = Field(default_factory=datetime.utcnow, alias="updatedAt")
 
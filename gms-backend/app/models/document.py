@@ -12,6 +12,9 @@ class DocumentVersion(BaseModel):
     uploaded_at: datetime = Field(alias="uploadedAt")
     file_size: str = Field(alias="fileSize")
     notes: Optional[str] = None
+    # Content address of the stored file; unset for versions uploaded before content addressing
+    sha256: Optional[str] = None
+    size_bytes: Optional[int] = Field(None, alias="sizeBytes")
     
     class Config:
         allow_population_by_field_name = True
@@ -0,0 +1,130 @@
+from datetime import datetime
+
+# Read-only rows for list and dashboard paths. They are built straight from projected
+# documents, skip validation and carry no per-instance __dict__; writes and detail views
+# keep using the full pydantic models.
+
+# Large base64 payloads and sub-documents the list responses never read
+APPLICATION_ROW_PROJECTION = {
+    "proposalFileData": 0,
+    "awardLetterFileData": 0,
+    "award_documents": 0,
+    "projectSummary": 0,
+    "objectives": 0,
+    "methodology": 0,
+    "expectedOutcomes": 0,
+    "budgetJustification": 0,
+}
+
+PROJECT_ROW_PROJECTION = {
+    "partners": 0,
+    "final_report": 0,
+    "finalReport": 0,
+    "closure_workflow": 0,
+    "closureWorkflow": 0,
+}
+
+def _get(doc: dict, camel_key: str, snake_key: str, default=None):
+    """Stored documents mix camelCase and snake_case keys; take whichever is present"""
+    value = doc.get(camel_key)
+    if value is None:
+        value = doc.get(snake_key, default)
+    return default if value is None else value
+
+def _datetime(value) -> datetime:
+    """Stored timestamps are datetimes or (sample data) ISO strings; missing ones default to now like the models"""
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            pass
+    return datetime.utcnow()
+
+class ApplicationRow:
+    """Attributes read by build_application_response, with the Application model's defaults"""
+    __slots__ = (
+        "id", "grant_id", "applicant_name", "email", "proposal_title", "status",
+        "submission_date", "review_comments", "biodata", "deadline",
+        "proposal_file_name", "proposal_file_size", "proposal_file_type",
+        "reviewHistory", "revision_count", "original_submission_date", "is_editable",
+        "sign_off_approvals", "contract_file_name", "award_letter_generated", "signoff_workflow",
+    )
+
+    def __init__(self, doc: dict):
+        get = doc.get
+        self.id = get("_id")
+        self.grant_id = get("grantId")
+        self.applicant_name = get("applicantName")
+        self.email = get("email")
+        self.proposal_title = get("proposalTitle")
+        self.status = get("status", "submitted")
+        self.submission_date = get("submissionDate") or datetime.utcnow().isoformat()
+        self.review_comments = get("reviewComments", "")
+        self.biodata = get("biodata")
+        self.deadline = get("deadline")
+        self.proposal_file_name = get("proposalFileName")
+        self.proposal_file_size = get("proposalFileSize")
+        self.proposal_file_type = get("proposalFileType")
+        self.reviewHistory = get("reviewHistory") or []
+        self.revision_count = get("revisionCount", 0)
+        self.original_submission_date = get("originalSubmissionDate")
+        self.is_editable = get("isEditable", False)
+        self.sign_off_approvals = get("signOffApprovals", [])
+        self.contract_file_name = get("contractFileName")
+        self.award_letter_generated = get("awardLetterGenerated")
+        self.signoff_workflow = get("signoffWorkflow", get("signoff_workflow"))
+
+class MilestoneRow:
+    __slots__ = (
+        "id", "title", "due_date", "status", "description", "progress_report_uploaded",
+        "progress_report_date", "progress_report_filename", "is_overdue",
+    )
+
+    def __init__(self, doc: dict):
+        self.id = doc.get("id")
+        self.title = doc.get("title")
+        self.due_date = _get(doc, "dueDate", "due_date")
+        self.status = doc.get("status")
+        self.description = doc.get("description")
+        self.progress_report_uploaded = _get(doc, "progressReportUploaded", "progress_report_uploaded", False)
+        self.progress_report_date = _get(doc, "progressReportDate", "progress_report_date")
+        self.progress_report_filename = _get(doc, "progressReportFilename", "progress_report_filename")
+        self.is_overdue = _get(doc, "isOverdue", "is_overdue", False)
+
+class RequisitionRow:
+    __slots__ = (
+        "id", "milestone_id", "amount", "requested_date", "status", "notes",
+        "reviewed_by", "reviewed_date", "review_notes",
+    )
+
+    def __init__(self, doc: dict):
+        self.id = doc.get("id")
+        self.milestone_id = _get(doc, "milestoneId", "milestone_id")
+        self.amount = doc.get("amount")
+        self.requested_date = _get(doc, "requestedDate", "requested_date")
+        self.status = doc.get("status")
+        self.notes = doc.get("notes")
+        self.reviewed_by = _get(doc, "reviewedBy", "reviewed_by")
+        self.reviewed_date = _get(doc, "reviewedDate", "reviewed_date")
+        self.review_notes = _get(doc, "reviewNotes", "review_notes")
+
+class ProjectRow:
+    """Attributes read by build_project_summary and the monitoring dashboard"""
+    __slots__ = (
+        "id", "application_id", "title", "status", "start_date", "end_date",
+        "milestones", "requisitions", "created_at", "updated_at",
+    )
+
+    def __init__(self, doc: dict):
+        self.id = doc.get("_id")
+        self.application_id = _get(doc, "applicationId", "application_id")
+        self.title = doc.get("title")
+        self.status = doc.get("status", "active")
+        self.start_date = _get(doc, "startDate", "start_date")
+        self.end_date = _get(doc, "endDate", "end_date")
+        self.milestones = [MilestoneRow(milestone) for milestone in doc.get("milestones") or ()]
+        self.requisitions = [RequisitionRow(requisition) for requisition in doc.get("requisitions") or ()]
+        self.created_at = _datetime(_get(doc, "createdAt", "created_at"))
+        self.updated_at = _datetime(_get(doc, "updatedAt", "updated_at"))
@@ -22,7 +22,8 @@ class User(BaseModel):
     id: PyObjectId = Field(default_factory=PyObjectId, alias="_id")
     name: str
     email: EmailStr
-    password: str
+    # Only the sample data stores it; accounts created through the API keep just the hash
+    password: Optional[str] = None
     role: str
     status: str = "active"
     created_at: datetime = Field(default_factory=datetime.utcnow, alias="createdAt")
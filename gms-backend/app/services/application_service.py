@@ -1,11 +1,18 @@
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from ..models.application import Application, ReviewHistoryEntry
+from ..models.read_models import ApplicationRow, APPLICATION_ROW_PROJECTION
 from ..schemas.application import ApplicationCreate, ApplicationUpdate, ReviewHistoryEntryCreate
+from ..utils.tracing import traced
+from .event_service import notify_change
+from .id_service import find_by_id, resolve_id
 from typing import Optional, List
-from bson import ObjectId
 from datetime import datetime
+import logging
 
-async def create_application(db: AsyncIOMotorDatabase, application_data: ApplicationCreate) -> Application:
+logger = logging.getLogger(__name__)
+
+def build_application_document(application_data: ApplicationCreate) -> dict:
+    """Build the stored document for a new application, filling workflow defaults"""
     # Convert ApplicationCreate to dict using aliases (field names that match frontend)
     application_dict = application_data.dict(by_alias=True)
     
@@ -25,60 +32,50 @@ async def create_application(db: AsyncIOMotorDatabase, application_data: Applica
     application_dict.setdefault("contractFileName", None)
     application_dict.setdefault("awardLetterGenerated", False)
     application_dict.setdefault("originalSubmissionDate", application_dict.get("submissionDate"))
+    return application_dict
+
+@traced
+async def create_application(db: AsyncIOMotorDatabase, application_data: ApplicationCreate) -> Application:
+    application_dict = build_application_document(application_data)
     
     # Insert into database
     result = await db.applications.insert_one(application_dict)
     application_dict["_id"] = result.inserted_id
+    notify_change(db, "applications", result.inserted_id, "created")
     
     # Create Application model using by_alias=True to match field names
     return Application.parse_obj(application_dict)
 
+@traced
 async def get_application_by_id(db: AsyncIOMotorDatabase, application_id: str) -> Optional[Application]:
-    if not ObjectId.is_valid(application_id):
-        return None
-    application = await db.applications.find_one({"_id": ObjectId(application_id)})
+    application = await find_by_id(db, "applications", application_id)
     if application:
         return Application.parse_obj(application)
     return None
 
-async def get_all_applications(db: AsyncIOMotorDatabase) -> List[Application]:
-    applications = []
-    async for application_doc in db.applications.find():
-        try:
-            # Ensure required fields exist with defaults
-            application_doc.setdefault("reviewHistory", [])
-            application_doc.setdefault("signOffApprovals", [])
-            application_doc.setdefault("revisionCount", 0)
-            application_doc.setdefault("isEditable", False)
-            
-            application = Application.parse_obj(application_doc)
-            applications.append(application)
-        except Exception as e:
-            print(f"Error parsing application document: {e}")
-            print(f"Document: {application_doc}")
-            continue
-    return applications
+async def _find_application_rows(db: AsyncIOMotorDatabase, query: dict) -> List[ApplicationRow]:
+    return [ApplicationRow(doc) async for doc in db.applications.find(query, APPLICATION_ROW_PROJECTION)]
+
+@traced
+async def get_all_applications(db: AsyncIOMotorDatabase) -> List[ApplicationRow]:
+    return await _find_application_rows(db, {})
 
-async def get_applications_by_user(db: AsyncIOMotorDatabase, email: str) -> List[Application]:
-    applications = []
-    async for application in db.applications.find({"email": email}):
-        applications.append(Application.parse_obj(application))
-    return applications
+@traced
+async def get_applications_by_user(db: AsyncIOMotorDatabase, email: str) -> List[ApplicationRow]:
+    return await _find_application_rows(db, {"email": email})
 
-async def get_applications_by_status(db: AsyncIOMotorDatabase, status: str) -> List[Application]:
-    applications = []
-    async for application in db.applications.find({"status": status}):
-        applications.append(Application.parse_obj(application))
-    return applications
+@traced
+async def get_applications_by_status(db: AsyncIOMotorDatabase, status: str) -> List[ApplicationRow]:
+    return await _find_application_rows(db, {"status": status})
 
-async def get_applications_by_grant_call(db: AsyncIOMotorDatabase, grant_call_id: str) -> List[Application]:
-    applications = []
-    async for application in db.applications.find({"grantId": grant_call_id}):
-        applications.append(Application.parse_obj(application))
-    return applications
+@traced
+async def get_applications_by_grant_call(db: AsyncIOMotorDatabase, grant_call_id: str) -> List[ApplicationRow]:
+    return await _find_application_rows(db, {"grantId": grant_call_id})
 
+@traced
 async def update_application(db: AsyncIOMotorDatabase, application_id: str, application_update: ApplicationUpdate) -> Optional[Application]:
-    if not ObjectId.is_valid(application_id):
+    object_id = await resolve_id(db, "applications", application_id)
+    if object_id is None:
         return None
     
     # Use alias field names to keep DB keys consistent with API (camelCase)
@@ -89,16 +86,19 @@ async def update_application(db: AsyncIOMotorDatabase, application_id: str, appl
     update_data["updatedAt"] = datetime.utcnow()
     
     result = await db.applications.update_one(
-        {"_id": ObjectId(application_id)}, 
+        {"_id": object_id}, 
         {"$set": update_data}
     )
     
     if result.modified_count:
-        return await get_application_by_id(db, application_id)
+        notify_change(db, "applications", object_id)
+        return await get_application_by_id(db, object_id)
     return None
 
+@traced
 async def add_review_comment(db: AsyncIOMotorDatabase, application_id: str, review_data: ReviewHistoryEntryCreate, new_status: str) -> Optional[Application]:
-    if not ObjectId.is_valid(application_id):
+    object_id = await resolve_id(db, "applications", application_id)
+    if object_id is None:
         return None
     
     # Create review history entry with generated ID and timestamp
@@ -113,7 +113,7 @@ async def add_review_comment(db: AsyncIOMotorDatabase, application_id: str, revi
     
     # Update application with new review entry, latest comment, and status
     result = await db.applications.update_one(
-        {"_id": ObjectId(application_id)},
+        {"_id": object_id},
         {
             "$push": {"reviewHistory": review_entry},
             "$set": {
@@ -126,11 +126,14 @@ async def add_review_comment(db: AsyncIOMotorDatabase, application_id: str, revi
     )
     
     if result.modified_count:
-        return await get_application_by_id(db, application_id)
+        notify_change(db, "applications", object_id)
+        return await get_application_by_id(db, object_id)
     return None
 
+@traced
 async def update_application_status(db: AsyncIOMotorDatabase, application_id: str, status: str, decision_notes: str = None) -> Optional[Application]:
-    if not ObjectId.is_valid(application_id):
+    object_id = await resolve_id(db, "applications", application_id)
+    if object_id is None:
         return None
     
     update_data = {
@@ -143,16 +146,21 @@ async def update_application_status(db: AsyncIOMotorDatabase, application_id: st
         update_data["finalDecision"] = status
     
     result = await db.applications.update_one(
-        {"_id": ObjectId(application_id)},
+        {"_id": object_id},
         {"$set": update_data}
     )
     
     if result.modified_count:
-        return await get_application_by_id(db, application_id)
+        notify_change(db, "applications", object_id)
+        return await get_application_by_id(db, object_id)
     return None
 
+@traced
 async def delete_application(db: AsyncIOMotorDatabase, application_id: str) -> bool:
-    if not ObjectId.is_valid(application_id):
+    object_id = await resolve_id(db, "applications", application_id)
+    if object_id is None:
         return False
-    result = await db.applications.delete_one({"_id": ObjectId(application_id)})
+    result = await db.applications.delete_one({"_id": object_id})
+    if result.deleted_count:
+        notify_change(db, "applications", object_id, "deleted")
     return result.deleted_count > 0
\ No newline at end of file
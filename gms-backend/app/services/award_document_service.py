@@ -0,0 +1,152 @@
+from motor.motor_asyncio import AsyncIOMotorDatabase, AsyncIOMotorGridFSBucket
+from fastapi import HTTPException, UploadFile
+from gridfs.errors import NoFile
+from pymongo import ReturnDocument
+from typing import AsyncIterator, Optional
+from bson import ObjectId
+from datetime import datetime
+import base64
+import logging
+
+from ..config import settings
+from ..utils.tracing import traced
+from ..utils.uploads import UPLOAD_CHUNK_SIZE, format_file_size
+
+logger = logging.getLogger(__name__)
+
+# File bytes live in GridFS (award_documents.files / award_documents.chunks); the application
+# only keeps metadata references in award_documents, so loading it stays cheap
+AWARD_DOCUMENTS_BUCKET = "award_documents"
+
+def _bucket(db: AsyncIOMotorDatabase) -> AsyncIOMotorGridFSBucket:
+    return AsyncIOMotorGridFSBucket(db, bucket_name=AWARD_DOCUMENTS_BUCKET)
+
+def _document_reference(file_id: ObjectId, filename: str, file_type: str, size: int, uploaded_by: str, uploaded_at: str) -> dict:
+    return {
+        "id": f"award_{file_id}",
+        "file_id": file_id,
+        "filename": filename,
+        "file_type": file_type,
+        "size": size,
+        "uploaded_at": uploaded_at,
+        "uploaded_by": uploaded_by
+    }
+
+@traced
+async def add_award_document(db: AsyncIOMotorDatabase, application_id: str, file: UploadFile, uploaded_by: str) -> Optional[dict]:
+    """Stream an upload into GridFS and reference it from the application.
+
+    Returns the reference, or None if the application no longer exists.
+    """
+    max_bytes = settings.upload_max_bytes
+    if file.size is not None and file.size > max_bytes:
+        raise HTTPException(status_code=413, detail=f"File too large. Maximum size is {format_file_size(max_bytes)}.")
+
+    grid_in = _bucket(db).open_upload_stream(
+        file.filename,
+        metadata={"application_id": application_id, "content_type": file.content_type, "uploaded_by": uploaded_by}
+    )
+    size = 0
+    try:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            size += len(chunk)
+            if size > max_bytes:
+                raise HTTPException(status_code=413, detail=f"File too large. Maximum size is {format_file_size(max_bytes)}.")
+            await grid_in.write(chunk)
+        await grid_in.close()
+    except BaseException:
+        await grid_in.abort()
+        raise
+
+    reference = _document_reference(grid_in._id, file.filename, file.content_type, size, uploaded_by, datetime.utcnow().isoformat())
+    result = await db.applications.update_one(
+        {"_id": ObjectId(application_id)},
+        {
+            "$push": {"award_documents": reference},
+            "$set": {
+                "status": "award_pending_acceptance",
+                "updatedAt": datetime.utcnow()
+            }
+        }
+    )
+    if result.modified_count == 0:
+        await _delete_file(db, grid_in._id)
+        return None
+    return reference
+
+async def _delete_file(db: AsyncIOMotorDatabase, file_id: ObjectId) -> None:
+    try:
+        await _bucket(db).delete(file_id)
+    except NoFile:
+        pass
+
+async def open_award_document(db: AsyncIOMotorDatabase, reference: dict):
+    """GridFS download stream for a document reference, or None if the file is missing"""
+    try:
+        return await _bucket(db).open_download_stream(reference["file_id"])
+    except NoFile:
+        logger.warning("Award document %s has no stored file", reference.get("id"))
+        return None
+
+async def iter_award_document(grid_out) -> AsyncIterator[bytes]:
+    while chunk := await grid_out.readchunk():
+        yield chunk
+
+async def read_award_document_base64(grid_out) -> str:
+    """Whole file as base64, for clients of the JSON download format"""
+    return base64.b64encode(await grid_out.read()).decode("utf-8")
+
+@traced
+async def remove_award_document(db: AsyncIOMotorDatabase, application_id: str, document_id: str) -> bool:
+    before = await db.applications.find_one_and_update(
+        {"_id": ObjectId(application_id), "award_documents.id": document_id},
+        {
+            "$pull": {"award_documents": {"id": document_id}},
+            "$set": {"updatedAt": datetime.utcnow()}
+        },
+        projection={"award_documents": {"$elemMatch": {"id": document_id}}},
+        return_document=ReturnDocument.BEFORE
+    )
+    if not before:
+        return False
+    reference = before["award_documents"][0]
+    if reference.get("file_id") is not None:
+        await _delete_file(db, reference["file_id"])
+    return True
+
+async def migrate_award_documents(db: AsyncIOMotorDatabase) -> int:
+    """Move base64 award documents embedded in applications into GridFS; safe to re-run"""
+    bucket = _bucket(db)
+    migrated = 0
+    async for application in db.applications.find({"award_documents.file_data": {"$exists": True}}, {"award_documents": 1}):
+        for document in application["award_documents"]:
+            if "file_data" not in document:
+                continue
+            content = base64.b64decode(document["file_data"])
+            file_id = await bucket.upload_from_stream(
+                document.get("filename") or "award_document",
+                content,
+                metadata={
+                    "application_id": str(application["_id"]),
+                    "content_type": document.get("file_type"),
+                    "uploaded_by": document.get("uploaded_by")
+                }
+            )
+            reference = _document_reference(
+                file_id, document.get("filename"), document.get("file_type"), len(content),
+                document.get("uploaded_by"), document.get("uploaded_at")
+            )
+            reference["id"] = document["id"]  # keep the id clients already hold
+            # Replace just this entry so documents pushed meanwhile are kept
+            result = await db.applications.update_one(
+                {"_id": application["_id"]},
+                {"$set": {"award_documents.$[doc]": reference}},
+                array_filters=[{"doc.id": document["id"], "doc.file_data": {"$exists": True}}]
+            )
+            if result.modified_count:
+                migrated += 1
+            else:
+                await _delete_file(db, file_id)
+    if migrated:
+        logger.info("Moved %d award documents into GridFS", migrated)
+    return migrated
@@ -0,0 +1,37 @@
+from string import Template
+from typing import List, Tuple
+
+from ..utils.pdf import render_pdf
+
+# Runs in the PDF worker processes: keep this module free of database and web imports.
+
+# Bump when the wording or layout changes so cached letters are rendered again
+TEMPLATE_VERSION = 1
+
+AWARD_LETTER_TEMPLATE: List[Tuple[str, str]] = [
+    ("small", "$institution\n$department"),
+    ("small", "Reference: $reference\nDate: $issued_on"),
+    ("title", "Notice of Grant Award"),
+    ("body", "Dear $applicant_name,"),
+    ("body", "We are pleased to inform you that your proposal \"$proposal_title\" has been approved "
+             "for funding following review and institutional sign-off."),
+    ("heading", "Award details"),
+    ("body", "Award amount: $award_amount\nGrant call: $grant_id"),
+    ("heading", "Conditions"),
+    ("body", "Funds are released against approved milestones and requisitions. Progress reports are due "
+             "for each milestone, and narrative and financial final reports are due at project close. "
+             "Please confirm acceptance of this award through the Grants Management System."),
+    ("heading", "Approvals"),
+    ("body", "$approvals"),
+    ("body", "Yours sincerely,\n\nOffice of Research and Innovation"),
+]
+
+def render_award_letter(fields: dict) -> bytes:
+    """Fill the award letter template and render it to PDF bytes"""
+    approvals = "\n".join(
+        f"{approval['role']}: {approval['name']} ({approval['approved_at'] or 'pending'})"
+        for approval in fields["approvals"]
+    ) or "Not recorded"
+    values = {**fields, "approvals": approvals, "award_amount": f"{fields['award_amount']:,.2f}"}
+    blocks = [(style, Template(text).safe_substitute(values)) for style, text in AWARD_LETTER_TEMPLATE]
+    return render_pdf(blocks, title=f"Award letter - {fields['applicant_name']}")
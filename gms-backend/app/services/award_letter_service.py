@@ -0,0 +1,212 @@
+from motor.motor_asyncio import AsyncIOMotorDatabase, AsyncIOMotorGridFSBucket
+from concurrent.futures import ProcessPoolExecutor
+from gridfs.errors import NoFile
+from typing import List, Optional
+from bson import ObjectId
+from datetime import datetime
+import asyncio
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+
+from ..config import settings
+from ..utils.tracing import traced
+from .award_letter_renderer import TEMPLATE_VERSION, render_award_letter
+from .job_service import PRIORITY_HIGH, PRIORITY_NORMAL, enqueue_job, register_job_handler, update_job
+
+logger = logging.getLogger(__name__)
+
+AWARD_LETTER_JOB_TYPE = "award_letter"
+AWARD_LETTERS_BUCKET = "award_letters"
+
+# Only what the letter needs, so batches over a grant call stay light
+LETTER_PROJECTION = {
+    "applicantName": 1, "proposalTitle": 1, "institution": 1, "department": 1,
+    "grantId": 1, "signoff_workflow": 1, "award_letter": 1,
+}
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_pid: Optional[int] = None
+
+def _renderer() -> ProcessPoolExecutor:
+    """Per-worker process pool, created on first use (after gunicorn has forked)"""
+    global _executor, _executor_pid
+    if _executor is None or _executor_pid != os.getpid():
+        # spawn, not fork: forking a process with an event loop and driver threads is unsafe
+        _executor = ProcessPoolExecutor(max_workers=settings.pdf_render_workers, mp_context=multiprocessing.get_context("spawn"))
+        _executor_pid = os.getpid()
+    return _executor
+
+def shutdown_renderer() -> None:
+    global _executor
+    if _executor is not None and _executor_pid == os.getpid():
+        _executor.shutdown(wait=False, cancel_futures=True)
+    _executor = None
+
+def _bucket(db: AsyncIOMotorDatabase) -> AsyncIOMotorGridFSBucket:
+    return AsyncIOMotorGridFSBucket(db, bucket_name=AWARD_LETTERS_BUCKET)
+
+def letter_fields(application: dict) -> dict:
+    """Everything printed on the letter; any change to these means a new letter"""
+    workflow = application.get("signoff_workflow") or {}
+    approvals = [
+        {
+            "role": approval.get("role", ""),
+            "name": approval.get("approver_name") or approval.get("name") or "",
+            "approved_at": approval.get("approved_at"),
+        }
+        for approval in workflow.get("approvals", [])
+    ]
+    approved_dates = [approval["approved_at"] for approval in approvals if approval["approved_at"]]
+    return {
+        "reference": str(application["_id"]),
+        "applicant_name": application.get("applicantName", ""),
+        "proposal_title": application.get("proposalTitle", ""),
+        "institution": application.get("institution", ""),
+        "department": application.get("department", ""),
+        "grant_id": application.get("grantId", ""),
+        "award_amount": float(workflow.get("award_amount") or 0),
+        "approvals": approvals,
+        # The final sign-off date, not today's, so an unchanged letter renders identically
+        "issued_on": (max(approved_dates) if approved_dates else workflow.get("initiated_at") or "")[:10],
+    }
+
+def letter_cache_key(fields: dict) -> str:
+    payload = json.dumps({"template": TEMPLATE_VERSION, **fields}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+def _is_current(application: dict, cache_key: str) -> bool:
+    letter = application.get("award_letter") or {}
+    return letter.get("cache_key") == cache_key and letter.get("status") == "ready" and letter.get("file_id") is not None
+
+async def _render_and_store(db: AsyncIOMotorDatabase, application: dict, generated_by: str) -> str:
+    """Bring one application's letter up to date; returns "cached" or "rendered" """
+    fields = letter_fields(application)
+    cache_key = letter_cache_key(fields)
+    if _is_current(application, cache_key):
+        return "cached"
+
+    bucket = _bucket(db)
+    filename = f"award_letter_{fields['applicant_name'].replace(' ', '_')}.pdf"
+    outcome = "cached"
+    stored = await db[f"{AWARD_LETTERS_BUCKET}.files"].find_one({"metadata.cache_key": cache_key}, {"_id": 1})
+    if stored:
+        file_id = stored["_id"]
+    else:
+        loop = asyncio.get_running_loop()
+        pdf = await loop.run_in_executor(_renderer(), render_award_letter, fields)
+        file_id = await bucket.upload_from_stream(
+            filename, pdf, metadata={"cache_key": cache_key, "application_id": fields["reference"]}
+        )
+        outcome = "rendered"
+
+    previous_file_id = (application.get("award_letter") or {}).get("file_id")
+    await db.applications.update_one(
+        {"_id": application["_id"]},
+        {"$set": {"award_letter": {
+            "id": f"award_letter_{file_id}",
+            "status": "ready",
+            "file_id": file_id,
+            "cache_key": cache_key,
+            "filename": filename,
+            "file_type": "application/pdf",
+            "generated_at": datetime.utcnow().isoformat(),
+            "generated_by": generated_by,
+            "application_id": fields["reference"],
+            "applicant_name": fields["applicant_name"],
+            "proposal_title": fields["proposal_title"],
+            "award_amount": fields["award_amount"],
+        }}}
+    )
+    # Letters are per application, so the superseded file has no other readers
+    if previous_file_id is not None and previous_file_id != file_id:
+        try:
+            await bucket.delete(previous_file_id)
+        except NoFile:
+            pass
+    return outcome
+
+@traced
+async def generate_award_letters(db: AsyncIOMotorDatabase, job_id: ObjectId, application_ids: List[str], generated_by: str) -> dict:
+    """Job body: render letters for the given applications in parallel across the process pool; returns the counts"""
+    progress = {"total": len(application_ids), "rendered": 0, "cached": 0, "failed": 0}
+    await update_job(db, job_id, {"progress": progress})
+    errors = []
+    # Enough in flight to keep every renderer process busy without loading the whole batch at once
+    limit = asyncio.Semaphore(settings.pdf_render_workers * 2)
+
+    async def generate(application: dict) -> None:
+        async with limit:
+            try:
+                progress[await _render_and_store(db, application, generated_by)] += 1
+            except Exception as e:
+                logger.exception("Award letter generation failed for %s", application["_id"])
+                progress["failed"] += 1
+                errors.append({"application_id": str(application["_id"]), "error": str(e)})
+                await db.applications.update_one(
+                    {"_id": application["_id"]},
+                    {"$set": {"award_letter.status": "failed", "award_letter.error": str(e)}}
+                )
+
+    object_ids = [ObjectId(application_id) for application_id in application_ids]
+    applications = await db.applications.find({"_id": {"$in": object_ids}}, LETTER_PROJECTION).to_list(None)
+    await asyncio.gather(*(generate(application) for application in applications))
+    await update_job(
+        db, job_id,
+        {"status": "completed", "finished_at": datetime.utcnow(), "progress": progress},
+        push_errors=errors
+    )
+    return progress
+
+@register_job_handler(AWARD_LETTER_JOB_TYPE)
+async def run_award_letter_job(db: AsyncIOMotorDatabase, job: dict) -> None:
+    application_ids = job["params"]["application_ids"]
+    try:
+        progress = await generate_award_letters(db, job["_id"], application_ids, job["created_by"])
+    except Exception as e:
+        # Out of retries: don't leave the letters pending forever
+        if job["attempts"] >= job["max_attempts"]:
+            await db.applications.update_many(
+                {"_id": {"$in": [ObjectId(application_id) for application_id in application_ids]}, "award_letter.job_id": job["_id"], "award_letter.status": "pending"},
+                {"$set": {"award_letter.status": "failed", "award_letter.error": str(e)}}
+            )
+        raise
+    if progress["failed"]:
+        # Let a retry of a failed letter queue a fresh job rather than join this finished one
+        await db.jobs.update_one({"_id": job["_id"]}, {"$unset": {"idempotency_key": ""}})
+
+@traced
+async def request_award_letters(db: AsyncIOMotorDatabase, application_ids: List[str], requested_by: str, params: dict = None) -> Optional[dict]:
+    """Queue a letter job, or return None when a single requested letter is already up to date"""
+    priority, idempotency_key = PRIORITY_NORMAL, None
+    if len(application_ids) == 1:
+        application = await db.applications.find_one({"_id": ObjectId(application_ids[0])}, LETTER_PROJECTION)
+        if application:
+            cache_key = letter_cache_key(letter_fields(application))
+            if _is_current(application, cache_key):
+                return None
+            # Someone is waiting on this one; repeated clicks join the job already queued
+            priority, idempotency_key = PRIORITY_HIGH, f"{AWARD_LETTER_JOB_TYPE}:{application_ids[0]}:{cache_key}"
+
+    # Mark the letters pending before a worker can pick the job up, and attach the job only to
+    # those still pending: a worker that already finished must not be overwritten
+    object_ids = [ObjectId(application_id) for application_id in application_ids]
+    await db.applications.update_many({"_id": {"$in": object_ids}}, {"$set": {"award_letter.status": "pending"}})
+    job = await enqueue_job(
+        db, AWARD_LETTER_JOB_TYPE, requested_by, {"application_ids": application_ids, **(params or {})},
+        priority=priority, idempotency_key=idempotency_key
+    )
+    await db.applications.update_many(
+        {"_id": {"$in": object_ids}, "award_letter.status": "pending"},
+        {"$set": {"award_letter.job_id": job["_id"]}}
+    )
+    return job
+
+async def open_award_letter(db: AsyncIOMotorDatabase, letter: dict):
+    """GridFS download stream for a generated letter, or None if the file is missing"""
+    try:
+        return await _bucket(db).open_download_stream(letter["file_id"])
+    except NoFile:
+        return None
@@ -0,0 +1,149 @@
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from fastapi import UploadFile
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from starlette.concurrency import run_in_threadpool
+from datetime import datetime, timedelta
+import asyncio
+import logging
+
+from ..utils.tracing import traced
+from ..utils.uploads import blob_path, save_upload
+
+logger = logging.getLogger(__name__)
+
+# One record per stored file in db.blobs, keyed by SHA-256:
+#   {_id: sha256, size, ref_count, created_at, last_referenced_at, deleting, deleting_at}
+# Every DocumentVersion with a sha256 holds one reference.
+
+BLOB_ACQUIRE_RETRIES = 50
+BLOB_ACQUIRE_RETRY_DELAY = 0.05
+# A blob left in the deleting state this long belongs to a worker that died mid-removal
+STALE_DELETE_AFTER = timedelta(minutes=5)
+
+async def acquire_blob(db: AsyncIOMotorDatabase, sha256: str, size: int) -> None:
+    """Add a reference to a blob, creating its record on first use"""
+    now = datetime.utcnow()
+    for _ in range(BLOB_ACQUIRE_RETRIES):
+        try:
+            await db.blobs.update_one(
+                {"_id": sha256, "deleting": {"$ne": True}},
+                {
+                    "$inc": {"ref_count": 1},
+                    "$set": {"last_referenced_at": now},
+                    "$setOnInsert": {"size": size, "created_at": now}
+                },
+                upsert=True
+            )
+            return
+        except DuplicateKeyError:
+            # The last reference was just dropped and the file is being removed; wait for that to finish
+            await asyncio.sleep(BLOB_ACQUIRE_RETRY_DELAY)
+    raise RuntimeError(f"Blob {sha256} is stuck in deletion")
+
+def _remove_file(sha256: str) -> None:
+    try:
+        blob_path(sha256).unlink()
+    except FileNotFoundError:
+        pass
+
+async def _delete_blob(db: AsyncIOMotorDatabase, sha256: str, claim_filter: dict) -> bool:
+    claimed = await db.blobs.find_one_and_update(
+        {"_id": sha256, **claim_filter},
+        {"$set": {"deleting": True, "deleting_at": datetime.utcnow()}}
+    )
+    if not claimed:
+        return False
+    # Uploads of the same content block on the claimed record until it is gone, so the file
+    # cannot be re-committed between removing it and deleting the record
+    await run_in_threadpool(_remove_file, sha256)
+    await db.blobs.delete_one({"_id": sha256, "deleting": True})
+    return True
+
+@traced
+async def release_blob(db: AsyncIOMotorDatabase, sha256: str) -> bool:
+    """Drop a reference; returns True when it was the last one and the file was removed"""
+    blob = await db.blobs.find_one_and_update(
+        {"_id": sha256, "ref_count": {"$gt": 0}},
+        {"$inc": {"ref_count": -1}},
+        return_document=ReturnDocument.AFTER
+    )
+    if blob is None or blob["ref_count"] > 0:
+        return False
+    return await _delete_blob(db, sha256, {"ref_count": 0, "deleting": {"$ne": True}})
+
+@traced
+async def store_upload(db: AsyncIOMotorDatabase, file: UploadFile) -> dict:
+    """Save an upload to the blob store and take a reference to it for the caller"""
+    acquired = []
+
+    async def acquire(sha256: str, size: int) -> None:
+        await acquire_blob(db, sha256, size)
+        acquired.append(sha256)
+
+    try:
+        return await save_upload(file, before_commit=acquire)
+    except BaseException:
+        if acquired:
+            await release_blob(db, acquired[0])
+        raise
+
+@traced
+async def collect_garbage(db: AsyncIOMotorDatabase) -> int:
+    """Remove unreferenced blobs left behind by failed requests or workers that died mid-delete"""
+    stale_before = datetime.utcnow() - STALE_DELETE_AFTER
+    removed = 0
+    async for blob in db.blobs.find({"ref_count": {"$lte": 0}}, {"_id": 1}):
+        claim_filter = {
+            "ref_count": {"$lte": 0},
+            "$or": [{"deleting": {"$ne": True}}, {"deleting_at": {"$lt": stale_before}}]
+        }
+        if await _delete_blob(db, blob["_id"], claim_filter):
+            removed += 1
+    if removed:
+        logger.info("Removed %d unreferenced blobs", removed)
+    return removed
+
+@traced
+async def get_storage_usage(db: AsyncIOMotorDatabase) -> dict:
+    """Bytes on disk against bytes referenced by document versions, overall and per folder"""
+    totals = await db.blobs.aggregate([
+        {"$group": {
+            "_id": None,
+            "blobs": {"$sum": 1},
+            "stored_bytes": {"$sum": "$size"},
+            "references": {"$sum": "$ref_count"},
+            "referenced_bytes": {"$sum": {"$multiply": ["$size", "$ref_count"]}}
+        }}
+    ]).to_list(1)
+    totals = totals[0] if totals else {"blobs": 0, "stored_bytes": 0, "references": 0, "referenced_bytes": 0}
+
+    folders = {}
+    async for row in db.documents.aggregate([
+        {"$unwind": "$versions"},
+        {"$group": {
+            "_id": {"folder": "$folder", "sha256": "$versions.sha256"},
+            "versions": {"$sum": 1},
+            "size": {"$first": "$versions.size_bytes"}
+        }},
+        {"$group": {
+            "_id": "$_id.folder",
+            "versions": {"$sum": "$versions"},
+            # Versions from before content addressing have no hash and are not deduplicated
+            "legacy_versions": {"$sum": {"$cond": [{"$ifNull": ["$_id.sha256", False]}, 0, "$versions"]}},
+            "referenced_bytes": {"$sum": {"$multiply": [{"$ifNull": ["$size", 0]}, "$versions"]}},
+            "stored_bytes": {"$sum": {"$ifNull": ["$size", 0]}}
+        }}
+    ]):
+        folders[row["_id"]] = {key: value for key, value in row.items() if key != "_id"}
+
+    stored, referenced = totals["stored_bytes"], totals["referenced_bytes"]
+    return {
+        "blobs": totals["blobs"],
+        "references": totals["references"],
+        "stored_bytes": stored,
+        "referenced_bytes": referenced,
+        "saved_bytes": referenced - stored,
+        "dedup_ratio": round(referenced / stored, 2) if stored else 1.0,
+        "folders": folders
+    }
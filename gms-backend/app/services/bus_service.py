@@ -0,0 +1,132 @@
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import CursorType
+from pymongo.errors import CollectionInvalid, PyMongoError
+from typing import Callable, Dict, Hashable, Optional
+from datetime import datetime
+import asyncio
+import logging
+import os
+import socket
+
+from ..config import settings
+from ..utils.cache import CACHES, TTLCache, invalidate_cache
+
+logger = logging.getLogger(__name__)
+
+# Messages every API worker must see: cache invalidations, and change events when there is no
+# change stream. They are inserted into a capped collection that each worker tails with an
+# awaiting cursor, so delivery takes at most BUS_AWAIT_MS. The publishing process applies its
+# own message immediately and skips it when it comes back round.
+
+BUS_COLLECTION = "bus_messages"
+INVALIDATE = "invalidate"
+
+BusHandler = Callable[[dict], None]
+
+# message kind -> handler(message); modules register their handlers on import
+BUS_HANDLERS: Dict[str, BusHandler] = {}
+
+_origin: Optional[str] = None
+_listener: Optional[asyncio.Task] = None
+
+def register_bus_handler(kind: str) -> Callable[[BusHandler], BusHandler]:
+    def decorator(handler: BusHandler) -> BusHandler:
+        BUS_HANDLERS[kind] = handler
+        return handler
+    return decorator
+
+@register_bus_handler(INVALIDATE)
+def _apply_invalidation(message: dict) -> None:
+    keys = message.get("keys") or []
+    if not keys:
+        invalidate_cache(message["cache"])
+    for key in keys:
+        invalidate_cache(message["cache"], key)
+
+def _dispatch(message: dict) -> None:
+    handler = BUS_HANDLERS.get(message.get("kind"))
+    if handler is None:
+        return
+    try:
+        handler(message)
+    except Exception:
+        logger.exception("Bus handler for %s failed", message.get("kind"))
+
+async def publish(db: AsyncIOMotorDatabase, kind: str, message: dict) -> None:
+    """Apply a message in this process now and broadcast it to the other workers"""
+    message = {**message, "kind": kind}
+    _dispatch(message)
+    try:
+        await db[BUS_COLLECTION].insert_one({**message, "origin": _origin, "at": datetime.utcnow()})
+    except PyMongoError:
+        # Other workers catch up when their cache entries expire
+        logger.exception("Failed to broadcast %s message", kind)
+
+async def publish_invalidation(db: AsyncIOMotorDatabase, cache: TTLCache, *keys: Hashable) -> None:
+    """Drop keys (or, with none given, everything) from a cache in every worker"""
+    await publish(db, INVALIDATE, {"cache": cache.name, "keys": list(keys)})
+
+async def ensure_bus_collection(db: AsyncIOMotorDatabase) -> None:
+    """Create the capped collection; tailable cursors only work on capped collections"""
+    try:
+        await db.create_collection(BUS_COLLECTION, capped=True, size=settings.bus_size_bytes)
+    except CollectionInvalid:
+        pass
+
+async def _latest_id(db: AsyncIOMotorDatabase):
+    latest = await db[BUS_COLLECTION].find_one({}, {"_id": 1}, sort=[("$natural", -1)])
+    return latest["_id"] if latest else None
+
+async def _tail(db: AsyncIOMotorDatabase, last_id):
+    """Follow the collection from just after last_id until the cursor dies; returns the last id seen.
+
+    Messages are matched by position rather than by _id order, since ObjectIds from different
+    processes created in the same second do not sort by insertion.
+    """
+    cursor = db[BUS_COLLECTION].find({}, cursor_type=CursorType.TAILABLE_AWAIT).max_await_time_ms(settings.bus_await_ms)
+    catching_up = last_id is not None
+    skipped = None
+    while cursor.alive:
+        async for message in cursor:
+            if catching_up:
+                catching_up = message["_id"] != last_id
+                skipped = message["_id"]
+                continue
+            last_id = message["_id"]
+            if message.get("origin") != _origin:
+                _dispatch(message)
+        if catching_up:
+            # Our position was overwritten while we were away, so messages may have been missed
+            logger.warning("Missed bus messages; clearing all caches in this worker")
+            for cache in CACHES.values():
+                cache.invalidate()
+            catching_up = False
+            last_id = skipped or last_id
+    return last_id
+
+async def _listen(db: AsyncIOMotorDatabase, last_id) -> None:
+    while True:
+        try:
+            last_id = await _tail(db, last_id)
+        except PyMongoError:
+            logger.exception("Bus cursor interrupted, reconnecting")
+        # A tailable cursor on an empty collection dies at once; poll until something arrives
+        await asyncio.sleep(settings.bus_await_ms / 1000)
+
+async def start_bus_listener(db: AsyncIOMotorDatabase) -> None:
+    """Tail the bus from its current end (called from the app lifespan, once per worker)"""
+    global _origin, _listener
+    _origin = f"{socket.gethostname()}:{os.getpid()}"
+    try:
+        last_id = await _latest_id(db)
+    except PyMongoError:
+        logger.exception("Could not read the bus position; starting from the oldest message")
+        last_id = None
+    _listener = asyncio.ensure_future(_listen(db, last_id))
+
+async def stop_bus_listener() -> None:
+    global _listener
+    if _listener is not None:
+        _listener.cancel()
+        await asyncio.gather(_listener, return_exceptions=True)
+        _listener = None
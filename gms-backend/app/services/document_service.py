@@ -4,8 +4,11 @@ from typing import Optional, List
 from bson import ObjectId
 from datetime import datetime
 import secrets
+from ..utils.tracing import traced
+from .blob_service import release_blob
 
-async def create_document(db: AsyncIOMotorDatabase, name: str, folder: str, filename: str, uploaded_by: str, file_size: str, notes: str = None) -> Document:
+@traced
+async def create_document(db: AsyncIOMotorDatabase, name: str, folder: str, filename: str, uploaded_by: str, file_size: str, notes: str = None, sha256: str = None, size_bytes: int = None) -> Document:
     document_id = f"doc_{secrets.token_hex(8)}"
     
     first_version = DocumentVersion(
@@ -15,7 +18,9 @@ async def create_document(db: AsyncIOMotorDatabase, name: str, folder: str, file
         uploaded_by=uploaded_by,
         uploaded_at=datetime.utcnow(),
         file_size=file_size,
-        notes=notes
+        notes=notes,
+        sha256=sha256,
+        size_bytes=size_bytes
     )
     
     document_data = {
@@ -31,6 +36,7 @@ async def create_document(db: AsyncIOMotorDatabase, name: str, folder: str, file
     document_data["_id"] = result.inserted_id
     return Document(**document_data)
 
+@traced
 async def get_document_by_id(db: AsyncIOMotorDatabase, document_id: str) -> Optional[Document]:
     if not ObjectId.is_valid(document_id):
         return None
@@ -39,24 +45,28 @@ async def get_document_by_id(db: AsyncIOMotorDatabase, document_id: str) -> Opti
         return Document(**document)
     return None
 
+@traced
 async def get_all_documents(db: AsyncIOMotorDatabase) -> List[Document]:
     documents = []
     async for document in db.documents.find():
         documents.append(Document(**document))
     return documents
 
+@traced
 async def get_documents_by_folder(db: AsyncIOMotorDatabase, folder: str) -> List[Document]:
     documents = []
     async for document in db.documents.find({"folder": folder}):
         documents.append(Document(**document))
     return documents
 
+@traced
 async def get_documents_by_user(db: AsyncIOMotorDatabase, user_email: str) -> List[Document]:
     documents = []
     async for document in db.documents.find({"versions.uploaded_by": user_email}):
         documents.append(Document(**document))
     return documents
 
+@traced
 async def search_documents(db: AsyncIOMotorDatabase, query: str, user_email: str = None, is_restricted_user: bool = False) -> List[Document]:
     search_filter = {}
     
@@ -75,7 +85,8 @@ async def search_documents(db: AsyncIOMotorDatabase, query: str, user_email: str
         documents.append(Document(**document))
     return documents
 
-async def upload_new_version(db: AsyncIOMotorDatabase, document_id: str, filename: str, uploaded_by: str, file_size: str, notes: str = None) -> Optional[Document]:
+@traced
+async def upload_new_version(db: AsyncIOMotorDatabase, document_id: str, filename: str, uploaded_by: str, file_size: str, notes: str = None, sha256: str = None, size_bytes: int = None) -> Optional[Document]:
     if not ObjectId.is_valid(document_id):
         return None
     
@@ -91,7 +102,9 @@ async def upload_new_version(db: AsyncIOMotorDatabase, document_id: str, filenam
         uploaded_by=uploaded_by,
         uploaded_at=datetime.utcnow(),
         file_size=file_size,
-        notes=notes
+        notes=notes,
+        sha256=sha256,
+        size_bytes=size_bytes
     )
     
     result = await db.documents.update_one(
@@ -109,12 +122,20 @@ async def upload_new_version(db: AsyncIOMotorDatabase, document_id: str, filenam
         return await get_document_by_id(db, document_id)
     return None
 
+@traced
 async def delete_document(db: AsyncIOMotorDatabase, document_id: str) -> bool:
     if not ObjectId.is_valid(document_id):
         return False
-    result = await db.documents.delete_one({"_id": ObjectId(document_id)})
-    return result.deleted_count > 0
+    document = await db.documents.find_one_and_delete({"_id": ObjectId(document_id)}, {"versions.sha256": 1})
+    if not document:
+        return False
+    # Each version holds its own reference, even when several share the same content
+    for version in document.get("versions", []):
+        if version.get("sha256"):
+            await release_blob(db, version["sha256"])
+    return True
 
+@traced
 async def delete_document_version(db: AsyncIOMotorDatabase, document_id: str, version_id: str) -> Optional[Document]:
     if not ObjectId.is_valid(document_id):
         return None
@@ -132,6 +153,10 @@ async def delete_document_version(db: AsyncIOMotorDatabase, document_id: str, ve
     )
     
     if result.modified_count:
+        removed_version = next((v for v in document.versions if v.id == version_id), None)
+        if removed_version and removed_version.sha256:
+            await release_blob(db, removed_version.sha256)
+        
         # Update current version if we deleted the current one
         updated_document = await get_document_by_id(db, document_id)
         if updated_document and updated_document.versions:
@@ -143,6 +168,7 @@ async def delete_document_version(db: AsyncIOMotorDatabase, document_id: str, ve
         return await get_document_by_id(db, document_id)
     return None
 
+@traced
 async def get_document_stats(db: AsyncIOMotorDatabase) -> dict:
     pipeline = [
         {"$group": {"_id": "$folder", "count": {"$sum": 1}}},
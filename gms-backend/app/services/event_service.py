@@ -0,0 +1,163 @@
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import PyMongoError
+from bson import ObjectId
+from datetime import datetime
+from typing import Optional, Set
+import asyncio
+import logging
+
+from ..config import settings
+from .bus_service import publish, register_bus_handler
+from .id_service import find_by_id
+from .job_service import run_in_background
+
+logger = logging.getLogger(__name__)
+
+# Change events for applications and projects, fanned out to SSE subscribers in this process.
+# With a replica set they come from a MongoDB change stream (every writer, every process);
+# otherwise the write paths publish them through notify_change and the bus carries them to
+# the other workers.
+
+WATCHED_COLLECTIONS = ("applications", "projects")
+CHANGE_EVENT = "change_event"
+STAFF_ROLES = ("Admin", "Grants Manager")
+
+# Pushed to subscriber queues to end their stream (shutdown, or too slow to keep up)
+CLOSE = None
+
+class EventBus:
+    def __init__(self):
+        self._subscribers: Set[asyncio.Queue] = set()
+
+    @property
+    def has_subscribers(self) -> bool:
+        return bool(self._subscribers)
+
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=settings.event_queue_size)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self._subscribers.discard(queue)
+
+    def publish(self, event: dict) -> None:
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # A client this far behind should reconnect and refetch rather than stall the bus
+                self.unsubscribe(queue)
+                queue.get_nowait()
+                queue.put_nowait(CLOSE)
+
+    def close(self) -> None:
+        for queue in list(self._subscribers):
+            self.unsubscribe(queue)
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(CLOSE)
+
+event_bus = EventBus()
+
+@register_bus_handler(CHANGE_EVENT)
+def _receive_change(message: dict) -> None:
+    event_bus.publish(message["event"])
+
+_source: Optional[str] = None  # "change_stream" or "bus"
+_watcher: Optional[asyncio.Task] = None
+
+def is_visible(event: dict, user) -> bool:
+    """Staff see every change; researchers only changes to their own applications and projects"""
+    return user.role in STAFF_ROLES or (event.get("owner") is not None and event["owner"] == user.email)
+
+def public_event(event: dict) -> dict:
+    return {key: value for key, value in event.items() if key != "owner"}
+
+async def _owner(db: AsyncIOMotorDatabase, collection: str, document: Optional[dict]) -> Optional[str]:
+    if not document:
+        return None
+    if collection == "applications":
+        return document.get("email")
+    application_id = document.get("application_id") or document.get("applicationId")
+    if not application_id:
+        return None
+    application = await find_by_id(db, "applications", application_id, {"email": 1})
+    return application.get("email") if application else None
+
+async def _build_event(db: AsyncIOMotorDatabase, collection: str, document_id, operation: str, document: Optional[dict]) -> dict:
+    return {
+        "type": f"{collection[:-1]}.{operation}",
+        "id": str(document_id),
+        "status": (document or {}).get("status"),
+        "owner": await _owner(db, collection, document),
+        "at": datetime.utcnow().isoformat()
+    }
+
+# Only what events need, so change lookups and fallback reads stay small
+_EVENT_PROJECTION = {"status": 1, "email": 1, "application_id": 1, "applicationId": 1}
+
+async def _publish_lookup(db: AsyncIOMotorDatabase, collection: str, document_id, operation: str) -> None:
+    try:
+        document = None
+        if operation != "deleted":
+            document = await db[collection].find_one({"_id": ObjectId(document_id)}, _EVENT_PROJECTION)
+        event = await _build_event(db, collection, document_id, operation, document)
+        await publish(db, CHANGE_EVENT, {"event": event})
+    except PyMongoError:
+        logger.exception("Failed to publish %s change for %s", collection, document_id)
+
+def notify_change(db: AsyncIOMotorDatabase, collection: str, document_id, operation: str = "updated") -> None:
+    """Publish a change from a write path; a no-op when a change stream already sees every write"""
+    if _source != "bus" or not ObjectId.is_valid(str(document_id)):
+        return
+    run_in_background(_publish_lookup(db, collection, str(document_id), operation))
+
+_OPERATIONS = {"insert": "created", "update": "updated", "replace": "updated", "delete": "deleted"}
+
+async def _watch(db: AsyncIOMotorDatabase) -> None:
+    pipeline = [
+        {"$match": {"ns.coll": {"$in": list(WATCHED_COLLECTIONS)}, "operationType": {"$in": list(_OPERATIONS)}}},
+        # Drop updateDescription and everything but the fields events use
+        {"$project": {"ns": 1, "documentKey": 1, "operationType": 1,
+                      **{f"fullDocument.{field}": 1 for field in _EVENT_PROJECTION}}}
+    ]
+    resume_token = None
+    while True:
+        try:
+            async with db.watch(pipeline, full_document="updateLookup", resume_after=resume_token) as stream:
+                async for change in stream:
+                    resume_token = stream.resume_token
+                    if not event_bus.has_subscribers:
+                        continue
+                    collection = change["ns"]["coll"]
+                    event_bus.publish(await _build_event(
+                        db, collection, change["documentKey"]["_id"],
+                        _OPERATIONS[change["operationType"]], change.get("fullDocument")
+                    ))
+        except PyMongoError:
+            logger.exception("Change stream interrupted, reconnecting")
+            await asyncio.sleep(1)
+
+async def start_event_source(db: AsyncIOMotorDatabase) -> None:
+    """Use a change stream when the deployment supports one, else publish from the write paths"""
+    global _source, _watcher
+    try:
+        hello = await db.command("hello")
+    except PyMongoError:
+        logger.warning("Could not detect the deployment type; publishing change events from the write paths")
+        hello = {}
+    if "setName" in hello or hello.get("msg") == "isdbgrid":
+        _source = "change_stream"
+        _watcher = asyncio.ensure_future(_watch(db))
+    else:
+        _source = "bus"
+    logger.info("Change events from %s", _source.replace("_", " "))
+
+async def stop_event_source() -> None:
+    global _watcher
+    event_bus.close()
+    if _watcher is not None:
+        _watcher.cancel()
+        await asyncio.gather(_watcher, return_exceptions=True)
+        _watcher = None
@@ -0,0 +1,157 @@
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from typing import Optional, List, Dict, Any, AsyncIterator
+from datetime import date, datetime, timedelta
+from bson import ObjectId
+import csv
+import io
+import json
+
+# Cursor batch size and the approximate size of each chunk handed to the response
+EXPORT_BATCH_SIZE = 500
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+APPLICATION_EXPORT_COLUMNS = [
+    "id", "grantId", "applicantName", "email", "proposalTitle", "institution",
+    "department", "status", "budgetAmount", "awardAmount", "submissionDate",
+    "revisionCount", "createdAt", "updatedAt"
+]
+
+PROJECT_EXPORT_COLUMNS = [
+    "id", "applicationId", "title", "status", "startDate", "endDate",
+    "milestoneCount", "completedMilestones", "requisitionCount",
+    "requisitionTotal", "createdAt", "updatedAt"
+]
+
+def _date_range_filter(date_from: Optional[date], date_to: Optional[date]) -> Dict[str, str]:
+    """Build a range filter over ISO date strings (date_to is inclusive)"""
+    date_filter = {}
+    if date_from:
+        date_filter["$gte"] = date_from.isoformat()
+    if date_to:
+        date_filter["$lt"] = (date_to + timedelta(days=1)).isoformat()
+    return date_filter
+
+def _to_cell(value: Any) -> Any:
+    """Convert BSON values to something both csv and json can serialise"""
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+async def _encode_rows(rows: AsyncIterator[Dict[str, Any]], columns: List[str], export_format: str) -> AsyncIterator[str]:
+    """Encode rows as CSV or NDJSON, yielding chunks of roughly EXPORT_CHUNK_SIZE"""
+    buffer = io.StringIO()
+    writer = None
+    if export_format == "csv":
+        writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction="ignore")
+        writer.writeheader()
+
+    async for row in rows:
+        row = {column: _to_cell(row.get(column)) for column in columns}
+        if writer:
+            writer.writerow(row)
+        else:
+            buffer.write(json.dumps(row, default=str))
+            buffer.write("\n")
+
+        if buffer.tell() >= EXPORT_CHUNK_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+async def _application_rows(db: AsyncIOMotorDatabase, query: dict) -> AsyncIterator[Dict[str, Any]]:
+    projection = {
+        "grantId": 1, "applicantName": 1, "email": 1, "proposalTitle": 1,
+        "institution": 1, "department": 1, "status": 1, "budgetAmount": 1,
+        "signoff_workflow.award_amount": 1, "submissionDate": 1,
+        "revisionCount": 1, "createdAt": 1, "updatedAt": 1
+    }
+    cursor = db.applications.find(query, projection, batch_size=EXPORT_BATCH_SIZE)
+    async for doc in cursor:
+        doc["id"] = doc.pop("_id")
+        doc["awardAmount"] = (doc.pop("signoff_workflow", None) or {}).get("award_amount")
+        yield doc
+
+def stream_applications_export(
+    db: AsyncIOMotorDatabase,
+    export_format: str,
+    grant_call_id: Optional[str] = None,
+    status: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None
+) -> AsyncIterator[str]:
+    """Stream applications straight from the cursor, filtered by submission date"""
+    query = {}
+    if grant_call_id:
+        query["grantId"] = grant_call_id
+    if status:
+        query["status"] = status
+    submission_filter = _date_range_filter(date_from, date_to)
+    if submission_filter:
+        query["submissionDate"] = submission_filter
+
+    return _encode_rows(_application_rows(db, query), APPLICATION_EXPORT_COLUMNS, export_format)
+
+async def _project_rows(db: AsyncIOMotorDatabase, match: dict, grant_call_id: Optional[str]) -> AsyncIterator[Dict[str, Any]]:
+    if grant_call_id:
+        # Projects only reference their application, so resolve the call's application ids first
+        application_ids = [
+            str(app["_id"])
+            async for app in db.applications.find({"grantId": grant_call_id}, {"_id": 1})
+        ]
+        match["$or"] = [
+            {"application_id": {"$in": application_ids}},
+            {"applicationId": {"$in": application_ids}}
+        ]
+
+    # Projects are stored with both snake_case and camelCase keys, so coalesce server side
+    pipeline = [
+        {"$match": match},
+        {"$project": {
+            "_id": 0,
+            "id": {"$toString": "$_id"},
+            "applicationId": {"$ifNull": ["$application_id", "$applicationId"]},
+            "title": 1,
+            "status": 1,
+            "startDate": {"$ifNull": ["$start_date", "$startDate"]},
+            "endDate": {"$ifNull": ["$end_date", "$endDate"]},
+            "milestoneCount": {"$size": {"$ifNull": ["$milestones", []]}},
+            "completedMilestones": {"$size": {"$filter": {
+                "input": {"$ifNull": ["$milestones", []]},
+                "cond": {"$eq": ["$$this.status", "completed"]}
+            }}},
+            "requisitionCount": {"$size": {"$ifNull": ["$requisitions", []]}},
+            "requisitionTotal": {"$sum": {"$ifNull": ["$requisitions.amount", []]}},
+            "createdAt": {"$ifNull": ["$created_at", "$createdAt"]},
+            "updatedAt": {"$ifNull": ["$updated_at", "$updatedAt"]}
+        }}
+    ]
+    async for doc in db.projects.aggregate(pipeline, batchSize=EXPORT_BATCH_SIZE):
+        yield doc
+
+def stream_projects_export(
+    db: AsyncIOMotorDatabase,
+    export_format: str,
+    grant_call_id: Optional[str] = None,
+    status: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None
+) -> AsyncIterator[str]:
+    """Stream projects with per-project milestone and requisition totals, filtered by start date"""
+    match = {}
+    if status:
+        match["status"] = status
+    start_filter = _date_range_filter(date_from, date_to)
+    if start_filter:
+        match["$and"] = [{"$or": [{"start_date": start_filter}, {"startDate": start_filter}]}]
+
+    return _encode_rows(_project_rows(db, match, grant_call_id), PROJECT_EXPORT_COLUMNS, export_format)
@@ -1,101 +1,183 @@
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from ..models.grant_call import GrantCall
 from ..schemas.grant_call import GrantCallCreate, GrantCallUpdate
-from typing import Optional, List
-from bson import ObjectId
-from datetime import datetime
+from ..config import settings
+from ..utils.cache import register_cache
+from ..utils.tracing import traced
+from .bus_service import publish_invalidation
+from .id_service import find_by_id, resolve_id
+from .job_service import register_job_handler, schedule_periodic, update_job
+from typing import Optional, List, Tuple
+from datetime import date, datetime, time, timedelta, timezone
+import logging
 
+logger = logging.getLogger(__name__)
+
+CLOSE_EXPIRED_JOB_TYPE = "grant_call_close_expired"
+
+# The researcher catalog of open calls; expires no later than the earliest open deadline
+open_grant_calls_cache = register_cache("grant_calls.open", settings.grant_call_cache_ttl_seconds, max_entries=1)
+
+def parse_deadline(deadline) -> Optional[datetime]:
+    """Naive UTC datetime for a stored deadline string; a bare date means the end of that day"""
+    if not isinstance(deadline, str) or not deadline:
+        return None
+    try:
+        parsed = datetime.fromisoformat(deadline.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if len(deadline) == 10:
+        parsed = datetime.combine(parsed.date(), time.max)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+GRANT_CALL_STATUSES = ("Open", "Closed")
+GRANT_CALL_VISIBILITIES = ("Public", "Restricted")
+
+# sort parameter -> stored field; prefix with "-" for descending. _id breaks ties so pages are stable.
+GRANT_CALL_SORTS = {"deadline": "deadline_at", "title": "title"}
+
+def canonical_choice(value: Optional[str], choices) -> Optional[str]:
+    """The stored spelling of an enum value given in any case, or None if it is not one"""
+    if value is None:
+        return None
+    return next((choice for choice in choices if choice.lower() == value.strip().lower()), None)
+
+def build_grant_call_query(
+    status: Optional[str] = None,
+    grant_type: Optional[str] = None,
+    sponsor: Optional[str] = None,
+    visibility: Optional[str] = None,
+    deadline_from: Optional[date] = None,
+    deadline_to: Optional[date] = None
+) -> dict:
+    """Exact-match filter over canonical values, so it can be served by the grant_calls compound indexes"""
+    query = {}
+    if status:
+        query["status"] = status
+    if grant_type:
+        query["type"] = grant_type
+    if sponsor:
+        query["sponsor"] = sponsor
+    if visibility:
+        query["visibility"] = visibility
+    deadline_filter = {}
+    if deadline_from:
+        deadline_filter["$gte"] = datetime.combine(deadline_from, time.min)
+    if deadline_to:
+        deadline_filter["$lt"] = datetime.combine(deadline_to + timedelta(days=1), time.min)
+    if deadline_filter:
+        query["deadline_at"] = deadline_filter
+    return query
+
+def build_grant_call_sort(sort: str) -> Optional[List[Tuple[str, int]]]:
+    """Sort spec for a sort parameter such as "deadline" or "-title"; None if the key is unknown"""
+    direction = -1 if sort.startswith("-") else 1
+    field = GRANT_CALL_SORTS.get(sort.lstrip("-"))
+    if field is None:
+        return None
+    return [(field, direction), ("_id", direction)]
+
+@traced
 async def create_grant_call(db: AsyncIOMotorDatabase, grant_call_data: GrantCallCreate) -> GrantCall:
     grant_call_dict = grant_call_data.dict()
+    grant_call_dict["deadline_at"] = parse_deadline(grant_call_dict["deadline"])
     grant_call_dict["created_at"] = datetime.utcnow()
     grant_call_dict["updated_at"] = datetime.utcnow()
     result = await db.grant_calls.insert_one(grant_call_dict)
     grant_call_dict["_id"] = result.inserted_id
+    await publish_invalidation(db, open_grant_calls_cache)
     return GrantCall(**grant_call_dict)
 
+@traced
 async def get_grant_call_by_id(db: AsyncIOMotorDatabase, grant_call_id: str) -> Optional[GrantCall]:
-    # Try to find by frontend string ID first
-    grant_call = await db.grant_calls.find_one({"id": grant_call_id})
-    
-    # If not found and it's a valid ObjectId, try MongoDB _id
-    if not grant_call and ObjectId.is_valid(grant_call_id):
-        grant_call = await db.grant_calls.find_one({"_id": ObjectId(grant_call_id)})
-    
+    grant_call = await find_by_id(db, "grant_calls", grant_call_id)
     if grant_call:
         try:
             return GrantCall(**grant_call)
         except Exception as e:
-            print(f"Error creating GrantCall model from data: {e}")
-            print(f"Data: {grant_call}")
+            logger.warning("Error creating GrantCall model from document %s: %s", grant_call.get("_id"), e)
             return None
     return None
 
-async def get_all_grant_calls(db: AsyncIOMotorDatabase) -> List[GrantCall]:
-    grant_calls = []
-    try:
-        async for grant_call_doc in db.grant_calls.find():
-            try:
-                grant_call = GrantCall(**grant_call_doc)
-                grant_calls.append(grant_call)
-            except Exception as e:
-                print(f"Error creating GrantCall model from document: {e}")
-                print(f"Document: {grant_call_doc}")
-                continue
-    except Exception as e:
-        print(f"Error fetching grant calls from database: {e}")
+@traced
+async def get_open_grant_calls(db: AsyncIOMotorDatabase) -> List[GrantCall]:
+    cached = open_grant_calls_cache.get()
+    if cached is not None:
+        return list(cached)
     
-    return grant_calls
-
-async def get_grant_calls_by_type(db: AsyncIOMotorDatabase, grant_type: str) -> List[GrantCall]:
     grant_calls = []
+    earliest_deadline = None
     try:
-        async for grant_call_doc in db.grant_calls.find({"type": {"$regex": grant_type, "$options": "i"}}):
+        # Same order as the filtered listings, so the cached path is indistinguishable from them
+        async for grant_call_doc in db.grant_calls.find({"status": "Open"}).sort(build_grant_call_sort("deadline")):
             try:
                 grant_call = GrantCall(**grant_call_doc)
                 grant_calls.append(grant_call)
             except Exception as e:
-                print(f"Error creating GrantCall model from document: {e}")
+                logger.warning("Error creating GrantCall model from document %s: %s", grant_call_doc.get("_id"), e)
                 continue
+            deadline_at = grant_call_doc.get("deadline_at")
+            if deadline_at and (earliest_deadline is None or deadline_at < earliest_deadline):
+                earliest_deadline = deadline_at
     except Exception as e:
-        print(f"Error fetching grant calls by type: {e}")
+        logger.error("Error fetching open grant calls: %s", e)
+        return grant_calls
     
-    return grant_calls
+    ttl = None
+    if earliest_deadline is not None:
+        ttl = max((earliest_deadline - datetime.utcnow()).total_seconds(), 0)
+    open_grant_calls_cache.set(None, grant_calls, ttl)
+    return list(grant_calls)
 
-async def get_open_grant_calls(db: AsyncIOMotorDatabase) -> List[GrantCall]:
+@traced
+async def search_grant_calls(
+    db: AsyncIOMotorDatabase,
+    query: dict,
+    sort: List[Tuple[str, int]],
+    offset: int = 0,
+    limit: Optional[int] = None
+) -> Tuple[List[GrantCall], int]:
+    """One page of grant calls matching query, and the total number that match"""
+    cursor = db.grant_calls.find(query).sort(sort).skip(offset)
+    if limit:
+        cursor = cursor.limit(limit)
     grant_calls = []
-    try:
-        async for grant_call_doc in db.grant_calls.find({"status": "Open"}):
-            try:
-                grant_call = GrantCall(**grant_call_doc)
-                grant_calls.append(grant_call)
-            except Exception as e:
-                print(f"Error creating GrantCall model from document: {e}")
-                continue
-    except Exception as e:
-        print(f"Error fetching open grant calls: {e}")
-    
-    return grant_calls
+    fetched = 0
+    async for grant_call_doc in cursor:
+        fetched += 1
+        try:
+            grant_calls.append(GrantCall(**grant_call_doc))
+        except Exception as e:
+            logger.warning("Error creating GrantCall model from document %s: %s", grant_call_doc.get("_id"), e)
+    # A short page already gives the total; otherwise count, served by the same index as the page
+    if (limit is None or fetched < limit) and (fetched or not offset):
+        return grant_calls, offset + fetched
+    return grant_calls, await db.grant_calls.count_documents(query)
 
+@traced
 async def update_grant_call(db: AsyncIOMotorDatabase, grant_call_id: str, grant_call_update: GrantCallUpdate) -> Optional[GrantCall]:
-    # Try to find by frontend string ID first
-    query = {"id": grant_call_id}
-    
-    # If it's a valid ObjectId, try MongoDB _id instead
-    if ObjectId.is_valid(grant_call_id):
-        query = {"_id": ObjectId(grant_call_id)}
+    object_id = await resolve_id(db, "grant_calls", grant_call_id)
+    if object_id is None:
+        return None
     
     update_data = {k: v for k, v in grant_call_update.dict().items() if v is not None}
     if not update_data:
         return None
     
+    if "deadline" in update_data:
+        update_data["deadline_at"] = parse_deadline(update_data["deadline"])
     update_data["updated_at"] = datetime.utcnow()
     
-    result = await db.grant_calls.update_one(query, {"$set": update_data})
+    result = await db.grant_calls.update_one({"_id": object_id}, {"$set": update_data})
     
     if result.modified_count:
-        return await get_grant_call_by_id(db, grant_call_id)
+        await publish_invalidation(db, open_grant_calls_cache)
+        return await get_grant_call_by_id(db, object_id)
     return None
 
+@traced
 async def toggle_grant_call_status(db: AsyncIOMotorDatabase, grant_call_id: str) -> Optional[GrantCall]:
     grant_call = await get_grant_call_by_id(db, grant_call_id)
     if not grant_call:
@@ -103,27 +185,78 @@ async def toggle_grant_call_status(db: AsyncIOMotorDatabase, grant_call_id: str)
     
     new_status = "Closed" if grant_call.status == "Open" else "Open"
     
-    # Use the same ID format for update as we found the record with
-    query = {"id": grant_call_id}
-    if ObjectId.is_valid(grant_call_id):
-        query = {"_id": ObjectId(grant_call_id)}
-    
     result = await db.grant_calls.update_one(
-        query,
+        {"_id": grant_call.id},
         {"$set": {"status": new_status, "updated_at": datetime.utcnow()}}
     )
     
     if result.modified_count:
-        return await get_grant_call_by_id(db, grant_call_id)
+        await publish_invalidation(db, open_grant_calls_cache)
+        return await get_grant_call_by_id(db, grant_call.id)
     return None
 
+@traced
 async def delete_grant_call(db: AsyncIOMotorDatabase, grant_call_id: str) -> bool:
-    # Try to find by frontend string ID first
-    query = {"id": grant_call_id}
+    object_id = await resolve_id(db, "grant_calls", grant_call_id)
+    if object_id is None:
+        return False
+    
+    result = await db.grant_calls.delete_one({"_id": object_id})
+    if result.deleted_count:
+        await publish_invalidation(db, open_grant_calls_cache)
+    return result.deleted_count > 0
+
+async def backfill_grant_call_deadlines(db: AsyncIOMotorDatabase) -> int:
+    """Derive deadline_at for calls stored without one (seed data, older records); safe to re-run"""
+    updated = 0
+    async for grant_call in db.grant_calls.find({"deadline_at": {"$exists": False}}, {"deadline": 1}):
+        await db.grant_calls.update_one(
+            {"_id": grant_call["_id"]},
+            {"$set": {"deadline_at": parse_deadline(grant_call.get("deadline"))}}
+        )
+        updated += 1
+    if updated:
+        logger.info("Derived deadline_at for %d grant calls", updated)
+    return updated
+
+@traced
+async def close_expired_grant_calls(db: AsyncIOMotorDatabase, start_review: bool = None) -> dict:
+    """Close open calls whose deadline has passed, optionally moving their submitted applications to review.
+
+    A call reopened after its deadline is closed again on the next run; extend the deadline to reopen it.
+    """
+    if start_review is None:
+        start_review = settings.grant_call_close_starts_review
+    now = datetime.utcnow()
+    # Served by the (status, deadline_at) index: only the calls that just expired are read
+    expired = await db.grant_calls.find(
+        {"status": "Open", "deadline_at": {"$lte": now}}, {"_id": 1, "id": 1}
+    ).to_list(None)
+    stats = {"closed": 0, "moved_to_review": 0}
+    if not expired:
+        return stats
+    
+    result = await db.grant_calls.update_many(
+        {"_id": {"$in": [grant_call["_id"] for grant_call in expired]}, "status": "Open"},
+        {"$set": {"status": "Closed", "closed_at": now, "closed_reason": "deadline", "updated_at": now}}
+    )
+    stats["closed"] = result.modified_count
+    await publish_invalidation(db, open_grant_calls_cache)
     
-    # If it's a valid ObjectId, try MongoDB _id instead
-    if ObjectId.is_valid(grant_call_id):
-        query = {"_id": ObjectId(grant_call_id)}
+    if start_review:
+        # Applications reference a call by its ObjectId string or its legacy string id
+        grant_ids = [str(grant_call["_id"]) for grant_call in expired] + [grant_call["id"] for grant_call in expired if grant_call.get("id")]
+        result = await db.applications.update_many(
+            {"grantId": {"$in": grant_ids}, "status": "submitted"},
+            {"$set": {"status": "under_review", "updatedAt": now}}
+        )
+        stats["moved_to_review"] = result.modified_count
     
-    result = await db.grant_calls.delete_one(query)
-    return result.deleted_count > 0
\ No newline at end of file
+    logger.info("Closed %d expired grant calls, %d applications moved to review", stats["closed"], stats["moved_to_review"])
+    return stats
+
+@register_job_handler(CLOSE_EXPIRED_JOB_TYPE)
+async def run_close_expired_job(db: AsyncIOMotorDatabase, job: dict) -> None:
+    await update_job(db, job["_id"], {"progress": await close_expired_grant_calls(db)})
+
+schedule_periodic(CLOSE_EXPIRED_JOB_TYPE, settings.grant_call_close_interval_seconds)
\ No newline at end of file
@@ -0,0 +1,69 @@
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from bson import ObjectId
+from typing import Optional, Union
+
+from ..config import settings
+from ..utils.cache import LRUCache, register_cache
+
+# Grant calls, applications and projects are addressed either by their ObjectId string or, for
+# records seeded from the frontend JSON, by a legacy string id ("proj_001") kept in the indexed
+# "id" field. Legacy ids are remembered as their _id, so each lookup is a single indexed query.
+
+ALIAS_FIELD = "id"
+
+# Entries only go stale when a record is deleted or reloaded under a new _id. Both lookups
+# re-check a cached _id (find_by_id by reading it, resolve_id with an _id-only query) and fall
+# back to the alias, so the TTL is long
+id_alias_cache = register_cache("ids.alias", 24 * 3600, settings.id_alias_cache_size, cache_class=LRUCache)
+
+Identifier = Union[str, ObjectId]
+
+def _alias_key(collection: str, identifier: str) -> str:
+    return f"{collection}:{identifier}"
+
+def _object_id(identifier: Identifier) -> Optional[ObjectId]:
+    if isinstance(identifier, ObjectId):
+        return identifier
+    if isinstance(identifier, str) and ObjectId.is_valid(identifier):
+        return ObjectId(identifier)
+    return None
+
+async def resolve_id(db: AsyncIOMotorDatabase, collection: str, identifier: Identifier) -> Optional[ObjectId]:
+    """_id for an ObjectId string or legacy id; None when no record has that legacy id"""
+    object_id = _object_id(identifier)
+    if object_id is not None:
+        return object_id
+    if not isinstance(identifier, str) or not identifier:
+        return None
+    key = _alias_key(collection, identifier)
+    object_id = id_alias_cache.get(key)
+    if object_id is not None:
+        # Writes filter on the returned _id, so confirm it still carries this alias first
+        if await db[collection].find_one({"_id": object_id, ALIAS_FIELD: identifier}, {"_id": 1}) is not None:
+            return object_id
+        id_alias_cache.invalidate(key)
+    document = await db[collection].find_one({ALIAS_FIELD: identifier}, {"_id": 1})
+    if document is None:
+        return None
+    id_alias_cache.set(key, document["_id"])
+    return document["_id"]
+
+async def find_by_id(db: AsyncIOMotorDatabase, collection: str, identifier: Identifier, projection: dict = None) -> Optional[dict]:
+    """The record behind an ObjectId string or legacy id, in one indexed query"""
+    object_id = _object_id(identifier)
+    if object_id is not None:
+        return await db[collection].find_one({"_id": object_id}, projection)
+    if not isinstance(identifier, str) or not identifier:
+        return None
+    key = _alias_key(collection, identifier)
+    object_id = id_alias_cache.get(key)
+    if object_id is not None:
+        document = await db[collection].find_one({"_id": object_id}, projection)
+        if document is not None:
+            return document
+        # Deleted, or reloaded under a new _id: fall back to the alias
+        id_alias_cache.invalidate(key)
+    document = await db[collection].find_one({ALIAS_FIELD: identifier}, projection)
+    if document is not None:
+        id_alias_cache.set(key, document["_id"])
+    return document
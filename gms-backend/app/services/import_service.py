@@ -0,0 +1,162 @@
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import BulkWriteError
+from pydantic import ValidationError
+from starlette.concurrency import run_in_threadpool
+from typing import List, Dict, Any, Set, Tuple
+from bson import ObjectId
+from datetime import datetime
+import json
+import os
+
+from ..schemas.application import ApplicationCreate
+from .application_service import build_application_document
+from .job_service import register_job_handler, update_job
+from ..utils.tracing import traced
+
+IMPORT_JOB_TYPE = "application_import"
+
+# Records validated and inserted per round trip, and bytes of lines read per thread hop
+IMPORT_BATCH_SIZE = 500
+IMPORT_READ_SIZE = 1024 * 1024
+MAX_REPORTED_ERRORS = 1000
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(loc) for loc in item['loc'])}: {item['msg']}" for item in error.errors()
+    )
+
+async def _existing_pairs(db: AsyncIOMotorDatabase, pairs: Set[Tuple[str, str]]) -> Set[Tuple[str, str]]:
+    """Return the (email, grantId) pairs from this batch that are already stored"""
+    if not pairs:
+        return set()
+    emails = list({email for email, _ in pairs})
+    grant_ids = list({grant_id for _, grant_id in pairs})
+    existing = set()
+    async for doc in db.applications.find(
+        {"email": {"$in": emails}, "grantId": {"$in": grant_ids}},
+        {"email": 1, "grantId": 1, "_id": 0}
+    ):
+        existing.add((doc["email"], doc["grantId"]))
+    return existing & pairs
+
+async def _insert_batch(db: AsyncIOMotorDatabase, batch: List[Tuple[int, dict]], seen: Set[Tuple[str, str]]) -> Dict[str, Any]:
+    """Deduplicate a validated batch and insert it unordered"""
+    stats = {"inserted": 0, "duplicates": 0, "failed": 0, "errors": []}
+
+    batch_pairs = {(doc["email"], doc["grantId"]) for _, doc in batch}
+    existing = await _existing_pairs(db, batch_pairs)
+
+    to_insert = []
+    for line_number, doc in batch:
+        pair = (doc["email"], doc["grantId"])
+        if pair in existing or pair in seen:
+            stats["duplicates"] += 1
+            continue
+        seen.add(pair)
+        to_insert.append((line_number, doc))
+
+    if not to_insert:
+        return stats
+
+    try:
+        result = await db.applications.insert_many([doc for _, doc in to_insert], ordered=False)
+        stats["inserted"] = len(result.inserted_ids)
+    except BulkWriteError as e:
+        write_errors = e.details.get("writeErrors", [])
+        stats["inserted"] = e.details.get("nInserted", 0)
+        stats["failed"] = len(write_errors)
+        for write_error in write_errors:
+            line_number = to_insert[write_error["index"]][0]
+            stats["errors"].append({"line": line_number, "error": write_error.get("errmsg", "Insert failed")})
+    return stats
+
+@register_job_handler(IMPORT_JOB_TYPE)
+async def run_import_job(db: AsyncIOMotorDatabase, job: dict) -> None:
+    await import_applications_ndjson(db, job["_id"], job["params"]["file_path"])
+
+@traced
+async def import_applications_ndjson(db: AsyncIOMotorDatabase, job_id: ObjectId, file_path: str) -> None:
+    """Stream an NDJSON file into applications, recording progress and per-line errors on the job.
+
+    Re-running after an interruption is safe: rows already imported are counted as duplicates.
+    """
+    progress = {
+        "bytes_total": os.path.getsize(file_path),
+        "bytes_processed": 0,
+        "lines": 0,
+        "inserted": 0,
+        "duplicates": 0,
+        "failed": 0
+    }
+    seen: Set[Tuple[str, str]] = set()
+
+    await update_job(db, job_id, {"progress": progress})
+
+    try:
+        with open(file_path, "rb") as source:
+            batch: List[Tuple[int, dict]] = []
+            errors: List[Dict[str, Any]] = []
+            reported_errors = 0
+
+            while True:
+                # readlines(hint) returns whole lines totalling roughly IMPORT_READ_SIZE bytes
+                lines = await run_in_threadpool(source.readlines, IMPORT_READ_SIZE)
+                if not lines:
+                    break
+
+                for raw_line in lines:
+                    progress["lines"] += 1
+                    progress["bytes_processed"] += len(raw_line)
+                    line_number = progress["lines"]
+
+                    if not raw_line.strip():
+                        continue
+
+                    try:
+                        record = ApplicationCreate.parse_obj(json.loads(raw_line))
+                    except json.JSONDecodeError as e:
+                        progress["failed"] += 1
+                        errors.append({"line": line_number, "error": f"Invalid JSON: {e.msg}"})
+                        continue
+                    except ValidationError as e:
+                        progress["failed"] += 1
+                        errors.append({"line": line_number, "error": _validation_message(e)})
+                        continue
+
+                    batch.append((line_number, build_application_document(record)))
+
+                    if len(batch) >= IMPORT_BATCH_SIZE:
+                        stats = await _insert_batch(db, batch, seen)
+                        batch = []
+                        for key in ("inserted", "duplicates", "failed"):
+                            progress[key] += stats[key]
+                        errors.extend(stats["errors"])
+
+                # Flush progress once per read block so pollers see steady movement
+                new_errors = errors[:max(MAX_REPORTED_ERRORS - reported_errors, 0)]
+                reported_errors += len(new_errors)
+                await update_job(db, job_id, {"progress": progress}, push_errors=new_errors, max_errors=MAX_REPORTED_ERRORS)
+                errors = []
+
+            if batch:
+                stats = await _insert_batch(db, batch, seen)
+                for key in ("inserted", "duplicates", "failed"):
+                    progress[key] += stats[key]
+                errors.extend(stats["errors"])
+
+            new_errors = errors[:max(MAX_REPORTED_ERRORS - reported_errors, 0)]
+            await update_job(
+                db, job_id,
+                {"status": "completed", "finished_at": datetime.utcnow(), "progress": progress},
+                push_errors=new_errors,
+                max_errors=MAX_REPORTED_ERRORS
+            )
+    except Exception as e:
+        await update_job(db, job_id, {
+            "status": "failed",
+            "error": str(e),
+            "finished_at": datetime.utcnow(),
+            "progress": progress
+        })
+    # Not in a finally: a job cancelled by shutdown is requeued and still needs its file
+    os.remove(file_path)
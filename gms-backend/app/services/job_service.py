@@ -0,0 +1,295 @@
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError, PyMongoError
+from typing import Optional, Dict, Any, Awaitable, Callable, Coroutine, List, Set
+from bson import ObjectId
+from datetime import datetime, timedelta
+import asyncio
+import contextvars
+import logging
+import os
+import random
+import socket
+import time
+
+from ..config import settings
+from ..utils.metrics import JOB_DURATION
+
+logger = logging.getLogger(__name__)
+
+# Jobs live in db.jobs and are claimed by worker tasks in every API process:
+# queued -> running -> completed | failed, with failed attempts requeued after a backoff
+# until max_attempts. A running job whose lease has expired (its worker died) is claimed again.
+
+PRIORITY_HIGH = 10  # someone is waiting on the result, e.g. a single award letter
+PRIORITY_NORMAL = 0
+PRIORITY_LOW = -10  # periodic maintenance
+
+JobHandler = Callable[[AsyncIOMotorDatabase, dict], Awaitable[None]]
+
+# job type -> handler(db, job); modules register their handlers on import
+JOB_HANDLERS: Dict[str, JobHandler] = {}
+
+# job type -> interval in seconds, for jobs the scheduler enqueues itself
+PERIODIC_JOBS: Dict[str, float] = {}
+
+# Strong references to running background tasks so they are not garbage collected mid-run
+_background_tasks: Set[asyncio.Task] = set()
+_worker_tasks: List[asyncio.Task] = []
+_job_available: Optional[asyncio.Event] = None
+
+def run_in_background(coro: Coroutine) -> asyncio.Task:
+    """Run a coroutine on the event loop without tying it to the request lifecycle"""
+    # A fresh context: the request's context vars (DB stats, request id, span) must not follow
+    # work that outlives it, or its round trips are charged to a request that may be over
+    task = asyncio.get_running_loop().create_task(coro, context=contextvars.Context())
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+def register_job_handler(job_type: str) -> Callable[[JobHandler], JobHandler]:
+    def decorator(handler: JobHandler) -> JobHandler:
+        JOB_HANDLERS[job_type] = handler
+        return handler
+    return decorator
+
+def schedule_periodic(job_type: str, interval_seconds: float) -> None:
+    """Enqueue job_type every interval; the handler must be registered separately"""
+    PERIODIC_JOBS[job_type] = interval_seconds
+
+async def enqueue_job(
+    db: AsyncIOMotorDatabase,
+    job_type: str,
+    created_by: str,
+    params: Dict[str, Any] = None,
+    priority: int = PRIORITY_NORMAL,
+    idempotency_key: Optional[str] = None,
+    max_attempts: Optional[int] = None,
+    run_at: Optional[datetime] = None
+) -> dict:
+    """Persist a job for the workers; with an idempotency key, an existing job with that key is returned instead"""
+    now = datetime.utcnow()
+    job = {
+        "type": job_type,
+        "status": "queued",  # queued, running, completed, failed
+        "params": params or {},
+        "progress": {},
+        "errors": [],
+        "priority": priority,
+        "attempts": 0,
+        "max_attempts": max_attempts or settings.job_max_attempts,
+        "available_at": run_at or now,
+        "created_by": created_by,
+        "created_at": now,
+        "updated_at": now
+    }
+    if idempotency_key:
+        job["idempotency_key"] = idempotency_key
+    # Two tries: the holder of the key can release it (final failure) between our insert and lookup
+    for _ in range(2):
+        try:
+            result = await db.jobs.insert_one(job)
+        except DuplicateKeyError:
+            job.pop("_id", None)
+            existing = await db.jobs.find_one({"idempotency_key": idempotency_key})
+            if existing:
+                return existing
+            continue
+        job["_id"] = result.inserted_id
+        if _job_available is not None:
+            _job_available.set()
+        return job
+    raise RuntimeError(f"Could not enqueue {job_type} job with idempotency key {idempotency_key}")
+
+async def get_job(db: AsyncIOMotorDatabase, job_id: str) -> Optional[dict]:
+    if not ObjectId.is_valid(job_id):
+        return None
+    return await db.jobs.find_one({"_id": ObjectId(job_id)})
+
+async def update_job(db: AsyncIOMotorDatabase, job_id: ObjectId, update: Dict[str, Any], push_errors: list = None, max_errors: int = 1000) -> None:
+    """Set job fields and append (capped) error entries in a single write"""
+    operation = {"$set": {**update, "updated_at": datetime.utcnow()}}
+    if push_errors:
+        operation["$push"] = {"errors": {"$each": push_errors, "$slice": max_errors}}
+    await db.jobs.update_one({"_id": job_id}, operation)
+
+async def claim_job(db: AsyncIOMotorDatabase, worker_id: str) -> Optional[dict]:
+    """Atomically take the next due job, so concurrent workers (in any process) never share one"""
+    now = datetime.utcnow()
+    return await db.jobs.find_one_and_update(
+        {"$or": [
+            {"status": "queued", "available_at": {"$lte": now}},
+            {"status": "running", "lease_expires_at": {"$lt": now}},
+        ]},
+        {
+            "$set": {
+                "status": "running",
+                "worker_id": worker_id,
+                "lease_expires_at": now + timedelta(seconds=settings.job_visibility_timeout_seconds),
+                "started_at": now,
+                "updated_at": now
+            },
+            "$inc": {"attempts": 1}
+        },
+        sort=[("priority", -1), ("available_at", 1)],
+        return_document=ReturnDocument.AFTER
+    )
+
+def retry_delay(attempts: int) -> float:
+    """Exponential backoff with jitter: base, 2x base, 4x base, ... capped at an hour"""
+    delay = min(settings.job_retry_base_seconds * 2 ** (attempts - 1), 3600)
+    return delay * random.uniform(0.8, 1.2)
+
+async def _keep_lease(db: AsyncIOMotorDatabase, job: dict, worker_id: str) -> None:
+    """Extend the lease while the handler runs, so only a dead worker's jobs are reclaimed"""
+    interval = settings.job_visibility_timeout_seconds / 3
+    while True:
+        await asyncio.sleep(interval)
+        result = await db.jobs.update_one(
+            {"_id": job["_id"], "worker_id": worker_id},
+            {"$set": {"lease_expires_at": datetime.utcnow() + timedelta(seconds=settings.job_visibility_timeout_seconds)}}
+        )
+        if result.matched_count == 0:
+            logger.warning("Lost the lease on job %s (%s)", job["_id"], job["type"])
+            return
+
+async def _finish_job(db: AsyncIOMotorDatabase, job: dict, worker_id: str, error: Optional[Exception]) -> None:
+    now = datetime.utcnow()
+    owned = {"_id": job["_id"], "worker_id": worker_id}
+    release_lease = {"worker_id": "", "lease_expires_at": ""}
+    if error is None:
+        # Handlers may already have recorded their own final status and progress
+        await db.jobs.update_one(
+            {**owned, "status": "running"},
+            {"$set": {"status": "completed", "finished_at": now, "updated_at": now}}
+        )
+        await db.jobs.update_one(owned, {"$unset": release_lease})
+        return
+
+    entry = {"attempt": job["attempts"], "error": str(error), "at": now}
+    if job["attempts"] < job["max_attempts"]:
+        delay = retry_delay(job["attempts"])
+        logger.warning("Job %s (%s) failed attempt %d, retrying in %.0fs: %s", job["_id"], job["type"], job["attempts"], delay, error)
+        await db.jobs.update_one(owned, {
+            "$set": {"status": "queued", "available_at": now + timedelta(seconds=delay), "error": str(error), "updated_at": now},
+            "$unset": release_lease,
+            "$push": {"errors": {"$each": [entry], "$slice": -1000}}
+        })
+    else:
+        logger.error("Job %s (%s) failed after %d attempts: %s", job["_id"], job["type"], job["attempts"], error)
+        # Free the idempotency key so the same request can be submitted again
+        await db.jobs.update_one(owned, {
+            "$set": {"status": "failed", "error": str(error), "finished_at": now, "updated_at": now},
+            "$unset": {**release_lease, "idempotency_key": ""},
+            "$push": {"errors": {"$each": [entry], "$slice": -1000}}
+        })
+
+async def _run_job(db: AsyncIOMotorDatabase, job: dict, worker_id: str) -> None:
+    handler = JOB_HANDLERS.get(job["type"])
+    if handler is None:
+        job["attempts"] = job["max_attempts"]
+        await _finish_job(db, job, worker_id, LookupError(f"No handler registered for job type {job['type']}"))
+        return
+
+    lease = asyncio.ensure_future(_keep_lease(db, job, worker_id))
+    started = time.perf_counter()
+    outcome = "completed"
+    try:
+        await handler(db, job)
+    except asyncio.CancelledError:
+        # Shutdown: hand the job back without spending an attempt
+        outcome = "requeued"
+        await asyncio.shield(db.jobs.update_one(
+            {"_id": job["_id"], "worker_id": worker_id, "status": "running"},
+            {"$set": {"status": "queued", "available_at": datetime.utcnow()},
+             "$unset": {"worker_id": "", "lease_expires_at": ""},
+             "$inc": {"attempts": -1}}
+        ))
+        raise
+    except Exception as e:
+        outcome = "failed"
+        await _finish_job(db, job, worker_id, e)
+    else:
+        await _finish_job(db, job, worker_id, None)
+    finally:
+        lease.cancel()
+        JOB_DURATION.labels(job["type"], outcome).observe(time.perf_counter() - started)
+
+async def _worker_loop(db: AsyncIOMotorDatabase, worker_id: str) -> None:
+    while True:
+        try:
+            job = await claim_job(db, worker_id)
+        except PyMongoError:
+            logger.exception("Job worker %s failed to claim a job", worker_id)
+            job = None
+        if job is None:
+            try:
+                await asyncio.wait_for(_job_available.wait(), settings.job_poll_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            _job_available.clear()
+            continue
+        try:
+            await _run_job(db, job, worker_id)
+        except PyMongoError:
+            # The lease expires and another worker picks the job up
+            logger.exception("Job worker %s lost track of job %s", worker_id, job["_id"])
+
+async def _scheduler_loop(db: AsyncIOMotorDatabase) -> None:
+    """Enqueue periodic jobs once per interval slot; the idempotency key dedupes across processes"""
+    enqueued: Dict[str, int] = {}
+    while True:
+        now = time.time()
+        for job_type, interval in PERIODIC_JOBS.items():
+            slot = int(now // interval)
+            if enqueued.get(job_type) == slot:
+                continue
+            try:
+                await enqueue_job(
+                    db, job_type, "system",
+                    priority=PRIORITY_LOW,
+                    idempotency_key=f"periodic:{job_type}:{slot}",
+                    max_attempts=1  # the next slot is the retry
+                )
+                enqueued[job_type] = slot
+            except PyMongoError:
+                logger.exception("Failed to schedule periodic job %s", job_type)
+        await asyncio.sleep(min([settings.job_poll_interval_seconds, *PERIODIC_JOBS.values()]))
+
+def start_job_workers(db: AsyncIOMotorDatabase) -> None:
+    """Start this process's job workers and periodic scheduler (called from the app lifespan)"""
+    global _job_available
+    _job_available = asyncio.Event()
+    base_id = f"{socket.gethostname()}:{os.getpid()}"
+    for number in range(settings.job_worker_concurrency):
+        _worker_tasks.append(asyncio.ensure_future(_worker_loop(db, f"{base_id}:{number}")))
+    if PERIODIC_JOBS:
+        _worker_tasks.append(asyncio.ensure_future(_scheduler_loop(db)))
+    logger.info("Started %d job workers", settings.job_worker_concurrency)
+
+async def stop_job_workers() -> None:
+    """Cancel the workers; jobs they were running go back on the queue"""
+    for task in _worker_tasks:
+        task.cancel()
+    await asyncio.gather(*_worker_tasks, return_exceptions=True)
+    _worker_tasks.clear()
+
+def serialize_job(job: dict) -> dict:
+    return {
+        "id": str(job["_id"]),
+        "type": job["type"],
+        "status": job["status"],
+        "params": job.get("params", {}),
+        "progress": job.get("progress", {}),
+        "errors": job.get("errors", []),
+        "error": job.get("error"),
+        "priority": job.get("priority", PRIORITY_NORMAL),
+        "attempts": job.get("attempts", 0),
+        "max_attempts": job.get("max_attempts"),
+        "available_at": job["available_at"].isoformat() if job.get("available_at") else None,
+        "created_by": job.get("created_by"),
+        "created_at": job["created_at"].isoformat(),
+        "updated_at": job["updated_at"].isoformat(),
+        "started_at": job["started_at"].isoformat() if job.get("started_at") else None,
+        "finished_at": job["finished_at"].isoformat() if job.get("finished_at") else None
+    }
@@ -0,0 +1,115 @@
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
+from typing import Dict, List
+from datetime import datetime
+import logging
+import time
+
+from ..config import settings
+from ..utils.tracing import traced
+from .job_service import register_job_handler, schedule_periodic, update_job
+
+logger = logging.getLogger(__name__)
+
+OVERDUE_JOB_TYPE = "milestone_overdue"
+
+# Milestones are embedded in projects; most carry due_date, sample data uses dueDate.
+# Due dates are ISO strings, so comparing against today's date string orders them correctly
+# and a milestone becomes overdue the day after it is due.
+
+def _late(due_field: str, today: str) -> dict:
+    return {"milestones": {"$elemMatch": {
+        due_field: {"$lt": today},
+        "status": {"$ne": "completed"},
+        "is_overdue": {"$ne": True}
+    }}}
+
+def _transitions_pipeline(today: str) -> List[dict]:
+    """Milestones whose stored is_overdue flag disagrees with their due date and status"""
+    due = {"$ifNull": ["$milestones.due_date", "$milestones.dueDate"]}
+    overdue_now = {"$and": [
+        {"$eq": [{"$type": due}, "string"]},
+        {"$lt": [due, today]},
+        {"$ne": ["$milestones.status", "completed"]}
+    ]}
+    return [
+        # Each branch is served by an index on the milestones array
+        {"$match": {"$or": [_late("due_date", today), _late("dueDate", today), {"milestones.is_overdue": True}]}},
+        {"$project": {"title": 1, "application_id": 1, "milestones": 1}},
+        {"$unwind": "$milestones"},
+        {"$project": {
+            "title": 1,
+            "application_id": 1,
+            "milestone_id": "$milestones.id",
+            "milestone_title": "$milestones.title",
+            "due_date": due,
+            "overdue": overdue_now,
+            "was_overdue": {"$eq": [{"$ifNull": ["$milestones.is_overdue", False]}, True]}
+        }},
+        {"$match": {"$expr": {"$ne": ["$overdue", "$was_overdue"]}}}
+    ]
+
+def _project_update(project_id, late_ids: List[str], cleared_ids: List[str]) -> UpdateOne:
+    """One write per project flipping all its changed milestones through arrayFilters"""
+    update: Dict[str, dict] = {"$set": {}, "$unset": {}}
+    array_filters = []
+    # Legacy camelCase isOverdue is dropped so readers see the recomputed flag
+    if late_ids:
+        update["$set"]["milestones.$[late].is_overdue"] = True
+        update["$unset"]["milestones.$[late].isOverdue"] = ""
+        array_filters.append({"late.id": {"$in": late_ids}, "late.status": {"$ne": "completed"}})
+    if cleared_ids:
+        update["$set"]["milestones.$[cleared].is_overdue"] = False
+        update["$unset"]["milestones.$[cleared].isOverdue"] = ""
+        array_filters.append({"cleared.id": {"$in": cleared_ids}})
+    return UpdateOne({"_id": project_id}, update, array_filters=array_filters)
+
+@traced
+async def recompute_overdue_milestones(db: AsyncIOMotorDatabase) -> dict:
+    """Bring every milestone's is_overdue flag up to date and record the transitions"""
+    started = time.perf_counter()
+    now = datetime.utcnow()
+    today = now.date().isoformat()
+
+    projects: Dict[object, dict] = {}
+    events = []
+    async for row in db.projects.aggregate(_transitions_pipeline(today)):
+        if row.get("milestone_id") is None:
+            continue
+        changes = projects.setdefault(row["_id"], {"late": [], "cleared": []})
+        changes["late" if row["overdue"] else "cleared"].append(row["milestone_id"])
+        events.append({
+            "type": "milestone_overdue" if row["overdue"] else "milestone_overdue_cleared",
+            "project_id": str(row["_id"]),
+            "project_title": row.get("title"),
+            "application_id": row.get("application_id"),
+            "milestone_id": row["milestone_id"],
+            "milestone_title": row.get("milestone_title"),
+            "due_date": row.get("due_date"),
+            "created_at": now
+        })
+
+    if projects:
+        await db.projects.bulk_write(
+            [_project_update(project_id, changes["late"], changes["cleared"]) for project_id, changes in projects.items()],
+            ordered=False
+        )
+        await db.milestone_events.insert_many(events, ordered=False)
+
+    stats = {
+        "projects": len(projects),
+        "flagged": sum(len(changes["late"]) for changes in projects.values()),
+        "cleared": sum(len(changes["cleared"]) for changes in projects.values()),
+        "duration_ms": round((time.perf_counter() - started) * 1000, 1)
+    }
+    logger.info(
+        "Recomputed overdue milestones: %d flagged, %d cleared across %d projects in %.1fms",
+        stats["flagged"], stats["cleared"], stats["projects"], stats["duration_ms"]
+    )
+    return stats
+
+@register_job_handler(OVERDUE_JOB_TYPE)
+async def run_overdue_job(db: AsyncIOMotorDatabase, job: dict) -> None:
+    await update_job(db, job["_id"], {"progress": await recompute_overdue_milestones(db)})
+
+schedule_periodic(OVERDUE_JOB_TYPE, settings.milestone_overdue_interval_seconds)
@@ -0,0 +1,250 @@
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import PyMongoError
+from starlette.concurrency import run_in_threadpool
+from typing import Any, Awaitable, Callable, List, Optional
+from email.message import EmailMessage
+from datetime import datetime, timedelta
+import asyncio
+import logging
+import random
+import secrets
+import smtplib
+import time
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+# Transactional outbox: notifications are inserted into db.notifications together with the
+# state change that causes them, and a dispatcher in every API process delivers them.
+# pending -> sending -> sent | failed; a sending batch whose lease lapses is picked up again.
+
+def build_notification(to: str, subject: str, body: str, kind: str) -> dict:
+    now = datetime.utcnow()
+    return {
+        "to": to,
+        "subject": subject,
+        "body": body,
+        "kind": kind,
+        "status": "pending",
+        "attempts": 0,
+        "available_at": now,
+        "created_at": now
+    }
+
+def _supports_transactions(db: AsyncIOMotorDatabase) -> bool:
+    # Multi-document transactions need a replica set or sharded cluster
+    return db.client.topology_description.topology_type_name not in ("Single", "Unknown")
+
+async def write_with_outbox(
+    db: AsyncIOMotorDatabase,
+    write: Callable[[Any], Awaitable[Any]],
+    notifications: List[dict]
+) -> Any:
+    """Run write(session) and queue the notifications if it returns a truthy result.
+
+    Both happen in one transaction when the deployment supports them. On a standalone
+    server the notifications are inserted right after the write instead.
+    """
+    async def apply(session):
+        result = await write(session)
+        if result and notifications:
+            await db.notifications.insert_many([dict(notification) for notification in notifications], session=session)
+        return result
+
+    if _supports_transactions(db):
+        async with await db.client.start_session() as session:
+            return await session.with_transaction(apply)
+    return await apply(None)
+
+def signoff_request_notification(email: str, name: str, role: str, application_title: str, token: str) -> dict:
+    return build_notification(
+        email,
+        f"Sign-off requested: {application_title}",
+        f"Dear {name or role},\n\n"
+        f"Your sign-off as {role} is requested for the grant application \"{application_title}\".\n\n"
+        f"Review and sign off here: {settings.frontend_url}/signoff/{token}\n",
+        "signoff_request"
+    )
+
+def review_request_notification(email: str, application_title: str, token: str) -> dict:
+    return build_notification(
+        email,
+        f"Review requested: {application_title}",
+        f"You have been assigned to review the grant application \"{application_title}\".\n\n"
+        f"Open the application and submit your review here: {settings.frontend_url}/review/{token}\n",
+        "review_request"
+    )
+
+def vc_signoff_notification(email: str, project_title: str, token: str) -> dict:
+    return build_notification(
+        email,
+        f"Project closure sign-off: {project_title}",
+        f"The project \"{project_title}\" has completed its final reports and awaits your closure sign-off.\n\n"
+        f"Review and sign off here: {settings.frontend_url}/vc-signoff/{token}\n",
+        "vc_signoff_request"
+    )
+
+# Dispatcher
+
+class RateLimiter:
+    """Token bucket shared by this process's SMTP connections"""
+
+    def __init__(self, rate_per_second: float):
+        self.rate = rate_per_second
+        self.tokens = rate_per_second
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+class SMTPConnection:
+    """One pooled SMTP connection; blocking smtplib calls run in the threadpool"""
+
+    def __init__(self):
+        self.smtp: Optional[smtplib.SMTP] = None
+
+    def _open(self) -> smtplib.SMTP:
+        smtp_class = smtplib.SMTP_SSL if settings.smtp_use_tls else smtplib.SMTP
+        smtp = smtp_class(settings.smtp_host, settings.smtp_port, timeout=settings.smtp_timeout_seconds)
+        if settings.smtp_starttls and not settings.smtp_use_tls:
+            smtp.starttls()
+        if settings.smtp_username:
+            smtp.login(settings.smtp_username, settings.smtp_password)
+        return smtp
+
+    def _send(self, notification: dict) -> None:
+        if self.smtp is None:
+            self.smtp = self._open()
+        message = EmailMessage()
+        message["From"] = settings.smtp_from
+        message["To"] = notification["to"]
+        message["Subject"] = notification["subject"]
+        message.set_content(notification["body"])
+        self.smtp.send_message(message)
+
+    async def send(self, notification: dict) -> None:
+        if settings.notification_backend == "log":
+            logger.info("Notification to %s: %s", notification["to"], notification["subject"])
+            return
+        try:
+            await run_in_threadpool(self._send, notification)
+        except (smtplib.SMTPServerDisconnected, OSError):
+            await self.close()
+            raise
+
+    async def close(self) -> None:
+        smtp, self.smtp = self.smtp, None
+        if smtp is not None:
+            try:
+                await run_in_threadpool(smtp.quit)
+            except (smtplib.SMTPException, OSError):
+                pass
+
+def _retry_delay(attempts: int) -> float:
+    delay = min(settings.notification_retry_base_seconds * 2 ** (attempts - 1), 3600)
+    return delay * random.uniform(0.8, 1.2)
+
+async def claim_batch(db: AsyncIOMotorDatabase, limit: int) -> List[dict]:
+    """Claim up to limit due notifications for one connection, without overlapping other dispatchers"""
+    now = datetime.utcnow()
+    due = {"$or": [
+        {"status": "pending", "available_at": {"$lte": now}},
+        {"status": "sending", "lease_expires_at": {"$lt": now}},
+    ]}
+    candidates = [doc["_id"] async for doc in db.notifications.find(due, {"_id": 1}).sort("available_at", 1).limit(limit)]
+    if not candidates:
+        return []
+    claim = secrets.token_hex(8)
+    # Re-checking the due filter means a candidate another dispatcher took meanwhile is skipped
+    await db.notifications.update_many(
+        {"$and": [{"_id": {"$in": candidates}}, due]},
+        {
+            "$set": {
+                "status": "sending",
+                "claim": claim,
+                "lease_expires_at": now + timedelta(seconds=settings.notification_lease_seconds)
+            },
+            "$inc": {"attempts": 1}
+        }
+    )
+    return await db.notifications.find({"claim": claim}).to_list(None)
+
+async def _mark_failed_attempt(db: AsyncIOMotorDatabase, notification: dict, error: Exception, permanent: bool) -> None:
+    now = datetime.utcnow()
+    if permanent or notification["attempts"] >= settings.notification_max_attempts:
+        logger.error("Giving up on notification %s to %s: %s", notification["_id"], notification["to"], error)
+        update = {"status": "failed", "failed_at": now}
+    else:
+        update = {"status": "pending", "available_at": now + timedelta(seconds=_retry_delay(notification["attempts"]))}
+    await db.notifications.update_one(
+        {"_id": notification["_id"], "claim": notification["claim"]},
+        {"$set": {**update, "last_error": str(error)}, "$unset": {"claim": "", "lease_expires_at": ""}}
+    )
+
+async def send_batch(db: AsyncIOMotorDatabase, connection: SMTPConnection, limiter: RateLimiter, batch: List[dict]) -> int:
+    """Send a claimed batch over one connection; returns how many were delivered"""
+    sent_ids = []
+    for index, notification in enumerate(batch):
+        await limiter.acquire()
+        try:
+            await connection.send(notification)
+        except (smtplib.SMTPRecipientsRefused, smtplib.SMTPDataError) as e:
+            # The server rejected this message; retrying will not help unless it is a 4xx
+            permanent = getattr(e, "smtp_code", 500) >= 500 or isinstance(e, smtplib.SMTPRecipientsRefused)
+            await _mark_failed_attempt(db, notification, e, permanent)
+            continue
+        except (smtplib.SMTPException, OSError) as e:
+            # Connection-level failure: reconnect next time and back off the rest of the batch too
+            await connection.close()
+            logger.warning("SMTP delivery failed, requeueing %d notifications: %s", len(batch) - index, e)
+            for remaining in batch[index:]:
+                await _mark_failed_attempt(db, remaining, e, permanent=False)
+            break
+        sent_ids.append(notification["_id"])
+    if sent_ids:
+        await db.notifications.update_many(
+            {"_id": {"$in": sent_ids}, "claim": batch[0]["claim"]},
+            {"$set": {"status": "sent", "sent_at": datetime.utcnow()}, "$unset": {"claim": "", "lease_expires_at": ""}}
+        )
+    return len(sent_ids)
+
+_dispatcher_tasks: List[asyncio.Task] = []
+
+async def _sender_loop(db: AsyncIOMotorDatabase, limiter: RateLimiter) -> None:
+    connection = SMTPConnection()
+    try:
+        while True:
+            try:
+                batch = await claim_batch(db, settings.smtp_batch_size)
+                if batch:
+                    await send_batch(db, connection, limiter, batch)
+                    continue
+            except PyMongoError:
+                logger.exception("Notification dispatcher failed to claim a batch")
+            # Idle: release the connection rather than hold it open against the server's timeout
+            await connection.close()
+            await asyncio.sleep(settings.notification_poll_interval_seconds)
+    finally:
+        await connection.close()
+
+def start_notification_dispatcher(db: AsyncIOMotorDatabase) -> None:
+    """One sender per pooled SMTP connection, sharing this process's rate cap"""
+    limiter = RateLimiter(settings.smtp_rate_per_second)
+    for _ in range(settings.smtp_pool_size):
+        _dispatcher_tasks.append(asyncio.ensure_future(_sender_loop(db, limiter)))
+
+async def stop_notification_dispatcher() -> None:
+    for task in _dispatcher_tasks:
+        task.cancel()
+    await asyncio.gather(*_dispatcher_tasks, return_exceptions=True)
+    _dispatcher_tasks.clear()
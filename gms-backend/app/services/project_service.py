@@ -1,10 +1,16 @@
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from ..models.project import Project, Milestone, Requisition, Partner, FinalReport, ClosureWorkflow
+from ..models.read_models import ProjectRow, PROJECT_ROW_PROJECTION
 from typing import Optional, List
-from bson import ObjectId
 from datetime import datetime
 import secrets
+from ..config import settings
+from ..utils.tracing import traced
+from .event_service import notify_change
+from .id_service import find_by_id, resolve_id
+from .notification_service import vc_signoff_notification, write_with_outbox
 
+@traced
 async def create_project(db: AsyncIOMotorDatabase, application_id: str, title: str, start_date: str, end_date: str) -> Project:
     project_data = {
         "application_id": application_id,
@@ -19,62 +25,67 @@ async def create_project(db: AsyncIOMotorDatabase, application_id: str, title: s
     
     result = await db.projects.insert_one(project_data)
     project_data["_id"] = result.inserted_id
+    notify_change(db, "projects", result.inserted_id, "created")
     return Project(**project_data)
 
+@traced
 async def get_project_by_id(db: AsyncIOMotorDatabase, project_id: str) -> Optional[Project]:
-    if not ObjectId.is_valid(project_id):
-        return None
-    project = await db.projects.find_one({"_id": ObjectId(project_id)})
+    project = await find_by_id(db, "projects", project_id)
     if project:
         return Project(**project)
     return None
 
-async def get_all_projects(db: AsyncIOMotorDatabase) -> List[Project]:
-    projects = []
-    async for project in db.projects.find():
-        projects.append(Project(**project))
-    return projects
+@traced
+async def get_all_projects(db: AsyncIOMotorDatabase) -> List[ProjectRow]:
+    return [ProjectRow(project) async for project in db.projects.find({}, PROJECT_ROW_PROJECTION)]
 
-async def get_projects_by_user(db: AsyncIOMotorDatabase, user_email: str) -> List[Project]:
+@traced
+async def get_projects_by_user(db: AsyncIOMotorDatabase, user_email: str) -> List[ProjectRow]:
     # First get manager approved or signoff approved applications for this user
     approved_applications = []
-    async for app in db.applications.find({"email": user_email, "status": {"$in": ["manager_approved", "signoff_approved"]}}):
+    async for app in db.applications.find({"email": user_email, "status": {"$in": ["manager_approved", "signoff_approved"]}}, {"_id": 1}):
         approved_applications.append(str(app["_id"]))
     
     # Then get projects for those applications
-    projects = []
-    async for project in db.projects.find({"application_id": {"$in": approved_applications}}):
-        projects.append(Project(**project))
-    return projects
+    query = {"application_id": {"$in": approved_applications}}
+    return [ProjectRow(project) async for project in db.projects.find(query, PROJECT_ROW_PROJECTION)]
 
+@traced
 async def update_project_status(db: AsyncIOMotorDatabase, project_id: str, status: str) -> Optional[Project]:
-    if not ObjectId.is_valid(project_id):
+    object_id = await resolve_id(db, "projects", project_id)
+    if object_id is None:
         return None
     
     result = await db.projects.update_one(
-        {"_id": ObjectId(project_id)},
+        {"_id": object_id},
         {"$set": {"status": status, "updated_at": datetime.utcnow()}}
     )
     
     if result.modified_count:
-        return await get_project_by_id(db, project_id)
+        notify_change(db, "projects", object_id)
+        return await get_project_by_id(db, object_id)
     return None
 
+@traced
 async def add_milestone(db: AsyncIOMotorDatabase, project_id: str, milestone: Milestone) -> Optional[Project]:
-    if not ObjectId.is_valid(project_id):
+    object_id = await resolve_id(db, "projects", project_id)
+    if object_id is None:
         return None
     
     result = await db.projects.update_one(
-        {"_id": ObjectId(project_id)},
+        {"_id": object_id},
         {"$push": {"milestones": milestone.dict()}, "$set": {"updated_at": datetime.utcnow()}}
     )
     
     if result.modified_count:
-        return await get_project_by_id(db, project_id)
+        notify_change(db, "projects", object_id)
+        return await get_project_by_id(db, object_id)
     return None
 
+@traced
 async def submit_requisition(db: AsyncIOMotorDatabase, project_id: str, requisition_data: dict) -> Optional[Project]:
-    if not ObjectId.is_valid(project_id):
+    object_id = await resolve_id(db, "projects", project_id)
+    if object_id is None:
         return None
     
     requisition = Requisition(
@@ -87,16 +98,19 @@ async def submit_requisition(db: AsyncIOMotorDatabase, project_id: str, requisit
     )
     
     result = await db.projects.update_one(
-        {"_id": ObjectId(project_id)},
+        {"_id": object_id},
         {"$push": {"requisitions": requisition.dict()}, "$set": {"updated_at": datetime.utcnow()}}
     )
     
     if result.modified_count:
-        return await get_project_by_id(db, project_id)
+        notify_change(db, "projects", object_id)
+        return await get_project_by_id(db, object_id)
     return None
 
+@traced
 async def add_partner(db: AsyncIOMotorDatabase, project_id: str, partner_data: dict) -> Optional[Project]:
-    if not ObjectId.is_valid(project_id):
+    object_id = await resolve_id(db, "projects", project_id)
+    if object_id is None:
         return None
     
     partner = Partner(
@@ -106,21 +120,24 @@ async def add_partner(db: AsyncIOMotorDatabase, project_id: str, partner_data: d
     )
     
     result = await db.projects.update_one(
-        {"_id": ObjectId(project_id)},
+        {"_id": object_id},
         {"$push": {"partners": partner.dict()}, "$set": {"updated_at": datetime.utcnow()}}
     )
     
     if result.modified_count:
-        return await get_project_by_id(db, project_id)
+        notify_change(db, "projects", object_id)
+        return await get_project_by_id(db, object_id)
     return None
 
+@traced
 async def upload_progress_report(db: AsyncIOMotorDatabase, project_id: str, milestone_id: str, filename: str) -> Optional[Project]:
-    if not ObjectId.is_valid(project_id):
+    object_id = await resolve_id(db, "projects", project_id)
+    if object_id is None:
         return None
     
     result = await db.projects.update_one(
         {
-            "_id": ObjectId(project_id),
+            "_id": object_id,
             "milestones.id": milestone_id
         },
         {
@@ -134,17 +151,20 @@ async def upload_progress_report(db: AsyncIOMotorDatabase, project_id: str, mile
     )
     
     if result.modified_count:
-        return await get_project_by_id(db, project_id)
+        notify_change(db, "projects", object_id)
+        return await get_project_by_id(db, object_id)
     return None
 
+@traced
 async def upload_final_report(db: AsyncIOMotorDatabase, project_id: str, report_type: str, filename: str) -> Optional[Project]:
-    if not ObjectId.is_valid(project_id):
+    object_id = await resolve_id(db, "projects", project_id)
+    if object_id is None:
         return None
     
     update_field = f"final_report.{report_type}_report"
     
     result = await db.projects.update_one(
-        {"_id": ObjectId(project_id)},
+        {"_id": object_id},
         {
             "$set": {
                 update_field: {
@@ -157,30 +177,42 @@ async def upload_final_report(db: AsyncIOMotorDatabase, project_id: str, report_
     )
     
     if result.modified_count:
-        return await get_project_by_id(db, project_id)
+        notify_change(db, "projects", object_id)
+        return await get_project_by_id(db, object_id)
     return None
 
+@traced
 async def initiate_vc_signoff(db: AsyncIOMotorDatabase, project_id: str) -> Optional[str]:
-    if not ObjectId.is_valid(project_id):
+    project = await find_by_id(db, "projects", project_id, {"title": 1})
+    if not project:
         return None
+    object_id = project["_id"]
     
     token = f"vc_{project_id}_{secrets.token_hex(16)}"
-    
-    result = await db.projects.update_one(
-        {"_id": ObjectId(project_id)},
-        {
-            "$set": {
-                "closure_workflow.status": "vc_review",
-                "closure_workflow.vc_sign_off_token": token,
-                "updated_at": datetime.utcnow()
-            }
-        }
-    )
-    
-    if result.modified_count:
+    notifications = []
+    if settings.vc_signoff_email:
+        notifications.append(vc_signoff_notification(settings.vc_signoff_email, project.get("title", ""), token))
+    
+    async def write(session):
+        result = await db.projects.update_one(
+            {"_id": object_id},
+            {
+                "$set": {
+                    "closure_workflow.status": "vc_review",
+                    "closure_workflow.vc_sign_off_token": token,
+                    "updated_at": datetime.utcnow()
+                }
+            },
+            session=session
+        )
+        return result.modified_count
+    
+    if await write_with_outbox(db, write, notifications):
+        notify_change(db, "projects", object_id)
         return token
     return None
 
+@traced
 async def get_project_by_vc_token(db: AsyncIOMotorDatabase, token: str) -> Optional[Project]:
     project = await db.projects.find_one({"closure_workflow.vc_sign_off_token": token})
     if project:
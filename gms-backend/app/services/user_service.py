@@ -4,7 +4,15 @@ from ..schemas.user import UserCreate, UserUpdate
 from ..utils.security import get_password_hash, verify_password
 from typing import Optional, List, Dict, Any
 from bson import ObjectId
+from ..config import settings
+from ..utils.cache import register_cache
+from ..utils.tracing import traced
+from .bus_service import publish_invalidation
 
+# Every authenticated request loads its user by email; writes invalidate the entry in all workers
+users_by_email_cache = register_cache("users.by_email", settings.user_cache_ttl_seconds)
+
+@traced
 async def create_user(db: AsyncIOMotorDatabase, user_data: UserCreate) -> User:
     hashed_password = get_password_hash(user_data.password)
     user_dict = user_data.dict()
@@ -15,12 +23,19 @@ async def create_user(db: AsyncIOMotorDatabase, user_data: UserCreate) -> User:
     user_dict["_id"] = result.inserted_id
     return User(**user_dict)
 
+@traced
 async def get_user_by_email(db: AsyncIOMotorDatabase, email: str) -> Optional[UserInDB]:
+    cached = users_by_email_cache.get(email)
+    if cached is not None:
+        return cached
     user = await db.users.find_one({"email": email})
     if user:
-        return UserInDB(**user)
+        user = UserInDB(**user)
+        users_by_email_cache.set(email, user)
+        return user
     return None
 
+@traced
 async def get_user_by_id(db: AsyncIOMotorDatabase, user_id: str) -> Optional[User]:
     if not ObjectId.is_valid(user_id):
         return None
@@ -29,12 +44,14 @@ async def get_user_by_id(db: AsyncIOMotorDatabase, user_id: str) -> Optional[Use
         return User(**user)
     return None
 
+@traced
 async def get_all_users(db: AsyncIOMotorDatabase) -> List[User]:
     users = []
     async for user in db.users.find():
         users.append(User(**user))
     return users
 
+@traced
 async def update_user(db: AsyncIOMotorDatabase, user_id: str, user_update: UserUpdate) -> Optional[User]:
     if not ObjectId.is_valid(user_id):
         return None
@@ -43,21 +60,31 @@ async def update_user(db: AsyncIOMotorDatabase, user_id: str, user_update: UserU
     if not update_data:
         return None
     
+    existing = await db.users.find_one({"_id": ObjectId(user_id)}, {"email": 1})
+    if not existing:
+        return None
+    
     result = await db.users.update_one(
         {"_id": ObjectId(user_id)}, 
         {"$set": update_data}
     )
     
     if result.modified_count:
+        # Both addresses when the email itself changed
+        await publish_invalidation(db, users_by_email_cache, *{existing["email"], update_data.get("email", existing["email"])})
         return await get_user_by_id(db, user_id)
     return None
 
+@traced
 async def delete_user(db: AsyncIOMotorDatabase, user_id: str) -> bool:
     if not ObjectId.is_valid(user_id):
         return False
-    result = await db.users.delete_one({"_id": ObjectId(user_id)})
-    return result.deleted_count > 0
+    deleted = await db.users.find_one_and_delete({"_id": ObjectId(user_id)}, projection={"email": 1})
+    if deleted:
+        await publish_invalidation(db, users_by_email_cache, deleted["email"])
+    return deleted is not None
 
+@traced
 async def authenticate_user(db: AsyncIOMotorDatabase, email: str, password: str, role: str = None) -> Optional[UserInDB]:
     user = await get_user_by_email(db, email)
     if not user:
@@ -69,6 +96,7 @@ async def authenticate_user(db: AsyncIOMotorDatabase, email: str, password: str,
         return None
     return user
 
+@traced
 async def reset_user_password(db: AsyncIOMotorDatabase, user_id: str) -> Optional[str]:
     import secrets
     import string
@@ -80,27 +108,35 @@ async def reset_user_password(db: AsyncIOMotorDatabase, user_id: str) -> Optiona
     temp_password = ''.join(secrets.choice(string.ascii_letters + string.digits) for _ in range(8))
     hashed_password = get_password_hash(temp_password)
     
-    result = await db.users.update_one(
+    user = await db.users.find_one_and_update(
         {"_id": ObjectId(user_id)},
-        {"$set": {"hashed_password": hashed_password}}
+        {"$set": {"hashed_password": hashed_password}},
+        projection={"email": 1}
     )
     
-    if result.modified_count:
+    if user:
+        await publish_invalidation(db, users_by_email_cache, user["email"])
         return temp_password
     return None
 
+@traced
 async def update_user_biodata(db: AsyncIOMotorDatabase, user_id: str, biodata: Dict[str, Any]) -> bool:
     """Update user's biodata"""
     if not ObjectId.is_valid(user_id):
         return False
     
-    result = await db.users.update_one(
+    user = await db.users.find_one_and_update(
         {"_id": ObjectId(user_id)},
-        {"$set": {"biodata": biodata}}
+        {"$set": {"biodata": biodata}},
+        projection={"email": 1, "biodata": 1}
     )
+    if not user:
+        return False
+    await publish_invalidation(db, users_by_email_cache, user["email"])
     
-    return result.modified_count > 0
+    return user.get("biodata") != biodata
 
+@traced
 async def get_user_biodata(db: AsyncIOMotorDatabase, user_id: str) -> Optional[Dict[str, Any]]:
     """Get user's biodata"""
     if not ObjectId.is_valid(user_id):
@@ -0,0 +1,62 @@
+from typing import Any, Dict, Hashable, Optional, Tuple, Type
+import time
+
+# Small per-process caches for hot, rarely changing reads. Every cache is registered by
+# name so write paths can invalidate it without importing the module that owns it.
+
+_MISSING = object()
+
+class TTLCache:
+    """Dict of key -> value that expire after ttl seconds (or an earlier per-entry deadline)"""
+
+    def __init__(self, name: str, ttl_seconds: float, max_entries: int = 1024):
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: Dict[Hashable, Tuple[float, Any]] = {}
+
+    def get(self, key: Hashable = None, default: Any = None) -> Any:
+        entry = self._entries.get(key, _MISSING)
+        if entry is _MISSING:
+            return default
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            self._entries.pop(key, None)
+            return default
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        ttl = self.ttl_seconds if ttl_seconds is None else min(ttl_seconds, self.ttl_seconds)
+        if len(self._entries) >= self.max_entries and key not in self._entries:
+            # Insertion order: drop the oldest entry
+            self._entries.pop(next(iter(self._entries)))
+        self._entries[key] = (time.monotonic() + ttl, value)
+
+    def invalidate(self, key: Hashable = _MISSING) -> None:
+        """Drop one key, or everything when no key is given"""
+        if key is _MISSING:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+class LRUCache(TTLCache):
+    """TTLCache that evicts the least recently read entry rather than the oldest"""
+
+    def get(self, key: Hashable = None, default: Any = None) -> Any:
+        value = super().get(key, _MISSING)
+        if value is _MISSING:
+            return default
+        # Re-inserting moves the key to the end of the eviction order
+        self._entries[key] = self._entries.pop(key)
+        return value
+
+CACHES: Dict[str, TTLCache] = {}
+
+def register_cache(name: str, ttl_seconds: float, max_entries: int = 1024, cache_class: Type[TTLCache] = TTLCache) -> TTLCache:
+    cache = CACHES[name] = cache_class(name, ttl_seconds, max_entries)
+    return cache
+
+def invalidate_cache(name: str, key: Hashable = _MISSING) -> None:
+    cache = CACHES.get(name)
+    if cache is not None:
+        cache.invalidate(key)
@@ -1,31 +1,38 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from ..utils.security import verify_token
 from ..services.user_service import get_user_by_email
 from ..db_config import get_database
+from .tracing import start_span
+import logging
+
+logger = logging.getLogger(__name__)
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
-async def get_current_user(token: str = Depends(oauth2_scheme)):
+async def get_current_user(request: Request, token: str = Depends(oauth2_scheme)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
     
-    email = verify_token(token, credentials_exception)
-    db = await get_database()
-    user = await get_user_by_email(db, email)
-    if user is None:
-        raise credentials_exception
+    with start_span("auth.get_current_user"):
+        email = verify_token(token, credentials_exception)
+        db = await get_database()
+        user = await get_user_by_email(db, email)
+        if user is None:
+            raise credentials_exception
+    # Picked up by the metrics middleware to label the request by role
+    request.state.user_role = user.role
     return user
 
 async def get_current_active_user(current_user = Depends(get_current_user)):
-    print(f"DEBUG AUTH: get_current_active_user called for {current_user.email} (role: {current_user.role}, status: {current_user.status})")
     if current_user.status != "active":
-        print(f"DEBUG AUTH: User {current_user.email} is inactive")
+        logger.warning("Inactive user %s rejected", current_user.email)
         raise HTTPException(status_code=400, detail="Inactive user")
-    print(f"DEBUG AUTH: User {current_user.email} is active")
+    # Runs on every authenticated request, so only a sample is kept even at debug level
+    logger.debug("Authenticated %s (role: %s)", current_user.email, current_user.role, extra={"sample_rate": 0.01})
     return current_user
 
 def require_role(required_role: str):
@@ -7,6 +7,7 @@ import uuid
 import logging
 from typing import Union
 
+from .tracing import get_request_id
 from ..schemas.error import (
     ErrorCode, 
     ErrorResponse, 
@@ -48,7 +49,7 @@ class AuthenticationError(HTTPException):
 
 async def authentication_exception_handler(request: Request, exc: AuthenticationError):
     """Handle authentication errors with detailed responses"""
-    request_id = str(uuid.uuid4())
+    request_id = get_request_id() or str(uuid.uuid4())
     
     # Log the error for debugging
     logger.warning(f"Authentication error: {exc.error_code} - {exc.custom_message} (Request ID: {request_id})")
@@ -61,15 +62,19 @@ async def authentication_exception_handler(request: Request, exc: Authentication
         request_id=request_id
     )
     
+    headers = {"X-Request-ID": request_id}
+    if exc.retry_after:
+        headers["Retry-After"] = str(exc.retry_after)
+    
     return JSONResponse(
         status_code=exc.status_code,
         content=error_response.dict(),
-        headers={"X-Request-ID": request_id}
+        headers=headers
     )
 
 async def http_exception_handler(request: Request, exc: Union[HTTPException, StarletteHTTPException]):
     """Handle general HTTP exceptions"""
-    request_id = str(uuid.uuid4())
+    request_id = get_request_id() or str(uuid.uuid4())
     
     # Map HTTP status codes to error codes
     status_to_error_code = {
@@ -97,12 +102,13 @@ async def http_exception_handler(request: Request, exc: Union[HTTPException, Sta
     return JSONResponse(
         status_code=exc.status_code,
         content=error_response.dict(),
-        headers={"X-Request-ID": request_id}
+        # Keep headers the exception carries (Retry-After, Content-Range, WWW-Authenticate)
+        headers={**(getattr(exc, "headers", None) or {}), "X-Request-ID": request_id}
     )
 
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
     """Handle validation errors with field-specific details"""
-    request_id = str(uuid.uuid4())
+    request_id = get_request_id() or str(uuid.uuid4())
     
     # Extract validation errors
     validation_errors = []
@@ -137,7 +143,8 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
 
 async def general_exception_handler(request: Request, exc: Exception):
     """Handle unexpected exceptions"""
-    request_id = str(uuid.uuid4())
+    # Runs outside the request context, so take the id RequestContextMiddleware left on the request
+    request_id = get_request_id() or getattr(request.state, "request_id", None) or str(uuid.uuid4())
     
     # Log the unexpected error
     logger.error(f"Unexpected error: {type(exc).__name__}: {str(exc)} (Request ID: {request_id})", exc_info=True)
@@ -154,58 +161,3 @@ async def general_exception_handler(request: Request, exc: Exception):
         content=error_response.dict(),
         headers={"X-Request-ID": request_id}
     )
-
-# Rate limiting utilities
-class RateLimiter:
-    """Simple in-memory rate limiter for login attempts"""
-    def __init__(self):
-        self.attempts = {}  # {email: {"count": int, "last_attempt": datetime, "locked_until": datetime}}
-        self.max_attempts = 5
-        self.lockout_duration = 900  # 15 minutes in seconds
-        self.window_duration = 300   # 5 minutes in seconds
-    
-    def is_rate_limited(self, email: str) -> tuple[bool, int]:
-        """Check if email is rate limited. Returns (is_limited, retry_after_seconds)"""
-        now = datetime.utcnow()
-        
-        if email not in self.attempts:
-            return False, 0
-        
-        attempt_data = self.attempts[email]
-        
-        # Check if still locked out
-        if "locked_until" in attempt_data and now < attempt_data["locked_until"]:
-            retry_after = int((attempt_data["locked_until"] - now).total_seconds())
-            return True, retry_after
-        
-        # Reset if window has passed
-        if "last_attempt" in attempt_data:
-            time_since_last = (now - attempt_data["last_attempt"]).total_seconds()
-            if time_since_last > self.window_duration:
-                self.attempts[email] = {"count": 0, "last_attempt": now}
-                return False, 0
-        
-        return False, 0
-    
-    def record_attempt(self, email: str, success: bool):
-        """Record a login attempt"""
-        now = datetime.utcnow()
-        
-        if email not in self.attempts:
-            self.attempts[email] = {"count": 0, "last_attempt": now}
-        
-        if success:
-            # Reset on successful login
-            self.attempts[email] = {"count": 0, "last_attempt": now}
-        else:
-            # Increment failed attempts
-            self.attempts[email]["count"] += 1
-            self.attempts[email]["last_attempt"] = now
-            
-            # Lock account if too many attempts
-            if self.attempts[email]["count"] >= self.max_attempts:
-                from datetime import timedelta
-                self.attempts[email]["locked_until"] = now + timedelta(seconds=self.lockout_duration)
-
-# Global rate limiter instance
-rate_limiter = RateLimiter()
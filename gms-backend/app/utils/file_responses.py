@@ -0,0 +1,140 @@
+from fastapi import HTTPException, Request, Response
+from fastapi.responses import FileResponse
+from starlette.concurrency import run_in_threadpool
+from starlette.types import Receive, Scope, Send
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Optional, Tuple
+import anyio
+import mimetypes
+import os
+
+# ASGI extension for servers that can hand a file descriptor straight to sendfile()
+ZEROCOPY_EXTENSION = "http.response.zerocopysend"
+
+# Downloads are per-user and access-checked, so browsers may keep them but must revalidate
+DOWNLOAD_CACHE_CONTROL = "private, no-cache"
+
+class RangeFileResponse(FileResponse):
+    """FileResponse serving an optional single byte range, zero-copy when the server supports it"""
+    chunk_size = 256 * 1024
+
+    def __init__(self, path, stat_result: os.stat_result, byte_range: Optional[Tuple[int, int]] = None, **kwargs):
+        super().__init__(path, stat_result=stat_result, **kwargs)
+        self.byte_range = byte_range
+        self.headers["accept-ranges"] = "bytes"
+        if byte_range is not None:
+            start, end = byte_range
+            self.status_code = 206
+            self.headers["content-range"] = f"bytes {start}-{end}/{stat_result.st_size}"
+            self.headers["content-length"] = str(end - start + 1)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        start, end = self.byte_range or (0, self.stat_result.st_size - 1)
+        count = end - start + 1
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if self.send_header_only or count <= 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        elif ZEROCOPY_EXTENSION in scope.get("extensions", {}):
+            file = await run_in_threadpool(open, self.path, "rb")
+            try:
+                await send({"type": ZEROCOPY_EXTENSION, "file": file, "offset": start, "count": count, "more_body": False})
+            finally:
+                file.close()
+        else:
+            async with await anyio.open_file(self.path, mode="rb") as file:
+                await file.seek(start)
+                remaining = count
+                while remaining > 0:
+                    chunk = await file.read(min(self.chunk_size, remaining))
+                    remaining = remaining - len(chunk) if chunk else 0
+                    await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+        if self.background is not None:
+            await self.background()
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison
+    bare = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == bare for candidate in header.split(","))
+
+def _not_modified(request: Request, etag: str, mtime: int) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return mtime <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+def _parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """Single "bytes=" range as inclusive (start, end); None to serve the whole file.
+
+    Multiple ranges are answered with the whole file, which RFC 9110 allows.
+    Raises 416 when the range is well-formed but starts past the end of the file.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, _, last = spec.strip().partition("-")
+    try:
+        if not first:
+            # Suffix range: the last N bytes
+            length = int(last)
+            if length <= 0:
+                raise ValueError
+            return max(size - length, 0), size - 1
+        start = int(first)
+        end = int(last) if last else size - 1
+    except ValueError:
+        return None
+    if start >= size:
+        raise HTTPException(status_code=416, detail="Requested range not satisfiable", headers={"content-range": f"bytes */{size}"})
+    if start > end:
+        return None
+    return start, min(end, size - 1)
+
+async def send_file(request: Request, path, filename: str = None, media_type: str = None, etag: str = None) -> Response:
+    """Serve a file download with conditional GET and Range support.
+
+    etag should be the content hash when the caller has one; otherwise one is derived from
+    the modification time and size.
+    """
+    try:
+        stat_result = await run_in_threadpool(os.stat, path)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="File not found on disk")
+
+    mtime = int(stat_result.st_mtime)
+    etag = f'"{etag}"' if etag else f'W/"{mtime:x}-{stat_result.st_size:x}"'
+    last_modified = formatdate(mtime, usegmt=True)
+    cache_headers = {"etag": etag, "last-modified": last_modified, "cache-control": DOWNLOAD_CACHE_CONTROL}
+
+    if _not_modified(request, etag, mtime):
+        return Response(status_code=304, headers=cache_headers)
+
+    byte_range = None
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    # A stale If-Range means the client's partial copy is outdated: send the whole file.
+    # If-Range needs a strong validator, so a derived (weak) ETag never matches.
+    if_range_matches = if_range is None or if_range == last_modified or (if_range == etag and not etag.startswith("W/"))
+    if range_header and if_range_matches:
+        byte_range = _parse_range(range_header, stat_result.st_size)
+
+    if media_type is None:
+        media_type = mimetypes.guess_type(filename or str(path))[0] or "application/octet-stream"
+
+    response = RangeFileResponse(
+        path,
+        stat_result=stat_result,
+        byte_range=byte_range,
+        filename=filename,
+        media_type=media_type,
+        method=request.method
+    )
+    response.headers.update(cache_headers)
+    return response
@@ -0,0 +1,89 @@
+from fastapi import Request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram,
+    REGISTRY, generate_latest, multiprocess
+)
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+import os
+import time
+
+# Metrics are labelled by route template (e.g. /applications/{application_id}), never the
+# raw path, so label cardinality stays bounded. With PROMETHEUS_MULTIPROC_DIR set (as
+# gunicorn.conf.py does) each worker writes to shared files and /metrics sums them.
+UNMATCHED_ROUTE = "unmatched"
+ANONYMOUS_ROLE = "anonymous"
+
+REQUEST_COUNT = Counter(
+    "gms_http_requests_total",
+    "HTTP requests by route template, role and status code",
+    ["method", "route", "role", "status"]
+)
+REQUEST_LATENCY = Histogram(
+    "gms_http_request_duration_seconds",
+    "HTTP request latency by route template, role and status code",
+    ["method", "route", "role", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "gms_http_requests_in_flight",
+    "HTTP requests currently being handled by route template",
+    ["method", "route"],
+    multiprocess_mode="livesum"
+)
+JOB_DURATION = Histogram(
+    "gms_job_duration_seconds",
+    "Background job run time by job type and outcome",
+    ["type", "outcome"],
+    buckets=(0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0, 900.0, 3600.0)
+)
+
+def _route_template(scope: Scope) -> str:
+    # FastAPI stores the matched APIRoute in the scope once routing has happened
+    route = scope.get("route")
+    return getattr(route, "path", UNMATCHED_ROUTE)
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording request count and latency per route template"""
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # The role is recorded on request.state by the auth dependency
+            role = scope.get("state", {}).get("user_role", ANONYMOUS_ROLE)
+            labels = (scope["method"], _route_template(scope), role, str(status_code))
+            REQUEST_COUNT.labels(*labels).inc()
+            REQUEST_LATENCY.labels(*labels).observe(time.perf_counter() - start)
+
+async def track_in_flight(request: Request):
+    """App-wide dependency: runs after routing, so the gauge gets the route template"""
+    gauge = REQUESTS_IN_FLIGHT.labels(request.method, _route_template(request.scope))
+    gauge.inc()
+    try:
+        yield
+    finally:
+        gauge.dec()
+
+def render_metrics() -> tuple:
+    """Exposition payload and content type, aggregated across workers in multiprocess mode"""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
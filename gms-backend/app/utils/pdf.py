@@ -0,0 +1,87 @@
+from typing import List, Tuple
+import textwrap
+
+# Minimal PDF writer for text documents (letters, certificates): standard Type 1 fonts,
+# A4 pages, word wrapping. Standard library only, so it can run in spawned worker processes.
+
+PAGE_WIDTH, PAGE_HEIGHT = 595, 842  # A4 in points
+MARGIN = 72
+
+# style -> (font resource, size, space after in points)
+STYLES = {
+    "title": ("F2", 16, 14),
+    "heading": ("F2", 11, 6),
+    "body": ("F1", 11, 8),
+    "small": ("F1", 9, 4),
+}
+FONTS = {"F1": "Helvetica", "F2": "Helvetica-Bold"}
+
+# Average Helvetica glyph width as a fraction of the font size, for wrapping
+_AVERAGE_CHAR_WIDTH = 0.5
+_LINE_HEIGHT = 1.35
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+def _layout(blocks: List[Tuple[str, str]]) -> List[List[Tuple[str, int, float, str]]]:
+    """Wrap blocks into lines and split them into pages of (font, size, y, text)"""
+    pages, page = [], []
+    y = PAGE_HEIGHT - MARGIN
+    for style, text in blocks:
+        font, size, space_after = STYLES[style]
+        width_chars = max(int((PAGE_WIDTH - 2 * MARGIN) / (size * _AVERAGE_CHAR_WIDTH)), 1)
+        lines = []
+        for paragraph in text.split("\n"):
+            lines.extend(textwrap.wrap(paragraph, width_chars) or [""])
+        for line in lines:
+            if y - size < MARGIN:
+                pages.append(page)
+                page, y = [], PAGE_HEIGHT - MARGIN
+            y -= size * _LINE_HEIGHT
+            page.append((font, size, y, line))
+        y -= space_after
+    pages.append(page)
+    return pages
+
+def render_pdf(blocks: List[Tuple[str, str]], title: str = "") -> bytes:
+    """Render (style, text) blocks to PDF bytes; see STYLES for the available styles"""
+    objects: List[bytes] = []
+
+    def add(body: bytes) -> int:
+        objects.append(body)
+        return len(objects)
+
+    catalog = add(b"")  # filled in once the page tree exists
+    pages_root = add(b"")
+    font_ids = {name: add(f"<< /Type /Font /Subtype /Type1 /BaseFont /{base} /Encoding /WinAnsiEncoding >>".encode())
+                for name, base in FONTS.items()}
+    resources = " ".join(f"/{name} {object_id} 0 R" for name, object_id in font_ids.items())
+
+    page_ids = []
+    for page in _layout(blocks):
+        content = "\n".join(
+            f"BT /{font} {size} Tf {MARGIN} {y:.1f} Td ({_escape(text)}) Tj ET" for font, size, y, text in page
+        ).encode("cp1252", errors="replace")
+        stream = add(b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream")
+        page_ids.append(add(
+            f"<< /Type /Page /Parent {pages_root} 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+            f"/Resources << /Font << {resources} >> >> /Contents {stream} 0 R >>".encode()
+        ))
+
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids)
+    objects[pages_root - 1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>".encode()
+    objects[catalog - 1] = f"<< /Type /Catalog /Pages {pages_root} 0 R >>".encode()
+    info = add(f"<< /Title ({_escape(title)}) /Producer (GMS) >>".encode("cp1252", errors="replace"))
+
+    output = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref_offset = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    output += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    output += b"trailer\n<< /Size %d /Root %d 0 R /Info %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1, catalog, info, xref_offset
+    )
+    return bytes(output)
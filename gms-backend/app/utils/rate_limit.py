@@ -0,0 +1,201 @@
+from fastapi import Depends, Request
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from collections import OrderedDict
+from typing import Dict, Tuple
+from datetime import datetime
+import asyncio
+import math
+import time
+
+from ..config import settings
+from ..db_config import get_database
+from ..schemas.error import ErrorCode
+from .dependencies import get_current_active_user
+from .error_handlers import AuthenticationError
+
+class RateLimitPolicy:
+    """Allow `limit` hits per identity within a sliding window of `window_seconds`"""
+    def __init__(self, name: str, limit: int, window_seconds: int):
+        self.name = name
+        self.limit = limit
+        self.window_seconds = window_seconds
+
+RATE_LIMIT_POLICIES: Dict[str, RateLimitPolicy] = {
+    # Failed logins per email; successful logins reset the counter
+    "login": RateLimitPolicy("login", settings.rate_limit_login_attempts, 300),
+    # Anonymous sign-off/review token pages per client address
+    "token_page": RateLimitPolicy("token_page", settings.rate_limit_token_page_requests, 60),
+    # File uploads per authenticated user
+    "upload": RateLimitPolicy("upload", settings.rate_limit_upload_requests, 60),
+}
+
+class LocalRateLimitBackend:
+    """Per-process window counters with LRU eviction of idle keys"""
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._counters: "OrderedDict[str, list]" = OrderedDict()  # {key: [window_index, current, previous]}
+
+    def _counts(self, key: str, window_index: int) -> list:
+        entry = self._counters.get(key)
+        if entry is None:
+            entry = [window_index, 0, 0]
+            self._counters[key] = entry
+            if len(self._counters) > self.max_keys:
+                self._counters.popitem(last=False)
+        else:
+            self._counters.move_to_end(key)
+            if entry[0] != window_index:
+                # Roll the window forward; anything older than one window no longer counts
+                previous = entry[1] if entry[0] == window_index - 1 else 0
+                entry[:] = [window_index, 0, previous]
+        return entry
+
+    async def get(self, key: str, window_index: int, window_seconds: int) -> Tuple[int, int]:
+        entry = self._counts(key, window_index)
+        return entry[1], entry[2]
+
+    async def increment(self, key: str, window_index: int, window_seconds: int) -> Tuple[int, int]:
+        entry = self._counts(key, window_index)
+        entry[1] += 1
+        return entry[1], entry[2]
+
+    async def reset(self, key: str, window_index: int) -> None:
+        self._counters.pop(key, None)
+
+class MongoRateLimitBackend:
+    """Window counters in a TTL collection so limits hold across worker processes"""
+    collection_name = "rate_limits"
+
+    def __init__(self):
+        self._index_ready = False
+
+    async def _collection(self):
+        db = await get_database()
+        collection = db[self.collection_name]
+        if not self._index_ready:
+            await collection.create_index("expires_at", expireAfterSeconds=0)
+            self._index_ready = True
+        return collection
+
+    @staticmethod
+    def _expires_at(window_index: int, window_seconds: int) -> datetime:
+        # A window stays relevant as the "previous" window until the end of the next one
+        return datetime.utcfromtimestamp((window_index + 2) * window_seconds)
+
+    async def get(self, key: str, window_index: int, window_seconds: int) -> Tuple[int, int]:
+        collection = await self._collection()
+        counts = {}
+        async for doc in collection.find({"_id": {"$in": [f"{key}:{window_index}", f"{key}:{window_index - 1}"]}}):
+            counts[doc["_id"]] = doc["count"]
+        return counts.get(f"{key}:{window_index}", 0), counts.get(f"{key}:{window_index - 1}", 0)
+
+    async def increment(self, key: str, window_index: int, window_seconds: int) -> Tuple[int, int]:
+        collection = await self._collection()
+
+        async def increment_current():
+            update = {"$inc": {"count": 1}, "$setOnInsert": {"expires_at": self._expires_at(window_index, window_seconds)}}
+            try:
+                return await collection.find_one_and_update(
+                    {"_id": f"{key}:{window_index}"}, update, upsert=True, return_document=ReturnDocument.AFTER
+                )
+            except DuplicateKeyError:
+                # Another worker created the window document concurrently; it exists now
+                return await collection.find_one_and_update(
+                    {"_id": f"{key}:{window_index}"}, update, return_document=ReturnDocument.AFTER
+                )
+
+        current, previous = await asyncio.gather(
+            increment_current(),
+            collection.find_one({"_id": f"{key}:{window_index - 1}"})
+        )
+        return current["count"], previous["count"] if previous else 0
+
+    async def reset(self, key: str, window_index: int) -> None:
+        collection = await self._collection()
+        await collection.delete_many({"_id": {"$in": [f"{key}:{window_index}", f"{key}:{window_index - 1}"]}})
+
+class RateLimiter:
+    """Sliding-window counter limiter: O(1) per check, two counters per key"""
+    def __init__(self, backend):
+        self.backend = backend
+
+    @staticmethod
+    def _evaluate(policy: RateLimitPolicy, now: float, current: int, previous: int) -> Tuple[bool, int]:
+        window = policy.window_seconds
+        elapsed = now % window
+        # Weight the previous window by how much of it still overlaps the sliding window
+        estimate = previous * (1 - elapsed / window) + current
+        if estimate < policy.limit:
+            return False, 0
+
+        if current >= policy.limit:
+            # Wait for this window to become the previous one and decay below the limit
+            retry_after = (window - elapsed) + window * (1 - policy.limit / current)
+        else:
+            retry_after = window * (1 - (policy.limit - current) / previous) - elapsed
+        return True, max(1, math.ceil(retry_after))
+
+    async def check(self, policy: RateLimitPolicy, identity: str) -> Tuple[bool, int]:
+        """Check whether the identity is limited without recording a hit"""
+        now = time.time()
+        window_index = int(now // policy.window_seconds)
+        current, previous = await self.backend.get(f"{policy.name}:{identity}", window_index, policy.window_seconds)
+        return self._evaluate(policy, now, current, previous)
+
+    async def hit(self, policy: RateLimitPolicy, identity: str) -> Tuple[bool, int]:
+        """Record a hit and report whether the identity is now over the limit"""
+        now = time.time()
+        window_index = int(now // policy.window_seconds)
+        current, previous = await self.backend.increment(f"{policy.name}:{identity}", window_index, policy.window_seconds)
+        # The hit that reaches the limit is still allowed; only hits beyond it are rejected
+        return self._evaluate(policy, now, current - 1, previous)
+
+    async def reset(self, policy: RateLimitPolicy, identity: str) -> None:
+        now = time.time()
+        await self.backend.reset(f"{policy.name}:{identity}", int(now // policy.window_seconds))
+
+def _create_backend():
+    if settings.rate_limit_backend == "mongo":
+        return MongoRateLimitBackend()
+    return LocalRateLimitBackend(settings.rate_limit_max_keys)
+
+# Global rate limiter instance
+rate_limiter = RateLimiter(_create_backend())
+
+def get_client_address(request: Request) -> str:
+    """Client address as resolved by uvicorn's proxy header handling.
+
+    The raw X-Forwarded-For header is never read: its leftmost hops are written by the client,
+    so a made-up value per request would dodge the limit. Uvicorn only takes the address from
+    hops appended by the trusted proxies (FORWARDED_ALLOW_IPS).
+    """
+    return request.client.host if request.client else "unknown"
+
+def _rate_limited_error(retry_after: int) -> AuthenticationError:
+    return AuthenticationError(
+        error_code=ErrorCode.RATE_LIMITED,
+        message="Too many requests",
+        details=f"Please wait {retry_after} seconds before trying again",
+        retry_after=retry_after
+    )
+
+def limit_by_client(policy_name: str):
+    """Dependency limiting a route per client address"""
+    policy = RATE_LIMIT_POLICIES[policy_name]
+
+    async def client_limiter(request: Request):
+        is_limited, retry_after = await rate_limiter.hit(policy, get_client_address(request))
+        if is_limited:
+            raise _rate_limited_error(retry_after)
+    return client_limiter
+
+def limit_by_user(policy_name: str):
+    """Dependency limiting a route per authenticated user"""
+    policy = RATE_LIMIT_POLICIES[policy_name]
+
+    async def user_limiter(current_user = Depends(get_current_active_user)):
+        is_limited, retry_after = await rate_limiter.hit(policy, current_user.email)
+        if is_limited:
+            raise _rate_limited_error(retry_after)
+    return user_limiter
@@ -3,12 +3,15 @@ from typing import Optional, Dict, Any
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from ..config import settings
+from .tracing import traced
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+@traced
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
+@traced
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
@@ -0,0 +1,97 @@
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from pymongo.errors import PyMongoError
+from collections import OrderedDict
+from typing import Dict, Any
+import json
+import time
+
+from ..config import settings
+from ..db_config import database
+from ..database.command_monitor import RequestDbStats, current_db_stats, log_slow_command
+from ..services.job_service import run_in_background
+from .tracing import get_request_id
+
+# Commands MongoDB can explain
+_EXPLAINABLE_COMMANDS = {"find", "aggregate", "count", "distinct", "update", "delete", "findAndModify"}
+
+# Query shapes already explained by this process; a slow shape is explained once, not per request
+_explained_shapes: "OrderedDict[str, None]" = OrderedDict()
+_MAX_EXPLAINED_SHAPES = 1000
+
+def _plan_summary(plan: Dict[str, Any]) -> str:
+    """Collapse a winning plan tree into e.g. "FETCH > IXSCAN(email_1)" """
+    stages = []
+    while plan:
+        stage = plan.get("stage", "?")
+        if plan.get("indexName"):
+            stage = f"{stage}({plan['indexName']})"
+        stages.append(stage)
+        plan = plan.get("inputStage") or (plan.get("inputStages") or [None])[0]
+    return " > ".join(stages)
+
+def _winning_plan(explain: Dict[str, Any]) -> Dict[str, Any]:
+    planner = explain.get("queryPlanner")
+    if planner is None:
+        # Aggregations nest the planner output in their first ($cursor) stage
+        first_stage = (explain.get("stages") or [{}])[0]
+        planner = first_stage.get("$cursor", {}).get("queryPlanner", {})
+    return planner.get("winningPlan", {})
+
+async def _log_slow_commands(slow_commands: list, context: Dict[str, Any]) -> None:
+    for slow_command in slow_commands:
+        plan = None
+        shape = json.dumps([slow_command["command"], slow_command["collection"], slow_command["filter"]], default=str)
+        if (settings.slow_query_explain and database.client is not None
+                and slow_command["command"] in _EXPLAINABLE_COMMANDS and shape not in _explained_shapes):
+            _explained_shapes[shape] = None
+            if len(_explained_shapes) > _MAX_EXPLAINED_SHAPES:
+                _explained_shapes.popitem(last=False)
+            try:
+                explain = await database.client[slow_command["database"]].command(
+                    {"explain": slow_command["_explain"], "verbosity": "queryPlanner"}
+                )
+                plan = _plan_summary(_winning_plan(explain))
+            except PyMongoError as e:
+                plan = f"explain failed: {e}"
+        log_slow_command(slow_command, plan=plan, **context)
+
+class ServerTimingMiddleware:
+    """Pure ASGI middleware counting the Mongo round trips of each request.
+
+    Adds a Server-Timing header (db time and command count, app time) and logs the
+    request's slow commands once it has finished.
+    """
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        stats = RequestDbStats()
+        token = current_db_stats.set(stats)
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                app_ms = (time.perf_counter() - start) * 1000
+                timing = f'db;dur={stats.total_ms:.1f};desc="{stats.command_count} commands", app;dur={app_ms:.1f}'
+                message["headers"] = [*message.get("headers", []), (b"server-timing", timing.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_db_stats.reset(token)
+            if stats.slow_commands:
+                route = scope.get("route")
+                context = {
+                    "request_id": get_request_id(),
+                    "method": scope["method"],
+                    "route": getattr(route, "path", scope["path"]),
+                    "request_commands": stats.command_count,
+                    "request_db_ms": round(stats.total_ms, 3),
+                }
+                # Explaining is another round trip; keep it off the response path
+                run_in_background(_log_slow_commands(stats.slow_commands, context))
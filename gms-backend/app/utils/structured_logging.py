@@ -0,0 +1,151 @@
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional, Any
+from datetime import datetime, timezone
+import copy
+import json
+import logging
+import queue
+import random
+import re
+import sys
+import traceback
+
+from ..config import settings
+from .tracing import get_request_id, get_trace_id
+
+# LogRecord attributes; anything else on a record came from `extra=` and is logged as a field
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "taskName"}
+
+# Keys whose values are never logged, wherever they appear in extra fields
+SENSITIVE_KEYS = {"token", "access_token", "refresh_token", "password", "hashed_password", "secret", "authorization"}
+
+_EMAIL_PATTERN = re.compile(r"([A-Za-z0-9._%+-])[A-Za-z0-9._%+-]*@([A-Za-z0-9-]+(?:\.[A-Za-z0-9-]+)*\.[A-Za-z]{2,})")
+_JWT_PATTERN = re.compile(r"eyJ[\w-]+\.[\w-]+\.[\w-]+")
+_BEARER_PATTERN = re.compile(r"(?i)(bearer\s+)[\w.~+/-]+=*")
+_SECRET_PAIR_PATTERN = re.compile(r"(?i)((?:token|password|secret)[\"']?\s*[:=]\s*[\"']?)[^\s\"'&,}]+")
+
+def redact(value: Any) -> Any:
+    """Mask emails, JWTs, bearer tokens and secret-looking key/value pairs"""
+    if isinstance(value, str):
+        value = _JWT_PATTERN.sub("[REDACTED]", value)
+        value = _BEARER_PATTERN.sub(r"\1[REDACTED]", value)
+        value = _SECRET_PAIR_PATTERN.sub(r"\1[REDACTED]", value)
+        return _EMAIL_PATTERN.sub(r"\1***@\2", value)
+    if isinstance(value, dict):
+        return {key: "[REDACTED]" if str(key).lower() in SENSITIVE_KEYS else redact(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [redact(item) for item in value]
+    return value
+
+class SamplingFilter(logging.Filter):
+    """Drop a share of high-volume records: log with extra={"sample_rate": 0.01} to keep 1%"""
+    def filter(self, record: logging.LogRecord) -> bool:
+        sample_rate = getattr(record, "sample_rate", None)
+        return sample_rate is None or random.random() < sample_rate
+
+class RequestContextFilter(logging.Filter):
+    """Tag records with the request and trace they were logged under"""
+    def filter(self, record: logging.LogRecord) -> bool:
+        request_id = get_request_id()
+        if request_id:
+            record.request_id = request_id
+            trace_id = get_trace_id()
+            if trace_id:
+                record.trace_id = trace_id
+        return True
+
+class RedactionFilter(logging.Filter):
+    """Redact the message and extra fields of every record before it is written"""
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.msg = redact(record.getMessage())
+        record.args = None
+        for key, value in list(vars(record).items()):
+            if key not in _RECORD_ATTRIBUTES:
+                setattr(record, key, "[REDACTED]" if key.lower() in SENSITIVE_KEYS else redact(value))
+        return True
+
+def _extra_fields(record: logging.LogRecord) -> dict:
+    return {key: value for key, value in vars(record).items() if key not in _RECORD_ATTRIBUTES and key != "sample_rate"}
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: timestamp, level, logger, message and any extra fields"""
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update(_extra_fields(record))
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+class TextFormatter(logging.Formatter):
+    """Human-readable lines for local development, extra fields appended as JSON"""
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)-7s %(name)s: %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        extra = _extra_fields(record)
+        if extra:
+            line = f"{line} {json.dumps(extra, default=str)}"
+        return line
+
+class _NonBlockingQueueHandler(QueueHandler):
+    """Hands records to the listener thread; drops them instead of blocking when the queue is full"""
+    dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve the message and traceback now (arguments may change later) but leave
+        # formatting and redaction to the listener thread
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = "".join(traceback.format_exception(*record.exc_info))
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            _NonBlockingQueueHandler.dropped += 1
+
+_listener: Optional[QueueListener] = None
+
+def setup_logging() -> None:
+    """Route all logging through a bounded queue to a background writer thread.
+
+    Called once per process (each gunicorn worker after fork, since the writer thread
+    does not survive forking); calling it again replaces the previous setup.
+    """
+    global _listener
+    shutdown_logging()
+
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(JsonFormatter() if settings.log_format == "json" else TextFormatter())
+    output.addFilter(RedactionFilter())
+
+    handler = _NonBlockingQueueHandler(queue.Queue(maxsize=settings.log_queue_size))
+    handler.addFilter(SamplingFilter())
+    # Runs in the logging caller's thread, where the request's context variables are visible
+    handler.addFilter(RequestContextFilter())
+
+    root = logging.getLogger()
+    for existing in [h for h in root.handlers if isinstance(h, _NonBlockingQueueHandler)]:
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(settings.log_level.upper())
+
+    _listener = QueueListener(handler.queue, output, respect_handler_level=True)
+    _listener.start()
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the writer thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
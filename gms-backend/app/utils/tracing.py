@@ -0,0 +1,326 @@
+from pymongo import monitoring
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from contextvars import ContextVar
+from typing import Optional, Dict, Any, List
+import functools
+import inspect
+import json
+import logging
+import os
+import queue
+import random
+import re
+import threading
+import time
+import urllib.request
+import uuid
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+# OTLP span kinds and status codes
+SPAN_KIND_INTERNAL, SPAN_KIND_SERVER, SPAN_KIND_CLIENT = 1, 2, 3
+STATUS_UNSET, STATUS_OK, STATUS_ERROR = 0, 1, 2
+
+# Incoming X-Request-ID values are propagated only if they look like an ID
+_REQUEST_ID_PATTERN = re.compile(r"^[A-Za-z0-9._:-]{1,128}$")
+_TRACEPARENT_PATTERN = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+current_request_id: ContextVar[Optional[str]] = ContextVar("current_request_id", default=None)
+
+class Span:
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "kind", "start_ns", "end_ns", "attributes", "status", "status_message")
+
+    def __init__(self, trace_id: str, parent_id: Optional[str], name: str, kind: int = SPAN_KIND_INTERNAL, attributes: Dict[str, Any] = None):
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.attributes = attributes or {}
+        self.status = STATUS_UNSET
+        self.status_message = None
+
+    def end(self, end_ns: int = None) -> None:
+        self.end_ns = end_ns or time.time_ns()
+        span_exporter.export(self)
+
+    def to_otlp(self) -> Dict[str, Any]:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [_otlp_attribute(key, value) for key, value in self.attributes.items() if value is not None],
+            "status": {"code": self.status, **({"message": self.status_message} if self.status_message else {})},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+class _UnsampledSpan:
+    """Stands in for the root of an unsampled trace so nested spans are skipped cheaply"""
+    trace_id = None
+    span_id = None
+
+_UNSAMPLED = _UnsampledSpan()
+
+# The innermost open span; Motor copies the context onto its executor threads, so Mongo
+# command spans are parented correctly
+_current_span: ContextVar[Optional[object]] = ContextVar("current_span", default=None)
+
+def _otlp_attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+def get_request_id() -> Optional[str]:
+    return current_request_id.get()
+
+def get_trace_id() -> Optional[str]:
+    span = _current_span.get()
+    return span.trace_id if span is not None else None
+
+class start_span:
+    """Context manager opening a child span of the current span (no-op outside a sampled trace)"""
+    __slots__ = ("name", "kind", "attributes", "span", "token")
+
+    def __init__(self, name: str, kind: int = SPAN_KIND_INTERNAL, attributes: Dict[str, Any] = None):
+        self.name = name
+        self.kind = kind
+        self.attributes = attributes
+
+    def __enter__(self) -> Optional[Span]:
+        parent = _current_span.get()
+        if parent is None or parent is _UNSAMPLED:
+            self.span = None
+            return None
+        self.span = Span(parent.trace_id, parent.span_id, self.name, self.kind, self.attributes)
+        self.token = _current_span.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if self.span is None:
+            return
+        _current_span.reset(self.token)
+        if exc is not None:
+            self.span.status = STATUS_ERROR
+            self.span.status_message = f"{exc_type.__name__}: {exc}"
+        self.span.end()
+
+def traced(func):
+    """Record a span around each call of a (sync or async) function"""
+    name = f"{func.__module__.rsplit('.', 1)[-1]}.{func.__name__}"
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            with start_span(name):
+                return await func(*args, **kwargs)
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with start_span(name):
+            return func(*args, **kwargs)
+    return wrapper
+
+class SpanExporter:
+    """Batches finished spans on a background thread and writes them as OTLP/JSON.
+
+    "file" appends one ExportTraceServiceRequest per line to TRACE_FILE; "otlp" POSTs
+    it to TRACE_OTLP_ENDPOINT (an OpenTelemetry collector's /v1/traces).
+    """
+    def __init__(self, mode: str, max_queue: int = 10000, batch_size: int = 512, flush_interval: float = 2.0):
+        self.mode = mode
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode in ("file", "otlp")
+
+    def export(self, span: Span) -> None:
+        if self._thread is None or self._pid != os.getpid():
+            # Started lazily so every forked worker gets its own writer thread
+            self._start()
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._queue = queue.Queue(maxsize=self._queue.maxsize)
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            batch: List[Optional[Span]] = []
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+                if batch[-1] is None:
+                    break
+            spans = [span for span in batch if span is not None]
+            if spans:
+                self._write(spans)
+            if batch and batch[-1] is None:
+                return
+
+    def _write(self, spans: List[Span]) -> None:
+        payload = json.dumps({
+            "resourceSpans": [{
+                "resource": {"attributes": [
+                    _otlp_attribute("service.name", settings.trace_service_name),
+                    _otlp_attribute("process.pid", os.getpid()),
+                ]},
+                "scopeSpans": [{"scope": {"name": "gms-backend"}, "spans": [span.to_otlp() for span in spans]}],
+            }]
+        })
+        try:
+            if self.mode == "file":
+                with open(settings.trace_file, "a") as trace_file:
+                    trace_file.write(payload + "\n")
+            else:
+                request = urllib.request.Request(
+                    settings.trace_otlp_endpoint, data=payload.encode("utf-8"),
+                    headers={"Content-Type": "application/json"}, method="POST"
+                )
+                urllib.request.urlopen(request, timeout=5).close()
+        except Exception as e:
+            logger.warning("Failed to export %s spans: %s", len(spans), e)
+
+    def shutdown(self) -> None:
+        """Flush pending spans and stop the writer thread"""
+        if self._thread is not None and self._pid == os.getpid():
+            try:
+                self._queue.put(None, timeout=1)
+            except queue.Full:
+                pass
+            self._thread.join(timeout=5)
+            self._thread = None
+
+span_exporter = SpanExporter(settings.trace_exporter)
+
+class MongoSpanListener(monitoring.CommandListener):
+    """Records a client span for every Mongo command issued inside a sampled trace"""
+    def started(self, event):
+        pass
+
+    def _finished(self, event, error: Optional[str] = None):
+        parent = _current_span.get()
+        if parent is None or parent is _UNSAMPLED:
+            return
+        end_ns = time.time_ns()
+        command = event.command_name
+        span = Span(parent.trace_id, parent.span_id, f"mongodb.{command}", SPAN_KIND_CLIENT, {
+            "db.system": "mongodb",
+            "db.name": event.database_name,
+            "db.operation": command,
+            "net.peer.name": "%s:%s" % event.connection_id,
+        })
+        span.start_ns = end_ns - event.duration_micros * 1000
+        if error:
+            span.status = STATUS_ERROR
+            span.status_message = error
+        span.end(end_ns)
+
+    def succeeded(self, event):
+        self._finished(event)
+
+    def failed(self, event):
+        self._finished(event, event.failure.get("errmsg") if isinstance(event.failure, dict) else str(event.failure))
+
+mongo_span_listener = MongoSpanListener()
+
+class RequestContextMiddleware:
+    """Pure ASGI middleware assigning (or propagating) X-Request-ID and opening the request's root span.
+
+    A W3C traceparent header continues the caller's trace; otherwise the request starts a
+    new trace, sampled at TRACE_SAMPLE_RATE.
+    """
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        request_id = headers.get(b"x-request-id", b"").decode("latin-1")
+        if not _REQUEST_ID_PATTERN.match(request_id):
+            request_id = uuid.uuid4().hex
+        request_id_token = current_request_id.set(request_id)
+        # Unhandled exceptions reach the error handler after the context var is reset
+        scope.setdefault("state", {})["request_id"] = request_id
+
+        span = self._root_span(scope, headers.get(b"traceparent", b"").decode("latin-1"), request_id)
+        span_token = _current_span.set(span or _UNSAMPLED)
+        status_code = 500
+
+        async def send_with_request_id(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                response_headers = list(message.get("headers", []))
+                # The error handlers already set it on their responses
+                if not any(name.lower() == b"x-request-id" for name, _ in response_headers):
+                    response_headers.append((b"x-request-id", request_id.encode("latin-1")))
+                message["headers"] = response_headers
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            _current_span.reset(span_token)
+            current_request_id.reset(request_id_token)
+            if span is not None:
+                # The route template is only known once routing has run
+                route = getattr(scope.get("route"), "path", None)
+                span.name = f"{scope['method']} {route or 'unmatched'}"
+                span.attributes.update({"http.route": route, "http.status_code": status_code})
+                if status_code >= 500:
+                    span.status = STATUS_ERROR
+                span.end()
+
+    @staticmethod
+    def _root_span(scope: Scope, traceparent: str, request_id: str) -> Optional[Span]:
+        if not span_exporter.enabled:
+            return None
+        match = _TRACEPARENT_PATTERN.match(traceparent)
+        if match:
+            trace_id, parent_id, flags = match.groups()
+            if not int(flags, 16) & 1:
+                return None
+        else:
+            if random.random() >= settings.trace_sample_rate:
+                return None
+            trace_id, parent_id = os.urandom(16).hex(), None
+        return Span(trace_id, parent_id, scope["method"], SPAN_KIND_SERVER, {
+            "http.method": scope["method"],
+            "http.scheme": scope.get("scheme"),
+            "request.id": request_id,
+        })
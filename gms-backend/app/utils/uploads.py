@@ -0,0 +1,86 @@
+from fastapi import HTTPException, UploadFile
+from starlette.concurrency import run_in_threadpool
+from typing import Awaitable, Callable
+from pathlib import Path
+import hashlib
+import os
+import tempfile
+
+from ..config import settings
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+UPLOAD_DIR = Path(settings.upload_directory)
+# Uploads are spooled here first; it sits under UPLOAD_DIR so the final rename stays on one filesystem
+UPLOAD_TMP_DIR = UPLOAD_DIR / "tmp"
+BLOB_DIR = UPLOAD_DIR / "blobs"
+
+def blob_path(sha256: str) -> Path:
+    """Content-addressed location of a stored file, fanned out so no directory grows too large"""
+    return BLOB_DIR / sha256[:2] / sha256[2:4] / sha256
+
+def format_file_size(size_bytes: int) -> str:
+    return f"{size_bytes / 1024:.1f} KB" if size_bytes < 1024 * 1024 else f"{size_bytes / (1024 * 1024):.1f} MB"
+
+def _open_temp_file():
+    UPLOAD_TMP_DIR.mkdir(parents=True, exist_ok=True)
+    fd, path = tempfile.mkstemp(prefix="upload_", dir=UPLOAD_TMP_DIR)
+    return os.fdopen(fd, "wb"), path
+
+def _write_chunk(destination, digest, chunk: bytes) -> None:
+    # hashlib releases the GIL for large buffers, so hashing here does not stall other threads
+    digest.update(chunk)
+    destination.write(chunk)
+
+def _commit_temp_file(destination, temp_path: str, final_path: Path) -> None:
+    destination.flush()
+    os.fsync(destination.fileno())
+    destination.close()
+    final_path.parent.mkdir(parents=True, exist_ok=True)
+    # Atomic: readers see either no file or the complete one. Identical content may already be there.
+    os.replace(temp_path, final_path)
+
+def _discard_temp_file(destination, temp_path: str) -> None:
+    destination.close()
+    try:
+        os.remove(temp_path)
+    except FileNotFoundError:
+        pass
+
+def _too_large(max_bytes: int) -> HTTPException:
+    return HTTPException(status_code=413, detail=f"File too large. Maximum size is {format_file_size(max_bytes)}.")
+
+async def save_upload(file: UploadFile, max_bytes: int = None, before_commit: Callable[[str, int], Awaitable[None]] = None) -> dict:
+    """Stream an upload to its content-addressed path, off the event loop.
+
+    Returns the SHA-256, the size in bytes and the stored path. Raises 413 as soon as the
+    upload passes max_bytes. before_commit(sha256, size) runs after hashing and before the
+    file is moved into place; if it raises, nothing is stored.
+    """
+    max_bytes = max_bytes or settings.upload_max_bytes
+    # Starlette knows the size when the multipart parser has already spooled the part
+    if file.size is not None and file.size > max_bytes:
+        raise _too_large(max_bytes)
+
+    destination, temp_path = await run_in_threadpool(_open_temp_file)
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            size += len(chunk)
+            if size > max_bytes:
+                raise _too_large(max_bytes)
+            await run_in_threadpool(_write_chunk, destination, digest, chunk)
+        sha256 = digest.hexdigest()
+        final_path = blob_path(sha256)
+        if before_commit is not None:
+            await before_commit(sha256, size)
+        await run_in_threadpool(_commit_temp_file, destination, temp_path, final_path)
+    except OSError as e:
+        await run_in_threadpool(_discard_temp_file, destination, temp_path)
+        raise HTTPException(status_code=500, detail=f"Failed to save file: {str(e)}")
+    except BaseException:
+        await run_in_threadpool(_discard_temp_file, destination, temp_path)
+        raise
+
+    return {"sha256": sha256, "size": size, "path": final_path}
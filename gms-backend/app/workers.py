@@ -0,0 +1,40 @@
+import os
+import sys
+
+from gunicorn.arbiter import Arbiter
+from uvicorn.server import Server
+from uvicorn.workers import UvicornWorker as BaseUvicornWorker
+
+from .services.event_service import event_bus
+
+class _Server(Server):
+    async def shutdown(self, sockets=None) -> None:
+        """End open event streams as soon as shutdown starts.
+
+        uvicorn waits for open connections before it runs the lifespan shutdown, so a connected
+        EventSource would otherwise hold the worker for the whole graceful timeout. This covers
+        every way out: SIGTERM/SIGINT, gunicorn's SIGQUIT and recycling after max_requests.
+        """
+        event_bus.close()
+        await super().shutdown(sockets)
+
+class UvicornWorker(BaseUvicornWorker):
+    """Gunicorn worker running uvicorn on uvloop with the httptools parser"""
+    CONFIG_KWARGS = {
+        "loop": "uvloop",
+        "http": "httptools",
+        "lifespan": "on",
+        # Take the client address from X-Forwarded-* only when the peer is a trusted proxy;
+        # trusting every peer would let clients choose their own address
+        "proxy_headers": True,
+        "forwarded_allow_ips": os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1"),
+    }
+
+    async def _serve(self) -> None:
+        # As in uvicorn, but with the server that closes event streams on shutdown
+        self.config.app = self.wsgi
+        server = _Server(config=self.config)
+        self._install_sigquit_handler()
+        await server.serve(sockets=self.sockets)
+        if not server.started:
+            sys.exit(Arbiter.WORKER_BOOT_ERROR)
@@ -0,0 +1,80 @@
+"""
+Gunicorn configuration for production.
+
+Usage: gunicorn app.main:app -c gunicorn.conf.py
+
+The app is preloaded in the master, which also runs the one-off startup tasks
+(index builds, sample data seeding) before forking, so workers only connect to
+MongoDB. Workers are recycled after a jittered number of requests to bound
+memory growth, and SIGTERM/SIGHUP drain in-flight requests before exiting.
+"""
+import asyncio
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+# Prometheus multiprocess mode: must be set before the app (and its metrics) is imported
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "gms-prometheus"))
+
+def _int_env(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value else default
+
+# Binding
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+
+# Workers: one async worker per core by default (WEB_CONCURRENCY overrides, as set by Heroku)
+workers_per_core = float(os.getenv("WORKERS_PER_CORE", "1"))
+default_workers = max(int(workers_per_core * multiprocessing.cpu_count()), 2)
+workers = _int_env("WEB_CONCURRENCY", min(default_workers, _int_env("MAX_WORKERS", 8)))
+worker_class = "app.workers.UvicornWorker"
+preload_app = True
+
+# Recycle workers to bound memory growth; jitter stops them restarting in lockstep
+max_requests = _int_env("MAX_REQUESTS", 2000)
+max_requests_jitter = _int_env("MAX_REQUESTS_JITTER", 200)
+
+# Graceful rollover: drain in-flight requests within the platform's shutdown window
+graceful_timeout = _int_env("GRACEFUL_TIMEOUT", 25)
+timeout = _int_env("WORKER_TIMEOUT", 60)
+keepalive = _int_env("KEEPALIVE", 5)
+
+# Logging
+accesslog = "-"
+errorlog = "-"
+loglevel = os.getenv("LOG_LEVEL", "info")
+
+def on_starting(server):
+    """Start from an empty metrics directory so stale worker files are not aggregated"""
+    metrics_dir = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir, exist_ok=True)
+
+def when_ready(server):
+    """Run startup tasks once in the master before any worker is forked"""
+    from app.main import STARTUP_TASKS_DONE_ENV, run_startup_tasks
+    from app.db_config import connect_to_mongo, close_mongo_connection
+    from app.utils.structured_logging import setup_logging, shutdown_logging
+
+    async def run():
+        await connect_to_mongo()
+        try:
+            await run_startup_tasks()
+        finally:
+            # Never hand a live client to forked workers
+            await close_mongo_connection()
+
+    # The log writer thread is stopped again before forking; workers start their own
+    setup_logging()
+    try:
+        asyncio.run(run())
+    finally:
+        shutdown_logging()
+    os.environ[STARTUP_TASKS_DONE_ENV] = "1"
+    server.log.info("Startup tasks complete, spawning %s workers", server.num_workers)
+
+def child_exit(server, worker):
+    """Drop a dead worker's live gauges from the aggregated metrics"""
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,163 @@
+"""
+Load test harness.
+
+    python -m perf.loadtest                      # all scenarios against a local MongoDB
+    python -m perf.loadtest -s signoff_burst -u 50 -d 30
+    python -m perf.loadtest --in-memory          # mongomock stand-in, no MongoDB needed
+    python -m perf.loadtest --save-baseline      # record the results as the new baseline
+
+By default the database is seeded and the API booted under uvicorn in a subprocess, so
+results include the real server stack. --base-url targets an already running server
+instead (it must use the same MONGODB_URI/DATABASE_NAME). Run from gms-backend/.
+"""
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+
+from .runner import Recorder, summarize, format_report, find_regressions, load_baseline, save_baseline
+from .scenarios import SCENARIOS, Session
+from .seed import seed_database
+
+# Load tests must not trip the production rate limits
+LOADTEST_ENV = {
+    "RATE_LIMIT_BACKEND": "memory",
+    "RATE_LIMIT_TOKEN_PAGE_REQUESTS": "1000000",
+    "RATE_LIMIT_UPLOAD_REQUESTS": "1000000",
+    "RATE_LIMIT_LOGIN_ATTEMPTS": "1000000",
+    "LOG_LEVEL": "warning",
+}
+
+def _parse_args():
+    parser = argparse.ArgumentParser(prog="python -m perf.loadtest", description="GMS API load test harness")
+    parser.add_argument("-s", "--scenario", action="append", choices=sorted(SCENARIOS), help="Scenario to run (repeatable; default all)")
+    parser.add_argument("-u", "--users", type=int, default=20, help="Concurrent virtual users per scenario")
+    parser.add_argument("-d", "--duration", type=float, default=20.0, help="Seconds per scenario")
+    parser.add_argument("--scale", type=int, default=1, help="Synthetic data scale factor")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for data and user behaviour")
+    parser.add_argument("--mongodb-uri", default=os.getenv("MONGODB_URI", "mongodb://localhost:27017"))
+    parser.add_argument("--database", default="gms_loadtest", help="Database to seed (it is dropped first)")
+    parser.add_argument("--base-url", help="Target an already running server instead of booting one")
+    parser.add_argument("--in-memory", action="store_true", help="Run the app in-process on mongomock-motor")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers when booting the server")
+    parser.add_argument("--baseline-label", default="local", help="Baseline name, e.g. the machine or CI runner")
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the baseline")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit non-zero when p95 regresses past the tolerance")
+    return parser.parse_args()
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def _boot_server(args, port: int) -> subprocess.Popen:
+    env = {**os.environ, **LOADTEST_ENV, "MONGODB_URI": args.mongodb_uri, "DATABASE_NAME": args.database}
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(args.workers), "--log-level", "warning", "--no-access-log"],
+        env=env
+    )
+
+async def _wait_until_healthy(client, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get("/health")).status_code == 200:
+                return
+        except Exception:
+            pass
+        await asyncio.sleep(0.25)
+    raise RuntimeError("Server did not become healthy in time")
+
+async def _run_scenario(name: str, client, fixture, args) -> Recorder:
+    recorder = Recorder()
+    deadline = time.monotonic() + args.duration
+    scenario = SCENARIOS[name]
+
+    async def virtual_user(index: int):
+        session = Session(client, recorder, random.Random(args.seed * 1000 + index))
+        while time.monotonic() < deadline:
+            await scenario(session, fixture)
+            # An iteration with nothing left to do awaits nothing; yield so it cannot starve the rest
+            await asyncio.sleep(0)
+
+    await asyncio.gather(*(virtual_user(index) for index in range(args.users)))
+    recorder.stop()
+    return recorder
+
+async def _connect(args):
+    """Seed the database and return (client, cleanup) for the chosen target"""
+    import httpx
+
+    if args.in_memory:
+        for key, value in {**LOADTEST_ENV, "DATABASE_NAME": args.database}.items():
+            os.environ.setdefault(key, value)
+        try:
+            from mongomock_motor import AsyncMongoMockClient
+        except ImportError:
+            sys.exit("--in-memory needs mongomock-motor: pip install -r perf/requirements.txt")
+        from app.db_config import database
+        from app.main import app
+
+        database.client = AsyncMongoMockClient()
+        database.database = database.client[args.database]
+        fixture = await seed_database(database.database, args.scale, args.seed)
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://loadtest")
+
+        async def cleanup():
+            await client.aclose()
+        return client, fixture, cleanup
+
+    from motor.motor_asyncio import AsyncIOMotorClient
+    mongo = AsyncIOMotorClient(args.mongodb_uri)
+    fixture = await seed_database(mongo[args.database], args.scale, args.seed)
+    mongo.close()
+
+    server = None
+    base_url = args.base_url
+    if not base_url:
+        port = _free_port()
+        server = _boot_server(args, port)
+        base_url = f"http://127.0.0.1:{port}"
+    limits = httpx.Limits(max_connections=args.users * 2, max_keepalive_connections=args.users * 2)
+    client = httpx.AsyncClient(base_url=base_url, timeout=30.0, limits=limits)
+    await _wait_until_healthy(client)
+
+    async def cleanup():
+        await client.aclose()
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+    return client, fixture, cleanup
+
+async def main() -> int:
+    args = _parse_args()
+    scenarios = args.scenario or list(SCENARIOS)
+    client, fixture, cleanup = await _connect(args)
+    regressed = []
+    try:
+        for name in scenarios:
+            recorder = await _run_scenario(name, client, fixture, args)
+            summary = summarize(recorder)
+            baseline = load_baseline(name, args.baseline_label)
+            print(format_report(name, summary, recorder.duration, baseline))
+            print()
+            regressed += [f"{name}: {endpoint}" for endpoint in find_regressions(summary, baseline)]
+            if args.save_baseline:
+                settings = {"users": args.users, "duration": args.duration, "scale": args.scale, "in_memory": args.in_memory}
+                print(f"Baseline saved to {save_baseline(name, args.baseline_label, summary, settings)}\n")
+    finally:
+        await cleanup()
+
+    if regressed:
+        print("p95 regressions against baseline:\n  " + "\n  ".join(regressed))
+        if args.fail_on_regression:
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
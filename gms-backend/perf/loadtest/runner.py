@@ -0,0 +1,102 @@
+"""
+Request recording, latency statistics and baseline comparison.
+"""
+from typing import Dict, List, Optional
+import json
+import math
+import os
+import time
+
+BASELINE_DIR = os.path.join(os.path.dirname(__file__), "baselines")
+
+# A p95 more than this much slower than the baseline is reported as a regression
+REGRESSION_TOLERANCE = 0.20
+
+class Recorder:
+    """Latencies and failures per endpoint, keyed by "METHOD /route/template" """
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.failures: Dict[str, int] = {}
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+
+    def record(self, endpoint: str, elapsed_ms: float, ok: bool) -> None:
+        self.latencies.setdefault(endpoint, []).append(elapsed_ms)
+        if not ok:
+            self.failures[endpoint] = self.failures.get(endpoint, 0) + 1
+
+    def stop(self) -> None:
+        self.finished = time.perf_counter()
+
+    @property
+    def duration(self) -> float:
+        return (self.finished or time.perf_counter()) - self.started
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+def summarize(recorder: Recorder) -> Dict[str, Dict[str, float]]:
+    summary = {}
+    duration = recorder.duration
+    for endpoint, values in sorted(recorder.latencies.items()):
+        values = sorted(values)
+        summary[endpoint] = {
+            "requests": len(values),
+            "failures": recorder.failures.get(endpoint, 0),
+            "rps": round(len(values) / duration, 2) if duration else 0.0,
+            "p50_ms": round(percentile(values, 0.50), 2),
+            "p95_ms": round(percentile(values, 0.95), 2),
+            "p99_ms": round(percentile(values, 0.99), 2),
+            "max_ms": round(values[-1], 2),
+        }
+    return summary
+
+def format_report(scenario: str, summary: Dict[str, Dict[str, float]], duration: float, baseline: Optional[dict] = None) -> str:
+    total = sum(row["requests"] for row in summary.values())
+    failures = sum(row["failures"] for row in summary.values())
+    lines = [
+        f"Scenario: {scenario}  duration: {duration:.1f}s  requests: {total}  "
+        f"throughput: {total / duration if duration else 0:.1f} req/s  failures: {failures}",
+        f"{'endpoint':<62} {'reqs':>6} {'fail':>5} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8}  vs baseline p95",
+    ]
+    for endpoint, row in summary.items():
+        comparison = ""
+        previous = (baseline or {}).get("endpoints", {}).get(endpoint)
+        if previous and previous["p95_ms"]:
+            change = (row["p95_ms"] - previous["p95_ms"]) / previous["p95_ms"]
+            comparison = f"{change:+.0%}" + ("  REGRESSION" if change > REGRESSION_TOLERANCE else "")
+        lines.append(
+            f"{endpoint:<62} {row['requests']:>6} {row['failures']:>5} {row['rps']:>8.1f} "
+            f"{row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f}  {comparison}"
+        )
+    return "\n".join(lines)
+
+def find_regressions(summary: Dict[str, Dict[str, float]], baseline: Optional[dict]) -> List[str]:
+    regressions = []
+    for endpoint, row in summary.items():
+        previous = (baseline or {}).get("endpoints", {}).get(endpoint)
+        if previous and previous["p95_ms"] and row["p95_ms"] > previous["p95_ms"] * (1 + REGRESSION_TOLERANCE):
+            regressions.append(endpoint)
+    return regressions
+
+def _baseline_path(scenario: str, label: str) -> str:
+    return os.path.join(BASELINE_DIR, f"{scenario}.{label}.json")
+
+def load_baseline(scenario: str, label: str) -> Optional[dict]:
+    try:
+        with open(_baseline_path(scenario, label)) as baseline_file:
+            return json.load(baseline_file)
+    except FileNotFoundError:
+        return None
+
+def save_baseline(scenario: str, label: str, summary: Dict[str, Dict[str, float]], settings: dict) -> str:
+    os.makedirs(BASELINE_DIR, exist_ok=True)
+    path = _baseline_path(scenario, label)
+    with open(path, "w") as baseline_file:
+        json.dump({"settings": settings, "endpoints": summary}, baseline_file, indent=2, sort_keys=True)
+        baseline_file.write("\n")
+    return path
@@ -0,0 +1,227 @@
+"""
+Scripted user journeys. Each scenario is one iteration of a virtual user; the runner
+repeats it until the test duration is up.
+"""
+import json
+import random
+import time
+
+from .runner import Recorder
+from .seed import Fixture, GRANT_TYPES, LOADTEST_PASSWORD
+
+class Session:
+    """One virtual user: an HTTP client, its bearer token and the shared recorder"""
+    def __init__(self, client, recorder: Recorder, rng: random.Random):
+        self.client = client
+        self.recorder = recorder
+        self.rng = rng
+        self.headers = {}
+        self.email = None
+
+    async def request(self, method: str, endpoint: str, url: str, expected=(200,), **kwargs):
+        # `endpoint` is the route template, so results group like the /metrics labels
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, headers=self.headers, **kwargs)
+            ok = response.status_code in expected
+        except Exception:
+            response, ok = None, False
+        self.recorder.record(f"{method} {endpoint}", (time.perf_counter() - start) * 1000, ok)
+        return response
+
+    async def login(self, email: str) -> None:
+        if self.email == email:
+            return
+        response = await self.request(
+            "POST", "/auth/login", "/auth/login",
+            data={"username": email, "password": LOADTEST_PASSWORD}
+        )
+        if response is not None and response.status_code == 200:
+            self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+            self.email = email
+
+async def researcher_dashboard(session: Session, fixture: Fixture) -> None:
+    """A researcher opening the dashboard: profile, own applications, calls, projects"""
+    await session.login(session.rng.choice(fixture.researchers))
+    await session.request("GET", "/auth/me", "/auth/me")
+    await session.request("GET", "/applications/my", "/applications/my")
+    await session.request("GET", "/grant-calls/", "/grant-calls/")
+    await session.request("GET", "/projects/", "/projects/")
+    await session.request("GET", "/users/me/biodata", "/users/me/biodata", expected=(200, 404))
+    own = fixture.own_applications.get(session.email)
+    if own:
+        application_id = session.rng.choice(own)
+        await session.request("GET", "/applications/{application_id}", f"/applications/{application_id}")
+
+async def manager_review_day(session: Session, fixture: Fixture) -> None:
+    """A grants manager triaging the queue and adding review comments"""
+    await session.login(session.rng.choice(fixture.managers))
+    await session.request("GET", "/applications/", "/applications/")
+    queue = fixture.applications.get("submitted", []) + fixture.applications.get("under_review", [])
+    for application_id in session.rng.sample(queue, min(3, len(queue))):
+        await session.request("GET", "/applications/{application_id}", f"/applications/{application_id}")
+        await session.request(
+            "POST", "/applications/{application_id}/review", f"/applications/{application_id}/review",
+            params={"new_status": "under_review"},
+            json={"reviewerName": "Load Test Manager", "reviewerEmail": session.email, "comments": "Reviewed under load", "status": "under_review"}
+        )
+    await session.request("GET", "/projects/", "/projects/")
+    await session.request("GET", "/grant-calls/", "/grant-calls/")
+    await session.request("GET", "/applications/export", "/applications/export", params={"format": "ndjson"})
+
+def _application(grant_id: str, email: str, title: str) -> dict:
+    return {
+        "grantId": grant_id,
+        "applicantName": "Load Test Researcher",
+        "email": email,
+        "proposalTitle": title,
+        "institution": "Load Test University",
+        "department": "Science",
+        "projectSummary": "Summary " * 100,
+        "objectives": "Objectives " * 30,
+        "methodology": "Methodology " * 30,
+        "expectedOutcomes": "Outcomes " * 30,
+        "budgetAmount": 125000.0,
+        "budgetJustification": "Personnel and equipment",
+        "timeline": "12 months",
+    }
+
+async def deadline_rush(session: Session, fixture: Fixture) -> None:
+    """Researchers submitting new applications just before a deadline"""
+    await session.login(session.rng.choice(fixture.researchers))
+    await session.request("GET", "/grant-calls/", "/grant-calls/")
+    grant_id = session.rng.choice(fixture.grant_call_ids)
+    await session.request("GET", "/grant-calls/{grant_call_id}", f"/grant-calls/{grant_id}")
+    await session.request("POST", "/applications/", "/applications/", json=_application(grant_id, session.email, "Deadline rush proposal"))
+    await session.request("GET", "/applications/my", "/applications/my")
+
+async def signoff_burst(session: Session, fixture: Fixture) -> None:
+    """Approvers, reviewers and the VC following emailed token links"""
+    if not (fixture.signoff_tokens or fixture.review_tokens or fixture.vc_tokens):
+        # Every approval is used up: keep probing with stale links, which still cost a token lookup
+        token = session.rng.choice(("used", "expired", "unknown"))
+        await session.request("GET", "/applications/signoff/{token}", f"/applications/signoff/{token}", expected=(404,))
+        return
+    if fixture.signoff_tokens:
+        token = fixture.signoff_tokens.pop()
+        await session.request("GET", "/applications/signoff/{token}", f"/applications/signoff/{token}")
+        await session.request(
+            "POST", "/applications/signoff/{token}", f"/applications/signoff/{token}",
+            json={"decision": "approved", "comments": "Approved under load", "approver_name": "Load Test Approver"}
+        )
+    if fixture.review_tokens:
+        token = session.rng.choice(fixture.review_tokens)
+        await session.request("GET", "/reviewers/application/{token}", f"/reviewers/application/{token}")
+    if fixture.vc_tokens:
+        token = session.rng.choice(fixture.vc_tokens)
+        await session.request("GET", "/projects/vc-signoff/{token}", f"/projects/vc-signoff/{token}")
+
+async def document_uploads(session: Session, fixture: Fixture) -> None:
+    """Managers attaching award documents and researchers uploading progress reports"""
+    payload = session.rng.randbytes(session.rng.choice((64, 256, 1024)) * 1024)
+    approved = fixture.applications.get("signoff_approved", [])
+    if approved and session.rng.random() < 0.3:
+        # Uploading moves the application on, so each one takes a single award document
+        application_id = approved.pop()
+        await session.login(session.rng.choice(fixture.managers))
+        await session.request(
+            "POST", "/applications/{application_id}/award-documents/upload",
+            f"/applications/{application_id}/award-documents/upload",
+            files={"file": ("award.pdf", payload, "application/pdf")}
+        )
+        return
+    researchers = [email for email in fixture.researchers if fixture.project_milestones.get(email)]
+    if not researchers:
+        # No projects to report on: look at the document library instead
+        await session.login(session.rng.choice(fixture.researchers))
+        await session.request("GET", "/documents/", "/documents/")
+        return
+    await session.login(session.rng.choice(researchers))
+    project_id, milestone_id = session.rng.choice(fixture.project_milestones[session.email])
+    await session.request(
+        "POST", "/projects/{project_id}/milestones/{milestone_id}/progress-report",
+        f"/projects/{project_id}/milestones/{milestone_id}/progress-report",
+        files={"file": ("progress.pdf", payload, "application/pdf")}
+    )
+    await session.request("GET", "/projects/{project_id}", f"/projects/{project_id}")
+
+async def document_library(session: Session, fixture: Fixture) -> None:
+    """Researchers filing reports in the document library, revising and downloading them"""
+    await session.login(session.rng.choice(fixture.researchers))
+    payload = session.rng.randbytes(session.rng.choice((16, 64, 256)) * 1024)
+    response = await session.request(
+        "POST", "/documents/upload", "/documents/upload",
+        data={"name": "Quarterly report", "folder": session.rng.choice(("Projects", "Reports"))},
+        files={"file": ("report.pdf", payload, "application/pdf")}
+    )
+    await session.request("GET", "/documents/", "/documents/")
+    await session.request("GET", "/documents/stats", "/documents/stats")
+    if response is None or response.status_code != 200:
+        return
+    document_id = response.json()["id"]
+    await session.request(
+        "POST", "/documents/{document_id}/upload-version", f"/documents/{document_id}/upload-version",
+        files={"file": ("report.pdf", payload + b"revised", "application/pdf")}
+    )
+    await session.request("GET", "/documents/{document_id}/download", f"/documents/{document_id}/download")
+    if session.rng.random() < 0.3:
+        await session.request("DELETE", "/documents/{document_id}", f"/documents/{document_id}")
+
+async def grant_call_admin(session: Session, fixture: Fixture) -> None:
+    """A grants manager publishing a call, editing it, toggling it and checking storage"""
+    await session.login(session.rng.choice(fixture.managers))
+    response = await session.request("POST", "/grant-calls/", "/grant-calls/", json={
+        "title": "Load test call",
+        "type": session.rng.choice(GRANT_TYPES),
+        "sponsor": "Synthetic Research Council",
+        "deadline": "2031-06-30",
+        "scope": "Synthetic grant call for load testing",
+        "eligibility": "All researchers",
+        "requirements": "Proposal and budget",
+    })
+    await session.request("GET", "/grant-calls/", "/grant-calls/", params={"status_filter": "Open", "sort": "-deadline", "limit": 20})
+    if response is not None and response.status_code == 200:
+        grant_call_id = response.json()["id"]
+        await session.request("PUT", "/grant-calls/{grant_call_id}", f"/grant-calls/{grant_call_id}", json={"scope": "Updated scope"})
+        await session.request("PATCH", "/grant-calls/{grant_call_id}/toggle-status", f"/grant-calls/{grant_call_id}/toggle-status")
+        await session.request("DELETE", "/grant-calls/{grant_call_id}", f"/grant-calls/{grant_call_id}")
+    await session.request("GET", "/documents/storage/usage", "/documents/storage/usage")
+
+async def admin_console(session: Session, fixture: Fixture) -> None:
+    """The administrator managing accounts, importing applications and watching the job"""
+    await session.login(fixture.admin)
+    await session.request("GET", "/users/", "/users/")
+    email = f"temp{session.rng.getrandbits(48):x}@loadtest.edu"
+    response = await session.request("POST", "/users/", "/users/", json={
+        "name": "Temporary User", "email": email, "password": "temporary123", "role": "Researcher"
+    })
+    if response is not None and response.status_code == 200:
+        user_id = response.json()["id"]
+        await session.request("GET", "/users/{user_id}", f"/users/{user_id}")
+        await session.request("PUT", "/users/{user_id}", f"/users/{user_id}", json={"status": "inactive"})
+        await session.request("DELETE", "/users/{user_id}", f"/users/{user_id}")
+
+    lines = [
+        json.dumps(_application(session.rng.choice(fixture.grant_call_ids), session.rng.choice(fixture.researchers), "Imported proposal"))
+        for _ in range(20)
+    ]
+    response = await session.request(
+        "POST", "/admin/import/applications", "/admin/import/applications", expected=(202,),
+        files={"file": ("applications.ndjson", "\n".join(lines).encode(), "application/x-ndjson")}
+    )
+    if response is not None and response.status_code == 202:
+        job_id = response.json()["job_id"]
+        await session.request("GET", "/jobs/{job_id}", f"/jobs/{job_id}")
+        await session.request("GET", "/admin/import/applications/{job_id}", f"/admin/import/applications/{job_id}")
+    await session.request("GET", "/admin/db-pool", "/admin/db-pool")
+
+SCENARIOS = {
+    "researcher_dashboard": researcher_dashboard,
+    "manager_review_day": manager_review_day,
+    "deadline_rush": deadline_rush,
+    "signoff_burst": signoff_burst,
+    "document_uploads": document_uploads,
+    "document_library": document_library,
+    "grant_call_admin": grant_call_admin,
+    "admin_console": admin_console,
+}
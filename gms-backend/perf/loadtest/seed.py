@@ -0,0 +1,207 @@
+"""
+Synthetic data for load tests.
+
+Everything scales linearly with `scale`: scale 1 is a small department (40 researchers,
+~200 applications); scale 10 approximates a busy university grants office.
+"""
+from bson import ObjectId
+from datetime import datetime, timedelta
+import random
+import secrets
+
+LOADTEST_PASSWORD = "loadtest123"
+
+STATUS_MIX = [
+    ("submitted", 30), ("under_review", 20), ("manager_approved", 15), ("awaiting_signoff", 10),
+    ("signoff_approved", 10), ("rejected", 8), ("editable", 4), ("withdrawn", 3),
+]
+
+GRANT_TYPES = ["ORI", "External", "Scholarship", "Travel/Conference", "GOVT", "Fellowship"]
+
+class Fixture:
+    """Identities and tokens the scenarios draw from"""
+    def __init__(self):
+        self.researchers = []       # emails
+        self.managers = []          # emails
+        self.admin = None
+        self.grant_call_ids = []
+        self.applications = {}      # status -> [application id]
+        self.own_applications = {}  # researcher email -> [application id]
+        self.signoff_tokens = []    # pending sign-off approval tokens
+        self.review_tokens = []
+        self.vc_tokens = []
+        self.project_milestones = {}  # researcher email -> [(project id, milestone id)]
+
+def _iso(moment: datetime) -> str:
+    return moment.replace(microsecond=0).isoformat() + "Z"
+
+def _weighted_status(rng: random.Random) -> str:
+    statuses, weights = zip(*STATUS_MIX)
+    return rng.choices(statuses, weights)[0]
+
+def _review_history(rng: random.Random, manager_email: str, size: int, now: datetime) -> list:
+    return [
+        {
+            "id": str(ObjectId()),
+            "reviewerName": f"Reviewer {index}",
+            "reviewerEmail": manager_email,
+            "comments": "Clear objectives; budget needs more detail. " * rng.randint(1, 6),
+            "submittedAt": _iso(now - timedelta(days=size - index)),
+            "status": "under_review",
+        }
+        for index in range(size)
+    ]
+
+def _signoff_workflow(status: str, award_amount: float, tokens: list, now: datetime) -> dict:
+    approvals = []
+    for role in ("DORI", "DVC", "VC"):
+        token = secrets.token_urlsafe(24)
+        approved = status == "signoff_approved"
+        approvals.append({
+            "role": role,
+            "email": f"{role.lower()}@loadtest.edu",
+            "name": f"{role} Approver",
+            "token": token,
+            "status": "approved" if approved else "pending",
+            "created_at": _iso(now),
+        })
+        if not approved:
+            tokens.append(token)
+    return {
+        "status": "approved" if status == "signoff_approved" else "pending",
+        "award_amount": award_amount,
+        "approvals": approvals,
+        "initiated_by": "manager0@loadtest.edu",
+        "initiated_at": _iso(now),
+    }
+
+async def seed_database(db, scale: int = 1, seed: int = 42) -> Fixture:
+    """Drop and repopulate the load test database, returning the fixture scenarios use"""
+    from passlib.context import CryptContext
+
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    fixture = Fixture()
+    # One bcrypt hash shared by every synthetic user; hashing per user would dominate seeding
+    hashed_password = CryptContext(schemes=["bcrypt"], deprecated="auto").hash(LOADTEST_PASSWORD)
+
+    for collection in ("users", "grant_calls", "applications", "projects", "documents", "jobs", "rate_limits"):
+        await db[collection].drop()
+
+    users = []
+    for index in range(40 * scale):
+        fixture.researchers.append(f"researcher{index}@loadtest.edu")
+        users.append(("Researcher", fixture.researchers[-1], f"Dr. Researcher {index}"))
+    for index in range(max(2, 2 * scale)):
+        fixture.managers.append(f"manager{index}@loadtest.edu")
+        users.append(("Grants Manager", fixture.managers[-1], f"Manager {index}"))
+    fixture.admin = "admin@loadtest.edu"
+    users.append(("Admin", fixture.admin, "Load Test Admin"))
+    await db.users.insert_many([
+        {
+            "email": email, "password": LOADTEST_PASSWORD, "hashed_password": hashed_password,
+            "role": role, "name": name, "status": "active", "createdAt": _iso(now),
+        }
+        for role, email, name in users
+    ])
+
+    grant_calls = [
+        {
+            "title": f"Load Test Grant {index}",
+            "type": GRANT_TYPES[index % len(GRANT_TYPES)],
+            "sponsor": "Synthetic Research Council",
+            "scope": "Synthetic grant call for load testing",
+            "status": "Open" if index % 4 else "Closed",
+            "deadline": _iso(now + timedelta(days=rng.randint(-30, 120))),
+            "eligibility": "All researchers",
+            "requirements": "Proposal and budget",
+            "visibility": "Public",
+            "createdAt": _iso(now), "updatedAt": _iso(now),
+        }
+        for index in range(10 * scale)
+    ]
+    result = await db.grant_calls.insert_many(grant_calls)
+    fixture.grant_call_ids = [str(grant_call_id) for grant_call_id in result.inserted_ids]
+
+    applications = []
+    for researcher_index, email in enumerate(fixture.researchers):
+        for _ in range(rng.randint(2, 8)):
+            status = _weighted_status(rng)
+            application_id = ObjectId()
+            budget = float(rng.randint(10, 500) * 1000)
+            submitted = now - timedelta(days=rng.randint(1, 365))
+            application = {
+                "_id": application_id,
+                "grantId": rng.choice(fixture.grant_call_ids),
+                "applicantName": f"Dr. Researcher {researcher_index}",
+                "email": email,
+                "proposalTitle": f"Synthetic proposal {application_id}",
+                "institution": "Load Test University",
+                "department": rng.choice(["Engineering", "Medicine", "Science", "Humanities"]),
+                "projectSummary": "A synthetic project summary. " * 20,
+                "objectives": "Objectives. " * 10,
+                "methodology": "Methodology. " * 10,
+                "expectedOutcomes": "Outcomes. " * 10,
+                "budgetAmount": budget,
+                "budgetJustification": "Personnel and equipment",
+                "timeline": "24 months",
+                "status": status,
+                "submissionDate": _iso(submitted),
+                "reviewComments": "",
+                "revisionCount": 0,
+                "isEditable": status == "editable",
+                "biodata": {"name": f"Dr. Researcher {researcher_index}", "age": 40, "email": email, "firstTimeApplicant": False},
+                # Mostly short histories with a long tail, as in production
+                "reviewHistory": _review_history(rng, fixture.managers[0], min(int(rng.expovariate(0.3)), 60), now),
+                "createdAt": submitted, "updatedAt": submitted,
+            }
+            if status in ("awaiting_signoff", "signoff_approved"):
+                application["signoff_workflow"] = _signoff_workflow(status, budget, fixture.signoff_tokens, now)
+            if status == "under_review":
+                token = secrets.token_urlsafe(24)
+                application["review_tokens"] = [{"email": "reviewer@loadtest.edu", "token": token, "assigned_at": _iso(now)}]
+                fixture.review_tokens.append(token)
+            applications.append(application)
+            fixture.applications.setdefault(status, []).append(str(application_id))
+            fixture.own_applications.setdefault(email, []).append(str(application_id))
+    await db.applications.insert_many(applications)
+
+    projects = []
+    for application in applications:
+        if application["status"] not in ("manager_approved", "signoff_approved"):
+            continue
+        project_id = ObjectId()
+        milestones = [
+            {
+                "id": f"milestone_{project_id}_{index}",
+                "title": f"Milestone {index}",
+                "description": "Synthetic milestone",
+                "dueDate": _iso(now + timedelta(days=30 * (index - 1))),
+                "status": "in_progress" if index else "completed",
+            }
+            for index in range(4)
+        ]
+        project = {
+            "_id": project_id,
+            "application_id": str(application["_id"]),
+            "title": application["proposalTitle"],
+            "status": "active",
+            "start_date": _iso(now - timedelta(days=90)),
+            "end_date": _iso(now + timedelta(days=640)),
+            "milestones": milestones,
+            "requisitions": [],
+            "partners": [],
+            "created_at": now, "updated_at": now,
+        }
+        if rng.random() < 0.2:
+            token = secrets.token_urlsafe(24)
+            project["closure_workflow"] = {"status": "vc_review", "vc_sign_off_token": token}
+            fixture.vc_tokens.append(token)
+        projects.append(project)
+        fixture.project_milestones.setdefault(application["email"], []).extend(
+            (str(project_id), milestone["id"]) for milestone in milestones
+        )
+    if projects:
+        await db.projects.insert_many(projects)
+
+    return fixture
@@ -0,0 +1,47 @@
+"""
+Micro-benchmarks for model parsing and response building.
+
+    python -m perf.micro                          # run everything
+    python -m perf.micro -k Application           # only benchmarks whose name contains the filter
+    python -m perf.micro --save-baseline          # store results as the baseline
+
+Run from gms-backend/.
+"""
+import argparse
+import sys
+
+from .bench import BENCHMARKS, run_benchmark, format_results, find_regressions, load_baseline, save_baseline
+from . import benchmarks  # noqa: F401  (registers the benchmarks)
+
+def _parse_args():
+    parser = argparse.ArgumentParser(prog="python -m perf.micro", description="GMS micro-benchmarks")
+    parser.add_argument("-k", "--filter", help="Only run benchmarks whose name contains this text")
+    parser.add_argument("--rounds", type=int, default=5, help="Timing rounds per benchmark")
+    parser.add_argument("--round-seconds", type=float, default=0.2, help="Minimum duration of each round")
+    parser.add_argument("--baseline-label", default="local", help="Baseline name, e.g. the machine or CI runner")
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the baseline")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit non-zero when throughput regresses past the tolerance")
+    return parser.parse_args()
+
+def main() -> int:
+    args = _parse_args()
+    selected = {name: factory for name, factory in BENCHMARKS.items() if not args.filter or args.filter in name}
+    results = {}
+    for name, factory in selected.items():
+        results[name] = run_benchmark(factory(), rounds=args.rounds, round_seconds=args.round_seconds)
+        print(f"  {name}: {results[name]['ops_per_sec']:,.0f} ops/sec", file=sys.stderr)
+
+    baseline = load_baseline(args.baseline_label)
+    print(format_results(results, baseline))
+    if args.save_baseline:
+        print(f"\nBaseline saved to {save_baseline(args.baseline_label, results)}")
+
+    regressed = find_regressions(results, baseline)
+    if regressed:
+        print("\nThroughput regressions against baseline:\n  " + "\n  ".join(regressed))
+        if args.fail_on_regression:
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+"""
+Minimal benchmark runner: ops/sec from repeated timing runs, peak memory per call from tracemalloc.
+"""
+from typing import Callable, Dict, List, Optional
+import gc
+import json
+import os
+import statistics
+import time
+import tracemalloc
+
+BASELINE_DIR = os.path.join(os.path.dirname(__file__), "baselines")
+
+# Throughput more than this much below the baseline is reported as a regression
+REGRESSION_TOLERANCE = 0.10
+
+# name -> factory returning the zero-argument callable to time
+BENCHMARKS: Dict[str, Callable[[], Callable[[], object]]] = {}
+
+def benchmark(name: str):
+    """Register a factory; setup work in the factory is excluded from timing"""
+    def register(factory):
+        BENCHMARKS[name] = factory
+        return factory
+    return register
+
+def _calibrate(func: Callable[[], object], target_seconds: float) -> int:
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        if time.perf_counter() - start >= target_seconds:
+            return loops
+        loops *= 2
+
+def _peak_bytes_per_call(func: Callable[[], object], calls: int = 20) -> int:
+    tracemalloc.start()
+    try:
+        peaks = []
+        for _ in range(calls):
+            tracemalloc.reset_peak()
+            baseline, _ = tracemalloc.get_traced_memory()
+            func()
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - baseline)
+        return int(statistics.median(peaks))
+    finally:
+        tracemalloc.stop()
+
+def run_benchmark(func: Callable[[], object], rounds: int = 5, round_seconds: float = 0.2) -> Dict[str, float]:
+    func()  # warm up caches (pydantic validators, imports)
+    loops = _calibrate(func, round_seconds)
+    timings = []
+    gc.collect()
+    gc_was_enabled = gc.isenabled()
+    gc.disable()  # keep collector pauses out of the per-call numbers
+    try:
+        for _ in range(rounds):
+            start = time.perf_counter()
+            for _ in range(loops):
+                func()
+            timings.append((time.perf_counter() - start) / loops)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    best, median = min(timings), statistics.median(timings)
+    return {
+        "ops_per_sec": round(1 / median, 1),
+        "median_us": round(median * 1e6, 2),
+        "min_us": round(best * 1e6, 2),
+        "stdev_us": round(statistics.pstdev(timings) * 1e6, 2),
+        "peak_kib_per_call": round(_peak_bytes_per_call(func) / 1024, 1),
+    }
+
+def format_results(results: Dict[str, Dict[str, float]], baseline: Optional[dict] = None) -> str:
+    lines = [f"{'benchmark':<52} {'ops/sec':>12} {'median µs':>11} {'stdev µs':>10} {'peak KiB':>9}  vs baseline"]
+    for name, row in results.items():
+        comparison = ""
+        previous = (baseline or {}).get(name)
+        if previous:
+            change = (row["ops_per_sec"] - previous["ops_per_sec"]) / previous["ops_per_sec"]
+            comparison = f"{change:+.0%}" + ("  REGRESSION" if change < -REGRESSION_TOLERANCE else "")
+        lines.append(
+            f"{name:<52} {row['ops_per_sec']:>12,.0f} {row['median_us']:>11.1f} "
+            f"{row['stdev_us']:>10.1f} {row['peak_kib_per_call']:>9.1f}  {comparison}"
+        )
+    return "\n".join(lines)
+
+def find_regressions(results: Dict[str, Dict[str, float]], baseline: Optional[dict]) -> List[str]:
+    return [
+        name for name, row in results.items()
+        if (baseline or {}).get(name) and row["ops_per_sec"] < baseline[name]["ops_per_sec"] * (1 - REGRESSION_TOLERANCE)
+    ]
+
+def load_baseline(label: str) -> Optional[dict]:
+    try:
+        with open(os.path.join(BASELINE_DIR, f"{label}.json")) as baseline_file:
+            return json.load(baseline_file)
+    except FileNotFoundError:
+        return None
+
+def save_baseline(label: str, results: Dict[str, Dict[str, float]]) -> str:
+    os.makedirs(BASELINE_DIR, exist_ok=True)
+    path = os.path.join(BASELINE_DIR, f"{label}.json")
+    merged = {**(load_baseline(label) or {}), **results}
+    with open(path, "w") as baseline_file:
+        json.dump(merged, baseline_file, indent=2, sort_keys=True)
+        baseline_file.write("\n")
+    return path
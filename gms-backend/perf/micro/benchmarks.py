@@ -0,0 +1,129 @@
+"""
+Hot CPU paths of the list and detail endpoints: model parsing and response building.
+"""
+from fastapi.encoders import jsonable_encoder
+
+from app.models.application import Application
+from app.models.grant_call import GrantCall
+from app.models.project import Project
+from app.models.read_models import ApplicationRow, ProjectRow, APPLICATION_ROW_PROJECTION, PROJECT_ROW_PROJECTION
+from app.schemas.application import ApplicationResponse
+from app.api.applications.utils import build_application_response, build_application_responses
+from app.api.grant_calls import build_grant_call_response
+from app.api.projects import build_project_summary
+
+from . import documents
+from .bench import benchmark
+
+def _projected(doc: dict, projection: dict) -> dict:
+    """What find() returns with an exclusion projection"""
+    return {key: value for key, value in doc.items() if key not in projection}
+
+# Application.parse_obj, as in get_application_by_id and the list services
+
+@benchmark("Application.parse_obj[review_history=2]")
+def parse_application_small():
+    doc = documents.application(review_history_size=2)
+    return lambda: Application.parse_obj(doc)
+
+@benchmark("Application.parse_obj[review_history=50]")
+def parse_application_review_history_50():
+    doc = documents.application(review_history_size=50)
+    return lambda: Application.parse_obj(doc)
+
+@benchmark("Application.parse_obj[review_history=500]")
+def parse_application_review_history_500():
+    doc = documents.application(review_history_size=500)
+    return lambda: Application.parse_obj(doc)
+
+@benchmark("Application.parse_obj[signoff_workflow]")
+def parse_application_signoff():
+    doc = documents.application(review_history_size=5, with_signoff=True)
+    return lambda: Application.parse_obj(doc)
+
+# build_application_response from a parsed model and from a raw document (sign-off pages)
+
+@benchmark("build_application_response[model, review_history=50]")
+def build_response_from_model():
+    application = Application.parse_obj(documents.application(review_history_size=50, with_signoff=True))
+    return lambda: build_application_response(application)
+
+@benchmark("build_application_response[dict, signoff_workflow]")
+def build_response_from_dict():
+    doc = documents.application(review_history_size=5, with_signoff=True)
+    return lambda: build_application_response(doc)
+
+@benchmark("jsonable_encoder(ApplicationResponse)[review_history=50]")
+def encode_application_response():
+    response = build_application_response(Application.parse_obj(documents.application(review_history_size=50)))
+    return lambda: jsonable_encoder(response)
+
+@benchmark("list_applications[100 docs, parse+build+validate+encode]")
+def list_applications_end_to_end():
+    # What the endpoint did before rows: parse, build, re-validate through response_model, encode
+    docs = [documents.application(review_history_size=index % 10) for index in range(100)]
+    return lambda: jsonable_encoder(
+        [ApplicationResponse.parse_obj(build_application_response(Application.parse_obj(doc)).dict(by_alias=True)) for doc in docs],
+        by_alias=True
+    )
+
+# Slotted rows used by the list services, from projected documents
+
+@benchmark("ApplicationRow(doc)[review_history=50]")
+def application_row():
+    doc = _projected(documents.application(review_history_size=50), APPLICATION_ROW_PROJECTION)
+    return lambda: ApplicationRow(doc)
+
+@benchmark("list_applications[100 rows, row+summary+encode]")
+def list_application_rows_end_to_end():
+    docs = [_projected(documents.application(review_history_size=index % 10), APPLICATION_ROW_PROJECTION) for index in range(100)]
+    return lambda: jsonable_encoder(build_application_responses([ApplicationRow(doc) for doc in docs]))
+
+# Projects
+
+@benchmark("Project(**doc)[milestones=4]")
+def parse_project_small():
+    doc = documents.project(milestones=4, requisitions=2)
+    return lambda: Project(**doc)
+
+@benchmark("Project(**doc)[milestones=40, requisitions=40]")
+def parse_project_large():
+    doc = documents.project(milestones=40, requisitions=40)
+    return lambda: Project(**doc)
+
+@benchmark("build_project_summary[milestones=4]")
+def project_summary():
+    project = Project(**documents.project(milestones=4, requisitions=2))
+    return lambda: build_project_summary(project)
+
+@benchmark("list_projects[100 docs, parse+summary]")
+def list_projects_end_to_end():
+    docs = [documents.project(milestones=4 + index % 8, requisitions=index % 4) for index in range(100)]
+    return lambda: [build_project_summary(Project(**doc)) for doc in docs]
+
+@benchmark("ProjectRow(doc)[milestones=40, requisitions=40]")
+def project_row_large():
+    doc = _projected(documents.project(milestones=40, requisitions=40), PROJECT_ROW_PROJECTION)
+    return lambda: ProjectRow(doc)
+
+@benchmark("list_projects[100 rows, row+summary]")
+def list_project_rows_end_to_end():
+    docs = [_projected(documents.project(milestones=4 + index % 8, requisitions=index % 4), PROJECT_ROW_PROJECTION) for index in range(100)]
+    return lambda: [build_project_summary(ProjectRow(doc)) for doc in docs]
+
+# Grant calls
+
+@benchmark("GrantCall(**doc)")
+def parse_grant_call():
+    doc = documents.grant_call()
+    return lambda: GrantCall(**doc)
+
+@benchmark("build_grant_call_response")
+def grant_call_response():
+    grant_call = GrantCall(**documents.grant_call())
+    return lambda: build_grant_call_response(grant_call)
+
+@benchmark("list_grant_calls[50 docs, parse+response+encode]")
+def list_grant_calls_end_to_end():
+    docs = [documents.grant_call() for _ in range(50)]
+    return lambda: jsonable_encoder([build_grant_call_response(GrantCall(**doc)) for doc in docs])
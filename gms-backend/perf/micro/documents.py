@@ -0,0 +1,132 @@
+"""
+Realistic stored documents, shaped like what the API reads back from MongoDB.
+"""
+from bson import ObjectId
+from datetime import datetime, timedelta
+
+NOW = datetime(2024, 8, 1, 12, 0, 0)
+
+def _iso(moment: datetime) -> str:
+    return moment.isoformat() + "Z"
+
+def review_history(size: int) -> list:
+    return [
+        {
+            "id": str(ObjectId()),
+            "reviewerName": f"Dr. Reviewer {index}",
+            "reviewerEmail": f"reviewer{index}@grants.edu",
+            "comments": "Strong methodology; the budget justification needs more detail on equipment costs. " * 3,
+            "submittedAt": _iso(NOW - timedelta(days=size - index)),
+            "status": "under_review",
+        }
+        for index in range(size)
+    ]
+
+def signoff_workflow(approved: bool = False) -> dict:
+    return {
+        "status": "approved" if approved else "pending",
+        "award_amount": 500000.0,
+        "approvals": [
+            {
+                "role": role,
+                "email": f"{role.lower()}@grants.edu",
+                "name": f"{role} Approver",
+                "token": f"{role.lower()}_token_{index:032d}",
+                "status": "approved" if approved else "pending",
+                "comments": "Approved for full funding" if approved else "",
+                "approved_at": _iso(NOW) if approved else None,
+                "created_at": _iso(NOW),
+            }
+            for index, role in enumerate(("DORI", "DVC", "VC"))
+        ],
+        "initiated_by": "manager@grants.edu",
+        "initiated_at": _iso(NOW),
+    }
+
+def application(review_history_size: int = 2, with_signoff: bool = False) -> dict:
+    doc = {
+        "_id": ObjectId(),
+        "grantId": str(ObjectId()),
+        "applicantName": "Dr. Sarah Johnson",
+        "email": "researcher@grants.edu",
+        "proposalTitle": "AI-Powered Climate Change Prediction Models",
+        "institution": "University of Technology",
+        "department": "Computer Science",
+        "projectSummary": "Developing advanced AI models to predict climate change patterns. " * 10,
+        "objectives": "Create predictive models for climate change analysis. " * 5,
+        "methodology": "Machine learning algorithms with historical climate data. " * 5,
+        "expectedOutcomes": "Improved climate prediction accuracy by 25%",
+        "budgetAmount": 500000.0,
+        "budgetJustification": "Equipment, personnel, and computational resources",
+        "timeline": "24 months",
+        "status": "awaiting_signoff" if with_signoff else "under_review",
+        "submissionDate": _iso(NOW),
+        "reviewComments": "",
+        "deadline": _iso(NOW + timedelta(days=90)),
+        "revisionCount": 1,
+        "originalSubmissionDate": _iso(NOW - timedelta(days=30)),
+        "isEditable": False,
+        "proposalFileName": "proposal.pdf",
+        "proposalFileSize": 2048000,
+        "proposalFileType": "application/pdf",
+        "biodata": {"name": "Dr. Sarah Johnson", "age": 42, "email": "researcher@grants.edu", "firstTimeApplicant": False},
+        "reviewHistory": review_history(review_history_size),
+        "createdAt": NOW,
+        "updatedAt": NOW,
+    }
+    if with_signoff:
+        doc["signoff_workflow"] = signoff_workflow()
+    return doc
+
+def project(milestones: int = 4, requisitions: int = 2) -> dict:
+    project_id = ObjectId()
+    return {
+        "_id": project_id,
+        "application_id": str(ObjectId()),
+        "title": "AI Climate Prediction Implementation",
+        "status": "active",
+        "start_date": _iso(NOW),
+        "end_date": _iso(NOW + timedelta(days=730)),
+        "milestones": [
+            {
+                "id": f"milestone_{index}",
+                "title": f"Milestone {index}",
+                "description": "Collect and prepare climate data",
+                "dueDate": _iso(NOW + timedelta(days=30 * index)),
+                "status": "in_progress",
+                "progressReportUploaded": index % 2 == 0,
+                "progressReportFilename": f"progress_{index}.pdf" if index % 2 == 0 else None,
+            }
+            for index in range(milestones)
+        ],
+        "requisitions": [
+            {
+                "id": f"req_{index}",
+                "milestoneId": f"milestone_{index % max(milestones, 1)}",
+                "amount": 25000.0,
+                "requestedDate": _iso(NOW),
+                "status": "submitted",
+                "notes": "Equipment purchase",
+            }
+            for index in range(requisitions)
+        ],
+        "partners": [],
+        "created_at": NOW,
+        "updated_at": NOW,
+    }
+
+def grant_call() -> dict:
+    return {
+        "_id": ObjectId(),
+        "title": "Research Innovation Grant 2024",
+        "type": "ORI",
+        "sponsor": "National Science Foundation",
+        "scope": "Supporting innovative research projects in technology and science",
+        "status": "Open",
+        "deadline": _iso(NOW + timedelta(days=60)),
+        "eligibility": "Open to all researchers with PhD",
+        "requirements": "Submit proposal with budget and timeline",
+        "visibility": "Public",
+        "createdAt": _iso(NOW),
+        "updatedAt": _iso(NOW),
+    }